@@ -12,6 +12,7 @@ from rolling.server.document.business import *
 from rolling.server.document.character import *
 from rolling.server.document.corpse import *
 from rolling.server.document.event import *
+from rolling.server.document.job import *
 from rolling.server.document.knowledge import *
 from rolling.server.document.message import *
 from rolling.server.document.resource import *
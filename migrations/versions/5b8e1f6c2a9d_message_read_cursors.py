@@ -0,0 +1,340 @@
+"""message read cursors
+
+Revision ID: 5b8e1f6c2a9d
+Revises: 7c2e9d4a1b3f
+Create Date: 2026-10-18 16:21:09.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "5b8e1f6c2a9d"
+down_revision = "7c2e9d4a1b3f"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+message_table = sa.table(
+    "message",
+    sa.column("id", sa.Integer),
+    sa.column("subject", sa.String),
+    sa.column("text", sa.Text),
+    sa.column("character_id", sa.String),
+    sa.column("author_id", sa.String),
+    sa.column("author_name", sa.String),
+    sa.column("datetime", sa.DateTime),
+    sa.column("read", sa.Boolean),
+    sa.column("zone_row_i", sa.Integer),
+    sa.column("zone_col_i", sa.Integer),
+    sa.column("zone", sa.Boolean),
+    sa.column("concerned", sa.JSON),
+    sa.column("is_outzone_message", sa.Boolean),
+    sa.column("first_message", sa.Integer),
+    sa.column("is_first_message", sa.Boolean),
+    sa.column("affinity_id", sa.String),
+    sa.column("recipient_ids", postgresql.JSONB),
+)
+participant_table = sa.table(
+    "conversation_participant",
+    sa.column("conversation_id", sa.Integer),
+    sa.column("character_id", sa.String),
+    sa.column("last_read_message_id", sa.Integer),
+)
+cursor_table = sa.table(
+    "zone_message_cursor",
+    sa.column("character_id", sa.String),
+    sa.column("world_row_i", sa.Integer),
+    sa.column("world_col_i", sa.Integer),
+    sa.column("last_read_message_id", sa.Integer),
+)
+# Columns which are the same for all recipient copies of a message
+COPY_KEY_COLUMNS = (
+    "author_id",
+    "subject",
+    "text",
+    "zone",
+    "zone_row_i",
+    "zone_col_i",
+    "first_message",
+    "is_first_message",
+    "is_outzone_message",
+)
+
+
+def _batches(items: list):
+    for i in range(0, len(items), BATCH_SIZE):
+        yield items[i : i + BATCH_SIZE]
+
+
+def _get_recipient_ids(rows, kept_ids: dict) -> dict:
+    """Map each kept message id to characters which had a copy of it"""
+    recipient_ids = {}
+    for row in rows:
+        recipient_ids.setdefault(kept_ids[row["id"]], set()).add(row["character_id"])
+    return recipient_ids
+
+
+def _get_kept_ids(rows) -> dict:
+    """Map each message id to the id of its first recipient copy. Copies of a
+    message were written together: they have consecutive ids, same content and
+    distinct recipients."""
+    kept_ids = {}
+    group_key = None
+    group_id = None
+    group_character_ids = set()
+    for row in rows:
+        key = tuple(row[column] for column in COPY_KEY_COLUMNS)
+        if key != group_key or row["character_id"] in group_character_ids:
+            group_key = key
+            group_id = row["id"]
+            group_character_ids = set()
+        group_character_ids.add(row["character_id"])
+        kept_ids[row["id"]] = group_id
+    return kept_ids
+
+
+def upgrade():
+    op.add_column(
+        "conversation_participant",
+        sa.Column("last_read_message_id", sa.Integer(), nullable=True),
+    )
+    op.add_column(
+        "message",
+        sa.Column("recipient_ids", postgresql.JSONB(), nullable=True),
+    )
+    op.create_table(
+        "zone_message_cursor",
+        sa.Column("character_id", sa.String(length=255), nullable=False),
+        sa.Column("world_row_i", sa.Integer(), nullable=False),
+        sa.Column("world_col_i", sa.Integer(), nullable=False),
+        sa.Column("last_read_message_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["character_id"], ["character.id"]),
+        sa.PrimaryKeyConstraint("character_id", "world_row_i", "world_col_i"),
+    )
+
+    connection = op.get_bind()
+    rows = [
+        row._mapping
+        for row in connection.execute(
+            sa.select(
+                message_table.c.id,
+                message_table.c.character_id,
+                message_table.c.read,
+                *[message_table.c[column] for column in COPY_KEY_COLUMNS],
+            ).order_by(message_table.c.id)
+        )
+    ]
+    kept_ids = _get_kept_ids(rows)
+    recipient_ids = _get_recipient_ids(rows, kept_ids)
+
+    # Read flags of recipient copies become read cursors
+    conversation_cursors = {}
+    zone_cursors = {}
+    for row in rows:
+        kept_id = kept_ids[row["id"]]
+        if row["zone"]:
+            key = (row["character_id"], row["zone_row_i"], row["zone_col_i"])
+            if key[1] is None or key[2] is None:
+                continue
+            if row["read"]:
+                zone_cursors[key] = kept_id
+            elif key not in zone_cursors:
+                # Nothing read yet: cursor is before first received message
+                zone_cursors[key] = kept_id - 1
+        elif row["read"]:
+            conversation_id = kept_ids.get(
+                row["first_message"] or row["id"], row["first_message"]
+            )
+            key = (conversation_id, row["character_id"])
+            conversation_cursors[key] = max(conversation_cursors.get(key, 0), kept_id)
+
+    for batch in _batches(sorted(zone_cursors.items())):
+        op.bulk_insert(
+            cursor_table,
+            [
+                {
+                    "character_id": character_id,
+                    "world_row_i": world_row_i,
+                    "world_col_i": world_col_i,
+                    "last_read_message_id": last_read_message_id,
+                }
+                for (
+                    character_id,
+                    world_row_i,
+                    world_col_i,
+                ), last_read_message_id in batch
+            ],
+        )
+
+    # Participants now reference kept first messages and hold their cursor
+    participants = {
+        (kept_ids.get(conversation_id, conversation_id), character_id)
+        for conversation_id, character_id in connection.execute(
+            sa.select(
+                participant_table.c.conversation_id, participant_table.c.character_id
+            )
+        )
+    }
+    connection.execute(sa.delete(participant_table))
+
+    # Point conversation messages to kept first messages then drop copies
+    op.create_index("message_conversation_idx", "message", ["first_message", "id"])
+    connection.execute(
+        sa.update(message_table)
+        .where(
+            message_table.c.is_first_message == sa.true(),
+            message_table.c.first_message.is_(None),
+        )
+        .values(first_message=message_table.c.id)
+    )
+    referenced_ids = {row["first_message"] for row in rows}
+    remapped = [
+        {"old_id": id_, "new_id": kept_id}
+        for id_, kept_id in kept_ids.items()
+        if id_ != kept_id and id_ in referenced_ids
+    ]
+    for batch in _batches(remapped):
+        connection.execute(
+            sa.update(message_table)
+            .where(message_table.c.first_message == sa.bindparam("old_id"))
+            .values(first_message=sa.bindparam("new_id")),
+            batch,
+        )
+    removed_ids = [id_ for id_, kept_id in kept_ids.items() if id_ != kept_id]
+    for batch in _batches(removed_ids):
+        connection.execute(
+            sa.delete(message_table).where(message_table.c.id.in_(batch))
+        )
+    recipients = [
+        {"kept_id": kept_id, "recipient_ids": sorted(character_ids)}
+        for kept_id, character_ids in recipient_ids.items()
+    ]
+    for batch in _batches(recipients):
+        connection.execute(
+            sa.update(message_table)
+            .where(message_table.c.id == sa.bindparam("kept_id"))
+            .values(recipient_ids=sa.bindparam("recipient_ids")),
+            batch,
+        )
+    op.alter_column("message", "recipient_ids", nullable=False)
+
+    for batch in _batches(sorted(participants)):
+        op.bulk_insert(
+            participant_table,
+            [
+                {
+                    "conversation_id": conversation_id,
+                    "character_id": character_id,
+                    "last_read_message_id": conversation_cursors.get(
+                        (conversation_id, character_id)
+                    ),
+                }
+                for conversation_id, character_id in batch
+            ],
+        )
+
+    op.drop_index("message_character_unread_idx", table_name="message")
+    op.drop_index("message_character_conversation_idx", table_name="message")
+    op.drop_column("message", "read")
+    op.drop_column("message", "character_id")
+    op.create_index(
+        "message_zone_idx",
+        "message",
+        ["zone_row_i", "zone_col_i", "id"],
+        postgresql_where=sa.text("zone = true"),
+    )
+    op.create_index(
+        "message_recipient_idx",
+        "message",
+        ["recipient_ids"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade():
+    op.drop_index("message_recipient_idx", table_name="message")
+    op.drop_index("message_zone_idx", table_name="message")
+    op.drop_index("message_conversation_idx", table_name="message")
+    op.add_column(
+        "message", sa.Column("character_id", sa.String(length=255), nullable=True)
+    )
+    op.add_column("message", sa.Column("read", sa.Boolean(), nullable=True))
+
+    connection = op.get_bind()
+    conversation_cursors = {}
+    for conversation_id, character_id, last_read_message_id in connection.execute(
+        sa.select(
+            participant_table.c.conversation_id,
+            participant_table.c.character_id,
+            participant_table.c.last_read_message_id,
+        )
+    ):
+        conversation_cursors[(conversation_id, character_id)] = (
+            last_read_message_id or 0
+        )
+    zone_cursors = {
+        (character_id, world_row_i, world_col_i): last_read_message_id
+        for (
+            character_id,
+            world_row_i,
+            world_col_i,
+            last_read_message_id,
+        ) in connection.execute(sa.select(cursor_table))
+    }
+
+    # Write back one message copy by recipient, author keeps the existing row
+    copies = []
+    for row in connection.execute(
+        sa.select(message_table).order_by(message_table.c.id)
+    ):
+        row = dict(row._mapping)
+        recipient_ids = row.pop("recipient_ids") or []
+
+        for character_id in [row["author_id"]] + sorted(
+            set(recipient_ids) - {row["author_id"]}
+        ):
+            if row["zone"]:
+                cursor = zone_cursors.get(
+                    (character_id, row["zone_row_i"], row["zone_col_i"]), 0
+                )
+            else:
+                cursor = conversation_cursors.get(
+                    (row["first_message"], character_id), 0
+                )
+            read = character_id == row["author_id"] or row["id"] <= cursor
+
+            if character_id == row["author_id"]:
+                connection.execute(
+                    sa.update(message_table)
+                    .where(message_table.c.id == row["id"])
+                    .values(character_id=character_id, read=read)
+                )
+            else:
+                copy = {k: v for k, v in row.items() if k != "id"}
+                copies.append({**copy, "character_id": character_id, "read": read})
+
+    op.drop_column("message", "recipient_ids")
+    for batch in _batches(copies):
+        op.bulk_insert(message_table, batch)
+
+    op.alter_column("message", "character_id", nullable=False)
+    op.create_foreign_key(
+        "message_character_id_fkey", "message", "character", ["character_id"], ["id"]
+    )
+    op.create_index(
+        "message_character_conversation_idx",
+        "message",
+        ["character_id", "first_message"],
+    )
+    op.create_index(
+        "message_character_unread_idx",
+        "message",
+        ["character_id", "zone"],
+        postgresql_where=sa.text("read = false"),
+    )
+    op.drop_table("zone_message_cursor")
+    op.drop_column("conversation_participant", "last_read_message_id")
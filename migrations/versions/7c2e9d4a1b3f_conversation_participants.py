@@ -0,0 +1,100 @@
+"""conversation participants
+
+Revision ID: 7c2e9d4a1b3f
+Revises: d3a1f0b2c9e4
+Create Date: 2026-10-18 14:03:47.218530
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7c2e9d4a1b3f"
+down_revision = "d3a1f0b2c9e4"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _get_concerned(raw_concerned) -> list:
+    # Column default was the "[]" string, so value can be a json string
+    while isinstance(raw_concerned, str):
+        raw_concerned = json.loads(raw_concerned)
+    return raw_concerned or []
+
+
+def upgrade():
+    participant_table = op.create_table(
+        "conversation_participant",
+        sa.Column("conversation_id", sa.Integer(), nullable=False),
+        sa.Column("character_id", sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(["conversation_id"], ["message.id"]),
+        sa.ForeignKeyConstraint(["character_id"], ["character.id"]),
+        sa.PrimaryKeyConstraint("conversation_id", "character_id"),
+    )
+    op.create_index(
+        "conversation_participant_character_idx",
+        "conversation_participant",
+        ["character_id", "conversation_id"],
+    )
+    op.create_index(
+        "message_character_conversation_idx",
+        "message",
+        ["character_id", "first_message"],
+    )
+    op.create_index(
+        "message_character_unread_idx",
+        "message",
+        ["character_id", "zone"],
+        postgresql_where=sa.text("read = false"),
+    )
+
+    # Backfill from first messages concerned column
+    connection = op.get_bind()
+    character_table = sa.table("character", sa.column("id"))
+    message_table = sa.table(
+        "message",
+        sa.column("id"),
+        sa.column("first_message"),
+        sa.column("is_first_message"),
+        sa.column("concerned"),
+    )
+    character_ids = {
+        row[0] for row in connection.execute(sa.select(character_table.c.id))
+    }
+    participants = set()
+    for conversation_id, raw_concerned in connection.execute(
+        sa.select(
+            sa.func.coalesce(message_table.c.first_message, message_table.c.id),
+            message_table.c.concerned,
+        ).where(message_table.c.is_first_message == sa.true())
+    ):
+        for character_id in _get_concerned(raw_concerned):
+            if character_id in character_ids:
+                participants.add((conversation_id, character_id))
+
+    participants = sorted(participants)
+    for i in range(0, len(participants), BACKFILL_BATCH_SIZE):
+        op.bulk_insert(
+            participant_table,
+            [
+                {"conversation_id": conversation_id, "character_id": character_id}
+                for conversation_id, character_id in participants[
+                    i : i + BACKFILL_BATCH_SIZE
+                ]
+            ],
+        )
+
+
+def downgrade():
+    op.drop_index("message_character_unread_idx", table_name="message")
+    op.drop_index("message_character_conversation_idx", table_name="message")
+    op.drop_index(
+        "conversation_participant_character_idx",
+        table_name="conversation_participant",
+    )
+    op.drop_table("conversation_participant")
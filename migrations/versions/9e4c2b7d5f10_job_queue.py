@@ -0,0 +1,52 @@
+"""job queue
+
+Revision ID: 9e4c2b7d5f10
+Revises: 5b8e1f6c2a9d
+Create Date: 2026-10-18 18:02:41.113094
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9e4c2b7d5f10"
+down_revision = "5b8e1f6c2a9d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("parameters", sa.JSON(), nullable=False),
+        sa.Column("group_id", sa.String(length=255), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "RUNNING", "DONE", "FAILED", name="job__status"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("progress", sa.Float(), nullable=False),
+        sa.Column("progress_message", sa.String(), nullable=True),
+        sa.Column("checkpoint", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("locked_by", sa.String(length=255), nullable=True),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("job_status_idx", "job", ["status", "id"])
+    op.create_index("job_group_idx", "job", ["group_id"])
+
+
+def downgrade():
+    op.drop_index("job_group_idx", table_name="job")
+    op.drop_index("job_status_idx", table_name="job")
+    op.drop_table("job")
+    sa.Enum(name="job__status").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,54 @@
+"""spatial indexes
+
+Revision ID: d3a1f0b2c9e4
+Revises: 50686e99331f
+Create Date: 2026-10-18 09:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d3a1f0b2c9e4"
+down_revision = "50686e99331f"
+branch_labels = None
+depends_on = None
+
+
+POSITION_COLUMNS = ["world_row_i", "world_col_i", "zone_row_i", "zone_col_i"]
+
+
+def upgrade():
+    for table, item_column in (("resource", "resource_id"), ("stuff", "stuff_id")):
+        op.create_index(
+            f"{table}_ground_idx",
+            table,
+            POSITION_COLUMNS,
+            postgresql_where=sa.text("carried_by_id IS NULL AND in_built_id IS NULL"),
+        )
+        op.create_index(
+            f"{table}_carried_by_idx",
+            table,
+            ["carried_by_id", item_column],
+            postgresql_where=sa.text("carried_by_id IS NOT NULL"),
+        )
+        op.create_index(
+            f"{table}_in_built_idx",
+            table,
+            ["in_built_id", item_column],
+            postgresql_where=sa.text("in_built_id IS NOT NULL"),
+        )
+
+    op.create_index("build_position_idx", "build", POSITION_COLUMNS)
+    op.create_index("character_position_idx", "character", POSITION_COLUMNS)
+
+
+def downgrade():
+    op.drop_index("character_position_idx", table_name="character")
+    op.drop_index("build_position_idx", table_name="build")
+
+    for table in ("stuff", "resource"):
+        op.drop_index(f"{table}_in_built_idx", table_name=table)
+        op.drop_index(f"{table}_carried_by_idx", table_name=table)
+        op.drop_index(f"{table}_ground_idx", table_name=table)
@@ -1,14 +1,21 @@
+import copy
 import typing
 
 from rolling.protectorate import ProtectorateState
+from rolling.server.cache.base import DocumentSnapshot
+from rolling.server.cache.zone import BUILDS
+from rolling.server.cache.zone import GROUND_RESOURCES
+from rolling.server.cache.zone import GROUND_STUFFS
+from rolling.server.cache.zone import PROTECTORATE
+from rolling.server.cache.zone import ZoneStateCache
 
 
 if typing.TYPE_CHECKING:
     from rolling.kernel import Kernel
     from rolling.model.resource import CarriedResourceDescriptionModel
     from rolling.model.stuff import StuffModel
-    from rolling.server.document.resource import ResourceDocument
     from rolling.server.document.build import BuildDocument
+    from rolling.server.document.resource import ResourceDocument
     from rolling.types import CharacterId, WorldPoint
     from rolling.types import ResourceId
 
@@ -20,8 +27,10 @@ class RequestCache:
         self,
         kernel: "Kernel",
         world_point: "WorldPoint",
+        shared: typing.Optional[ZoneStateCache] = None,
     ) -> None:
         self._kernel = kernel
+        self._shared = shared
         self._ground_resources: typing.Optional[
             typing.List["CarriedResourceDescriptionModel"]
         ] = None
@@ -70,9 +79,12 @@ class RequestCache:
         resource_id: typing.Optional["ResourceId"] = None,
     ) -> typing.List["ResourceDocument"]:
         if self._ground_resources is None:
-            self._ground_resources = self._kernel.resource_lib.get_ground_resource_docs(
-                world_row_i=self._world_point[0],
-                world_col_i=self._world_point[1],
+            self._ground_resources = self._get_shared_documents(
+                GROUND_RESOURCES,
+                lambda: self._kernel.resource_lib.get_ground_resource_docs(
+                    world_row_i=self._world_point[0],
+                    world_col_i=self._world_point[1],
+                ),
             )
 
         if resource_id is not None:
@@ -84,10 +96,21 @@ class RequestCache:
         self,
     ) -> typing.List["StuffModel"]:
         if self._ground_stuffs is None:
-            self._ground_stuffs = self._kernel.stuff_lib.get_zone_stuffs(
-                world_row_i=self._world_point[0],
-                world_col_i=self._world_point[1],
-            )
+            if self._shared is not None:
+                self._ground_stuffs = self._shared.get(self._world_point, GROUND_STUFFS)
+
+            if self._ground_stuffs is None:
+                self._ground_stuffs = self._kernel.stuff_lib.get_zone_stuffs(
+                    world_row_i=self._world_point[0],
+                    world_col_i=self._world_point[1],
+                )
+                if self._shared is not None:
+                    self._shared.set(
+                        self._world_point, GROUND_STUFFS, self._ground_stuffs
+                    )
+
+            # Shared models must not be altered by callers
+            self._ground_stuffs = [copy.copy(stuff) for stuff in self._ground_stuffs]
 
         return self._ground_stuffs
 
@@ -95,9 +118,12 @@ class RequestCache:
         self,
     ) -> typing.List["StuffModel"]:
         if self._builds is None:
-            self._builds = self._kernel.build_lib.get_zone_build(
-                world_row_i=self._world_point[0],
-                world_col_i=self._world_point[1],
+            self._builds = self._get_shared_documents(
+                BUILDS,
+                lambda: self._kernel.build_lib.get_zone_build(
+                    world_row_i=self._world_point[0],
+                    world_col_i=self._world_point[1],
+                ),
             )
 
         return self._builds
@@ -106,5 +132,45 @@ class RequestCache:
         if self._protectorat_state is not None:
             return self._protectorat_state
 
+        if self._shared is not None:
+            affinity_id = self._shared.get(self._world_point, PROTECTORATE)
+            if affinity_id is not None:
+                # NOTE: 0 is stored when there is no protectorate
+                self._protectorat_state = (
+                    ProtectorateState.protected_by(
+                        self._kernel,
+                        self._kernel.affinity_lib.get_affinity(affinity_id),
+                    )
+                    if affinity_id
+                    else ProtectorateState.none(self._kernel)
+                )
+                return self._protectorat_state
+
         self._protectorat_state = self._kernel.protectorate_lib.state(self._world_point)
+        if self._shared is not None:
+            affinity = self._protectorat_state.affinity()
+            self._shared.set(
+                self._world_point,
+                PROTECTORATE,
+                affinity.id if affinity is not None else 0,
+            )
         return self._protectorat_state
+
+    def _get_shared_documents(
+        self, kind: str, get_documents: typing.Callable[[], typing.List[typing.Any]]
+    ) -> typing.List[typing.Any]:
+        if self._shared is None:
+            return get_documents()
+
+        snapshots = self._shared.get(self._world_point, kind)
+        if snapshots is None:
+            documents = get_documents()
+            self._shared.set(
+                self._world_point,
+                kind,
+                [DocumentSnapshot.from_document(document) for document in documents],
+            )
+            return documents
+
+        session = self._kernel.server_db_session
+        return [snapshot.merge(session) for snapshot in snapshots]
@@ -1,4 +1,5 @@
 # coding: utf-8
+import collections
 import typing
 
 from rolling.exception import RollingError
@@ -9,13 +10,17 @@ from rolling.model.stuff import StuffModel
 from rolling.model.world import World
 from rolling.model.zone import ZoneMapTileProduction
 from rolling.model.zone import ZoneProperties
-from rolling.model.zone import ZoneTileProperties
 from rolling.util import get_on_and_around_coordinates, square_walker
 
 if typing.TYPE_CHECKING:
     from rolling.kernel import Kernel
     from rolling.model.stuff import ZoneGenerationStuff
 
+# Tiles inspected by find_available_place_where_drop, and distance from start
+# tile containing all of them (square_walker walks squares around start tile)
+DROP_SEARCH_MAX_TILES = 200
+DROP_SEARCH_DISTANCE = 7
+
 
 class ZoneState:
     def __init__(
@@ -53,23 +58,9 @@ class ZoneState:
             return resource_id in self._properties.resource_ids
 
         if check_from_tiles:
-            for (
-                zone_tile_type
-            ) in self._zone_map.source.geography.tile_type_positions.keys():
-                tiles_properties = (
-                    self._kernel.game.world_manager.world.tiles_properties
-                )
-                try:
-                    zone_tile_properties: ZoneTileProperties = tiles_properties[
-                        zone_tile_type
-                    ]
-                except KeyError:
-                    continue
-
-                for tile_produce in zone_tile_properties.produce:
-                    if resource_id == tile_produce.resource.id:
-                        return True
-            return False
+            return self._zone_map.source.geography.is_there_resource(
+                resource_id, self._kernel.game.world_manager.world.tiles_properties
+            )
 
         raise Exception("should not be here")
 
@@ -141,13 +132,10 @@ class WorldManager:
     ) -> typing.List[ZoneMapTileProduction]:
         zone_map = self._kernel.tile_maps_by_position[(world_row_i, world_col_i)]
 
-        try:
-            zone_tile_type = typing.cast(
-                typing.Type[ZoneMapTileType],
-                zone_map.source.geography.rows[zone_row_i][zone_col_i],
-            )
-        except IndexError:
-            return []
+        zone_tile_type = typing.cast(
+            typing.Type[ZoneMapTileType],
+            zone_map.source.geography.get_tile_type(zone_row_i, zone_col_i),
+        )
 
         try:
             productions = self._world.tiles_properties[zone_tile_type].produce
@@ -232,83 +220,98 @@ class WorldManager:
             clutter_to_place = clutter_ref * resource_quantity
             clutter_in_one_tile = False
 
-        # FIXME BS NOW: get_traversable_coordinates return an enormous list Oo
-        zone_traversable_tiles = self._kernel.get_traversable_coordinates(
-            world_row_i, world_col_i
-        )
         available_places: typing.List[typing.Tuple[typing.Tuple[int, int], float]] = []
 
+        # Clutter of all tiles which can be inspected, loaded at once
+        stuff_ids_by_position: typing.DefaultDict[
+            typing.Tuple[int, int], typing.List[str]
+        ] = collections.defaultdict(list)
+        stuff_ids_around = self._kernel.stuff_lib.get_zone_stuff_ids_around(
+            world_row_i,
+            world_col_i,
+            start_from_zone_row_i,
+            start_from_zone_col_i,
+            distance=DROP_SEARCH_DISTANCE,
+        )
+        for zone_row_i, zone_col_i, stuff_id_ in stuff_ids_around:
+            stuff_ids_by_position[(zone_row_i, zone_col_i)].append(stuff_id_)
+        resources_by_position: typing.DefaultDict[
+            typing.Tuple[int, int], typing.List[typing.Tuple[str, float]]
+        ] = collections.defaultdict(list)
+        quantities_around = self._kernel.resource_lib.get_ground_quantities_around(
+            world_row_i,
+            world_col_i,
+            start_from_zone_row_i,
+            start_from_zone_col_i,
+            distance=DROP_SEARCH_DISTANCE,
+        )
+        for zone_row_i, zone_col_i, resource_id_, quantity in quantities_around:
+            resources_by_position[(zone_row_i, zone_col_i)].append(
+                (resource_id_, quantity)
+            )
+
         walker = square_walker(start_from_zone_row_i, start_from_zone_col_i)
         max_counter = 0
         while clutter_to_place:
             max_counter += 1
 
             # Protection against infinite loop
-            if max_counter > 200:
+            if max_counter > DROP_SEARCH_MAX_TILES:
                 return available_places
 
             # Pick up on tile
             test_tile_row_i, test_tile_col_i = next(walker)
 
             # Accept this tile only if can be walked
-            if (test_tile_row_i, test_tile_col_i) not in zone_traversable_tiles:
+            if not self._kernel.is_traversable_coordinate(
+                world_row_i, world_col_i, test_tile_row_i, test_tile_col_i
+            ):
                 continue
 
             # Compute available space on this tile
             tile_used_clutter = 0.0
+            tile_stuff_ids = stuff_ids_by_position.get(
+                (test_tile_row_i, test_tile_col_i), []
+            )
+            tile_resources = resources_by_position.get(
+                (test_tile_row_i, test_tile_col_i), []
+            )
 
-            continue_ = False
-            for tile_stuff in self._kernel.stuff_lib.get_zone_stuffs(
-                world_row_i=world_row_i,
-                world_col_i=world_col_i,
-                zone_row_i=test_tile_row_i,
-                zone_col_i=test_tile_col_i,
-            ):
-                if strict_place:
-                    # In strict mode a stuff take all the place
-                    continue_ = True
-                    continue
+            # In strict mode a stuff take all the place
+            if strict_place and tile_stuff_ids:
+                continue
 
+            for tile_stuff_id in tile_stuff_ids:
                 stuff_properties = (
                     self._kernel.game.stuff_manager.get_stuff_properties_by_id(
-                        tile_stuff.stuff_id
+                        tile_stuff_id
                     )
                 )
                 tile_used_clutter += stuff_properties.clutter
 
-            if continue_:
+            if strict_place and tile_resources and stuff is not None:
+                # In strict mode, a resource here exclude this tile for a stuff deposit
                 continue
 
-            for carried_resource in self._kernel.resource_lib.get_ground_resource(
-                world_row_i=world_row_i,
-                world_col_i=world_col_i,
-                zone_row_i=test_tile_row_i,
-                zone_col_i=test_tile_col_i,
+            if (
+                strict_place
+                and resource_id is not None
+                and any(
+                    tile_resource_id != resource_id
+                    for tile_resource_id, _ in tile_resources
+                )
             ):
-                if strict_place and stuff is not None:
-                    # In strict mode, a resource here exclude this tile for a stuff deposit
-                    continue_ = True
-                    continue
-
-                if (
-                    strict_place
-                    and resource_id is not None
-                    and carried_resource.id != resource_id
-                ):
-                    # In strict mode, a different resource here exclude this tile for a resource deposit
-                    continue_ = True
-                    continue
+                # In strict mode, a different resource here exclude this tile for a resource deposit
+                continue
 
+            for tile_resource_id, tile_resource_quantity in tile_resources:
                 resource_description = self._kernel.game.config.resources[
-                    carried_resource.id
+                    tile_resource_id
                 ]
                 tile_used_clutter += (
-                    resource_description.clutter * carried_resource.quantity
+                    resource_description.clutter * tile_resource_quantity
                 )
 
-            if continue_:
-                continue
-
             # Continue with this tile only if there is enough clutter here
             tile_left_clutter = max(
                 self._kernel.game.config.tile_clutter_capacity - tile_used_clutter, 0.0
@@ -10,26 +10,30 @@ import datetime
 import glob
 import ntpath
 import hashlib
+import numpy
 import os
 import pathlib
+import random
+from sqlalchemy import event
 from sqlalchemy.engine import Engine
 from sqlalchemy.engine import create_engine
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.exc import NoResultFound
 import typing
-from PIL import Image
 
 from rolling.exception import ComponentNotPrepared
 from rolling.exception import NoZoneMapError
 from rolling.game.base import Game
 from rolling.log import kernel_logger
+from rolling.map.cache import ResidentZoneMaps
+from rolling.map.cache import ZoneMapCache
 from rolling.map.legend import WorldMapLegend
 from rolling.map.legend import ZoneMapLegend
+from rolling.map.overlay import BuildOverlay
 from rolling.map.source import WorldMapSource
 from rolling.map.source import ZoneMap
 from rolling.map.source import ZoneMapSource
-from rolling.map.type.property.traversable import traversable_properties
 from rolling.map.type.world import Sea
 from rolling.map.type.world import WorldMapTileType
 import rolling.map.type.zone as zone
@@ -38,6 +42,8 @@ from rolling.model.event import WebSocketEvent
 from rolling.model.meta import TransportType
 from rolling.model.serializer import ZoneEventSerializerFactory
 from rolling.server.action import ActionFactory
+from rolling.server.document.build import BuildDocument
+from rolling.server.document.build import DoorDocument
 from rolling.server.document.character import CharacterDocument
 from rolling.server.document.universe import UniverseStateDocument
 from rolling.server.effect import EffectManager
@@ -55,6 +61,7 @@ from rolling.server.lib.corpse import AnimatedCorpseLib
 from rolling.server.lib.door import DoorLib
 from rolling.server.lib.farming import FarmingLib
 from rolling.server.lib.fight import FightLib
+from rolling.server.lib.job import JobLib
 from rolling.server.lib.message import MessageLib
 from rolling.server.lib.protectorate import ProtectorateLib
 from rolling.server.lib.resource import ResourceLib
@@ -66,14 +73,25 @@ from .server.lib.world import WorldLib
 from rolling.server.lib.zone import ZoneLib
 from rolling.server.world.websocket import WorldEventsManager
 from rolling.server.zone.websocket import ZoneEventsManager
+from rolling.spritesheet import SpritesheetService
+from rolling.tracim.gateway import TracimGateway
 from rolling.trad import GlobalTranslation
 from rolling.util import generate_avatar_illustration_media, generate_loading_media
 from rolling.util import ensure_avatar_medias
 from rolling.server.chat import State as ChatState
 from rolling.cache import RequestCache
+from rolling.server.cache.action_links import ActionLinksCache
+from rolling.server.cache.auth import AuthCache
+from rolling.server.cache.base import listen_session_changes
+from rolling.server.cache.unread_counters import UnreadCountersCache
+from rolling.server.cache.zone import ZoneStateCache
 
 import rrolling
 
+BUILD_OVERLAYS_INFO_KEY = "build_overlays"
+# Random tiles tried before computing all walkable tiles of a zone
+RANDOM_WALKABLE_TRIES = 32
+
 
 @dataclasses.dataclass
 class LpcgConfig:
@@ -107,6 +125,15 @@ class ServerConfig:
     tracim_config: rrolling.tracim.Config
     tracim_common_spaces: typing.List[typing.Tuple[int, str]]
     lpcg_config: LpcgConfig
+    # Compiled zones folder, default is ".cache" folder in zones folder
+    zones_cache: typing.Optional[str] = None
+    # Maximum count of zones kept in memory (zones with connected players are
+    # kept anyway)
+    zones_resident_max: typing.Optional[str] = None
+    # Seconds an authenticated account is kept in memory (0 to disable)
+    auth_cache_ttl: typing.Optional[str] = None
+    # Default count of rolling-server-worker processes
+    job_workers: typing.Optional[str] = None
 
     @classmethod
     def from_config_file_path(
@@ -178,9 +205,7 @@ class Kernel:
             WorldMapSource(self, world_map_str) if world_map_str else None
         )
         # TODO: rename in zone
-        self._tile_maps_by_position: typing.Optional[
-            typing.Dict[typing.Tuple[int, int], ZoneMap]
-        ] = None
+        self._tile_maps_by_position: typing.Optional[ResidentZoneMaps] = None
         self._game: typing.Optional[Game] = None
 
         # Database stuffs
@@ -188,12 +213,25 @@ class Kernel:
         self._server_db_session_maker = None
         self._server_db_engine: typing.Optional[Engine] = None
 
+        # Shared by libs, some of them are created by websocket managers
+        self._action_factory: typing.Optional[ActionFactory] = None
+
         # Websocket managers
         self._server_zone_events_manager = ZoneEventsManager(self, loop=loop)
         self._server_world_events_manager = WorldEventsManager(self, loop=loop)
 
         # Generate tile maps
-        self._tile_maps_by_position: typing.Dict[typing.Tuple[int, int], ZoneMap] = {}
+        self.zone_map_cache = ZoneMapCache(
+            self.server_config.zones_cache
+            or os.path.join(self.server_config.zones, ".cache")
+        )
+        # Zones are loaded at first access, zones with connected sockets are
+        # never evicted
+        self._tile_maps_by_position = ResidentZoneMaps(
+            self.load_zone_map,
+            max_resident=int(self.server_config.zones_resident_max or 256),
+            is_pinned=self._is_zone_pinned,
+        )
         for zone_file_path in glob.glob(
             os.path.join(self.server_config.zones, "*.txt")
         ):
@@ -208,7 +246,6 @@ class Kernel:
         self._character_lib: typing.Optional["CharacterLib"] = None
         self._build_lib: typing.Optional["BuildLib"] = None
         self._effect_manager: typing.Optional["EffectManager"] = None
-        self._action_factory: typing.Optional[ActionFactory] = None
         self._translation = GlobalTranslation()
         self._universe_lib: typing.Optional["UniverseLib"] = None
         self._message_lib: typing.Optional[MessageLib] = None
@@ -223,12 +260,19 @@ class Kernel:
         self._world_lib: typing.Optional[WorldLib] = None
         self._spawn_point_lib: typing.Optional[SpawnPointLib] = None
         self._protectorate_lib: typing.Optional[ProtectorateLib] = None
+        self._job_lib: typing.Optional[JobLib] = None
 
         self.character_spritesheets_generator = (
             rrolling.spritesheets.CharacterSpriteSheetGenerator(
                 self.server_config.lpcg_config.spritesheets
             )
         )
+        self.tracim = TracimGateway(self.server_config.tracim_config)
+        self.spritesheets = SpritesheetService(
+            self.server_config.lpcg_config.spritesheets,
+            DEFAULT_CHARACTER_SPRITESHEETS_IDENTIFIERS,
+            generator=self.character_spritesheets_generator,
+        )
         kernel_logger.info("")
         self._character_spritesheets_identifiers: typing.Optional[
             typing.List[str]
@@ -259,6 +303,11 @@ class Kernel:
         self._caches = collections.defaultdict(
             lambda: ContextVar("RequestCache", default=None)
         )
+        self.zone_state_cache = ZoneStateCache()
+        self.action_links_cache = ActionLinksCache()
+        self.unread_counters_cache = UnreadCountersCache()
+        self.auth_cache = AuthCache(ttl=float(self.server_config.auth_cache_ttl or 30))
+        self._build_overlays: typing.Dict[typing.Tuple[int, int], BuildOverlay] = {}
 
     def cache(self, world_point: WorldPoint, force_new: bool = False) -> "RequestCache":
         if force_new:
@@ -273,6 +322,7 @@ class Kernel:
                 RequestCache(
                     self,
                     world_point,
+                    shared=self.zone_state_cache,
                 )
             )
 
@@ -283,6 +333,8 @@ class Kernel:
             self._server_zone_events_manager.garbage_collector_task(),
             self._server_zone_events_manager.characters_events_task(),
             self._server_world_events_manager.garbage_collector_task(),
+            self.chat_state.sweep_task(),
+            self.tracim.worker_task(),
         ]
 
     def ensure_avatar_medias(self) -> None:
@@ -317,18 +369,35 @@ class Kernel:
                 generate_loading_media(loading_path, stored_file_path)
             self.loadings_medias_names.append(media_name)
 
-    def load_zone_from_file_path(self, zone_file_path: str) -> None:
+    def _get_zone_position(self, zone_file_path: str) -> typing.Tuple[int, int]:
         tile_map_source_file_name = ntpath.basename(zone_file_path)
         row_i, col_i = map(
             int, tile_map_source_file_name.replace(".txt", "").split("-")
         )
-        kernel_logger.debug('Load tile map "{}"'.format(tile_map_source_file_name))
+        return row_i, col_i
 
-        with open(zone_file_path, "r") as f:
-            tile_map_source_raw = f.read()
+    def load_zone_from_file_path(self, zone_file_path: str) -> None:
+        """Declare zone file, it will be (re)loaded at next access"""
+        self._tile_maps_by_position.register(
+            self._get_zone_position(zone_file_path), zone_file_path
+        )
+
+    def _is_zone_pinned(self, position: typing.Tuple[int, int]) -> bool:
+        return self._server_zone_events_manager.has_zone_sockets(*position)
 
-        self._tile_maps_by_position[(row_i, col_i)] = ZoneMap(
-            row_i, col_i, ZoneMapSource(self, tile_map_source_raw)
+    def load_zone_map(self, zone_file_path: str) -> ZoneMap:
+        row_i, col_i = self._get_zone_position(zone_file_path)
+        kernel_logger.debug(f'Load tile map "{ntpath.basename(zone_file_path)}"')
+
+        geography = self.zone_map_cache.load(
+            zone_file_path,
+            self.tile_map_legend,
+            lambda raw_source: ZoneMapSource(self, raw_source).geography,
+        )
+        return ZoneMap(
+            row_i,
+            col_i,
+            ZoneMapSource(self, geography=geography, file_path=zone_file_path),
         )
 
     @property
@@ -452,6 +521,12 @@ class Kernel:
             self._protectorate_lib = ProtectorateLib(self)
         return self._protectorate_lib
 
+    @property
+    def job_lib(self) -> JobLib:
+        if self._job_lib is None:
+            self._job_lib = JobLib(self)
+        return self._job_lib
+
     @property
     def action_factory(self) -> ActionFactory:
         if self._action_factory is None:
@@ -505,7 +580,7 @@ class Kernel:
 
     # TODO: rename into zone
     @property
-    def tile_maps_by_position(self) -> typing.Dict[typing.Tuple[int, int], ZoneMap]:
+    def tile_maps_by_position(self) -> ResidentZoneMaps:
         if self._world_map_source is None:
             raise ComponentNotPrepared(
                 "self._tile_maps_by_position must be prepared before usage"
@@ -595,6 +670,25 @@ class Kernel:
             f"@{self.server_db_host}/{self.server_db_name}"
         )
         self._server_db_session_maker = sessionmaker(bind=self._server_db_engine)
+        listen_session_changes(
+            self._server_db_session_maker,
+            [
+                self.zone_state_cache,
+                self.auth_cache,
+                self.action_links_cache,
+                self.unread_counters_cache,
+            ],
+        )
+        event.listen(
+            self._server_db_session_maker,
+            "after_commit",
+            self._on_server_db_session_commit,
+        )
+        event.listen(
+            self._server_db_session_maker,
+            "after_soft_rollback",
+            self._on_server_db_session_rollback,
+        )
         ServerSideDocument.metadata.create_all(self._server_db_engine)
 
     def init(self) -> None:
@@ -636,9 +730,84 @@ class Kernel:
             kernel_logger.exc(f"Reload configuration fail: {str(exc)}")
             return
 
-        self._game = game
+        self.set_game(game)
         kernel_logger.info("Reload configuration OK")
 
+    def set_game(self, game: Game) -> None:
+        """Use given game config and forget everything computed from previous one"""
+        self._game = game
+        self.action_factory.reload()
+        self.zone_state_cache.clear()
+        self.action_links_cache.clear()
+        self._build_overlays.clear()
+
+    def get_build_overlay(self, world_row_i: int, world_col_i: int) -> BuildOverlay:
+        try:
+            return self._build_overlays[(world_row_i, world_col_i)]
+        except KeyError:
+            pass
+
+        geography = self.get_tile_map(world_row_i, world_col_i).source.geography
+        overlay = BuildOverlay(geography.height, geography.width)
+        for zone_row_i, zone_col_i, build_id in self.build_lib.get_zone_query(
+            world_row_i=world_row_i, world_col_i=world_col_i
+        ).with_entities(
+            BuildDocument.zone_row_i, BuildDocument.zone_col_i, BuildDocument.build_id
+        ):
+            overlay.add(zone_row_i, zone_col_i, self.game.config.builds[build_id])
+        for zone_row_i, zone_col_i in (
+            self.build_lib.get_zone_query(
+                world_row_i=world_row_i, world_col_i=world_col_i
+            )
+            .join(DoorDocument, DoorDocument.build_id == BuildDocument.id)
+            .with_entities(BuildDocument.zone_row_i, BuildDocument.zone_col_i)
+        ):
+            overlay.add_door_rule(zone_row_i, zone_col_i)
+
+        self._build_overlays[(world_row_i, world_col_i)] = overlay
+        return overlay
+
+    def _get_changed_build_overlay(
+        self, build_doc: BuildDocument
+    ) -> typing.Optional[BuildOverlay]:
+        world_point = (build_doc.world_row_i, build_doc.world_col_i)
+        overlay = self._build_overlays.get(world_point)
+        if overlay is not None:
+            # Forget it if session is rollback, see _on_server_db_session_rollback
+            session_info = self.server_db_session.info
+            session_info.setdefault(BUILD_OVERLAYS_INFO_KEY, set()).add(world_point)
+        return overlay
+
+    def update_build_overlay(self, build_doc: BuildDocument, count: int) -> None:
+        """Count a placed (count=1) or deleted (count=-1) build in build overlay
+        of its zone, if loaded"""
+        overlay = self._get_changed_build_overlay(build_doc)
+        if overlay is not None:
+            overlay.add(
+                build_doc.zone_row_i,
+                build_doc.zone_col_i,
+                self.game.config.builds[build_doc.build_id],
+                count=count,
+            )
+
+    def update_door_rules_overlay(self, build_doc: BuildDocument, count: int) -> None:
+        """Count a created (count=1) or deleted (count=-1) door rule in build
+        overlay of its zone, if loaded"""
+        overlay = self._get_changed_build_overlay(build_doc)
+        if overlay is not None:
+            overlay.add_door_rule(
+                build_doc.zone_row_i, build_doc.zone_col_i, count=count
+            )
+
+    def _on_server_db_session_commit(self, session: Session) -> None:
+        session.info.pop(BUILD_OVERLAYS_INFO_KEY, None)
+
+    def _on_server_db_session_rollback(
+        self, session: Session, previous_transaction: typing.Any
+    ) -> None:
+        for world_point in session.info.pop(BUILD_OVERLAYS_INFO_KEY, ()):
+            self._build_overlays.pop(world_point, None)
+
     def is_buildable_coordinate(
         self,
         world_row_i: int,
@@ -648,20 +817,14 @@ class Kernel:
         for_build_id: str,
     ) -> bool:
         build_description = self.game.config.builds[for_build_id]
-        tile_type: typing.Type[ZoneMapTileType] = self.get_tile_map(
-            world_row_i, world_col_i
-        ).source.geography.get_tile_type(zone_row_i, zone_col_i)
-        if not tile_type.permit_build:
+        geography = self.get_tile_map(world_row_i, world_col_i).source.geography
+        if not geography.is_buildable(zone_row_i, zone_col_i):
             return False
 
         # A floor is always buildable (floor replace floor)
-        if not build_description.is_floor and self.build_lib.is_there_build_here(
-            world_row_i=world_row_i,
-            world_col_i=world_col_i,
-            zone_row_i=zone_row_i,
-            zone_col_i=zone_col_i,
-            is_floor=False,
-        ):
+        if not build_description.is_floor and self.get_build_overlay(
+            world_row_i, world_col_i
+        ).is_there_not_floor_build(zone_row_i, zone_col_i):
             return False
 
         if self.character_lib.is_there_character_here(
@@ -677,41 +840,79 @@ class Kernel:
 
         return True
 
-    def get_traversable_coordinates(
-        self, world_row_i: int, world_col_i: int
-    ) -> typing.List[typing.Tuple[int, int]]:
-        available_coordinates: typing.List[typing.Tuple[int, int]] = []
-        build_docs = self.build_lib.get_zone_build(
-            world_row_i=world_row_i, world_col_i=world_col_i
+    def get_traversable_mask(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        transport_type: TransportType = TransportType.WALKING,
+    ) -> numpy.ndarray:
+        geography = self.get_tile_map(world_row_i, world_col_i).source.geography
+        overlay = self.get_build_overlay(world_row_i, world_col_i)
+        return geography.traversable_mask(transport_type) & (
+            overlay.not_traversable(transport_type) == 0
         )
-        not_traversable_by_builds: typing.List[typing.Tuple[int, int]] = []
-        for build_doc in build_docs:
-            build_description = self.game.config.builds[build_doc.build_id]
-            # TODO: traversable to update here
-            if not build_description.traversable.get(
-                TransportType.WALKING.value, True
-            ) or not build_description.traversable.get(TransportType.WALKING, True):
-                not_traversable_by_builds.append(
-                    (build_doc.zone_row_i, build_doc.zone_col_i)
-                )
 
-        geography = self.tile_maps_by_position[
-            world_row_i, world_col_i
-        ].source.geography
-        for row_i, row in enumerate(geography.rows):
-            for col_i, map_tile_type in enumerate(row):
-                # TODO: traversable to update here
-                if (
-                    traversable_properties[map_tile_type].get(
-                        TransportType.WALKING.value
-                    )
-                    and (row_i, col_i) not in not_traversable_by_builds
-                ):
-                    available_coordinates.append((row_i, col_i))
+    def is_traversable_coordinate(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        zone_row_i: int,
+        zone_col_i: int,
+        transport_type: TransportType = TransportType.WALKING,
+    ) -> bool:
+        geography = self.get_tile_map(world_row_i, world_col_i).source.geography
+        return geography.is_traversable(
+            zone_row_i, zone_col_i, transport_type
+        ) and self.get_build_overlay(world_row_i, world_col_i).is_traversable(
+            zone_row_i, zone_col_i, transport_type
+        )
+
+    def get_walkable_mask(self, world_row_i: int, world_col_i: int) -> numpy.ndarray:
+        """Tiles walkable for anyone (see BuildOverlay.is_walkable)"""
+        overlay = self.get_build_overlay(world_row_i, world_col_i)
+        return self.get_traversable_mask(world_row_i, world_col_i) & (
+            overlay.door_rules() == 0
+        )
+
+    def is_walkable(
+        self, world_row_i: int, world_col_i: int, zone_row_i: int, zone_col_i: int
+    ) -> bool:
+        geography = self.get_tile_map(world_row_i, world_col_i).source.geography
+        overlay = self.get_build_overlay(world_row_i, world_col_i)
+        return geography.is_traversable(zone_row_i, zone_col_i) and overlay.is_walkable(
+            zone_row_i, zone_col_i
+        )
 
-        return available_coordinates
+    def get_random_walkable_coordinate(
+        self, world_row_i: int, world_col_i: int
+    ) -> typing.Optional[typing.Tuple[int, int]]:
+        """Random walkable tile of zone, None if there is none. Random tiles are
+        tried first; all walkable tiles are computed only if they are rare."""
+        geography = self.get_tile_map(world_row_i, world_col_i).source.geography
+        if not geography.height or not geography.width:
+            return None
+
+        for _ in range(RANDOM_WALKABLE_TRIES):
+            zone_row_i = random.randrange(geography.height)
+            zone_col_i = random.randrange(geography.width)
+            if self.is_walkable(world_row_i, world_col_i, zone_row_i, zone_col_i):
+                return zone_row_i, zone_col_i
+
+        walkable_indexes = numpy.flatnonzero(
+            self.get_walkable_mask(world_row_i, world_col_i)
+        )
+        if not walkable_indexes.size:
+            return None
+        zone_row_i, zone_col_i = divmod(
+            int(random.choice(walkable_indexes)), geography.width
+        )
+        return zone_row_i, zone_col_i
 
     async def refresh_characters(self) -> None:
+        # Turn is executed by another process
+        self.zone_state_cache.clear()
+        self.action_links_cache.clear()
+        self.unread_counters_cache.clear()
         for world_row_i, world_row in enumerate(self.world_map_source.geography.rows):
             for world_col_i, _ in enumerate(world_row):
                 character_ids = (
@@ -729,33 +930,8 @@ class Kernel:
                         )
 
     def spritesheet_path(self, identifiers: typing.Optional[str]) -> pathlib.Path:
-        identifiers = identifiers or DEFAULT_CHARACTER_SPRITESHEETS_IDENTIFIERS
-        image_id = hashlib.md5(identifiers.encode()).hexdigest()
-        image_path = pathlib.Path(f"game/media/character_spritesheet_{image_id}.png")
-        if image_path.exists():
-            return image_path
-        self.character_spritesheets_generator.build(
-            identifiers=identifiers,
-            output=str(image_path),
-        )
-        return image_path
-
-    def spritesheet_illustration(self, identifiers: str) -> pathlib.Path:
-        spritesheet_path = self.spritesheet_path(identifiers)
-        image_path = (
-            spritesheet_path.parent / f"{spritesheet_path.name}_illustration.png"
-        )
-        if pathlib.Path(image_path).exists():
-            return image_path
-
-        spritesheet_image = Image.open(spritesheet_path)
-        image = spritesheet_image.crop((0, 640, 0 + 65, 640 + 65))
-        image = image.resize((130, 130))
-        back = Image.new(mode="RGB", size=(768, 300))
-        back.paste(
-            image,
-            ((768 // 2) - (image.width // 2), (300 // 2) - (image.height // 2)),
-        )
-        back.save(image_path)
+        """Spritesheet path, file is rendered in background if needed"""
+        return self.spritesheets.request(identifiers)
 
-        return image_path
+    async def spritesheet_illustration(self, identifiers: str) -> pathlib.Path:
+        return await self.spritesheets.illustration(identifiers)
@@ -0,0 +1,321 @@
+# coding: utf-8
+import collections
+import collections.abc
+import dataclasses
+import hashlib
+import numpy
+import os
+import struct
+import tempfile
+import time
+import typing
+
+from rolling.log import kernel_logger
+from rolling.map.geography import ZoneMapGeography
+from rolling.map.legend import ZoneMapLegend
+from rolling.map.type.zone import ZoneMapTileType
+
+if typing.TYPE_CHECKING:
+    from rolling.map.source import ZoneMap
+
+ZonePosition = typing.Tuple[int, int]
+MAGIC = b"RZMC"
+VERSION = 1
+# magic, version, source mtime (ns), source size, source sha1, height, width,
+# tile types ids length
+HEADER = struct.Struct("<4sHqq20sIII")
+
+
+@dataclasses.dataclass
+class ZoneMapCacheMetrics:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    errors: int = 0
+    load_time: float = 0.0
+
+
+@dataclasses.dataclass
+class _CacheHeader:
+    mtime_ns: int
+    size: int
+    sha1: bytes
+    height: int
+    width: int
+    tile_types: typing.List[typing.Type[ZoneMapTileType]]
+    data_offset: int
+
+
+class ZoneMapCache:
+    """Compiled zone geographies: one binary file per zone source file
+    containing a header (source mtime, size and sha1, shape and tile types ids)
+    followed by the tile ids array. Tile ids are memory mapped on load, so
+    source text is parsed only when the source file changed."""
+
+    def __init__(self, folder: str) -> None:
+        self._folder = folder
+        self.metrics = ZoneMapCacheMetrics()
+
+    def get_cache_file_path(self, source_file_path: str) -> str:
+        file_name = os.path.basename(source_file_path)
+        return os.path.join(self._folder, f"{os.path.splitext(file_name)[0]}.bin")
+
+    def load(
+        self,
+        source_file_path: str,
+        legend: ZoneMapLegend,
+        parse: typing.Callable[[str], ZoneMapGeography],
+    ) -> ZoneMapGeography:
+        started = time.perf_counter()
+        try:
+            return self._load(source_file_path, legend, parse)
+        finally:
+            self.metrics.load_time += time.perf_counter() - started
+
+    def _load(
+        self,
+        source_file_path: str,
+        legend: ZoneMapLegend,
+        parse: typing.Callable[[str], ZoneMapGeography],
+    ) -> ZoneMapGeography:
+        cache_file_path = self.get_cache_file_path(source_file_path)
+        source_stat = os.stat(source_file_path)
+        header = self._read_header(cache_file_path)
+
+        source_raw: typing.Optional[bytes] = None
+        sha1: typing.Optional[bytes] = None
+        if header is not None and (
+            header.mtime_ns != source_stat.st_mtime_ns
+            or header.size != source_stat.st_size
+        ):
+            # Source file touched: it is still valid if content is the same
+            with open(source_file_path, "rb") as f:
+                source_raw = f.read()
+            sha1 = hashlib.sha1(source_raw).digest()
+            if sha1 != header.sha1:
+                header = None
+
+        if header is not None:
+            self.metrics.hits += 1
+            tile_ids = self._map_tile_ids(cache_file_path, header)
+            geography = ZoneMapGeography.from_tile_ids(
+                legend, header.tile_types, tile_ids
+            )
+            if source_raw is not None:
+                self._write(cache_file_path, source_stat, sha1, geography)
+            return geography
+
+        self.metrics.misses += 1
+        if source_raw is None:
+            with open(source_file_path, "rb") as f:
+                source_raw = f.read()
+            sha1 = hashlib.sha1(source_raw).digest()
+
+        geography = parse(source_raw.decode())
+        self._write(cache_file_path, source_stat, sha1, geography)
+        return geography
+
+    def _read_header(self, cache_file_path: str) -> typing.Optional[_CacheHeader]:
+        try:
+            with open(cache_file_path, "rb") as f:
+                (
+                    magic,
+                    version,
+                    mtime_ns,
+                    size,
+                    sha1,
+                    height,
+                    width,
+                    tile_types_length,
+                ) = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC or version != VERSION:
+                    return None
+
+                tile_types_ids = f.read(tile_types_length).decode()
+                tile_types = [
+                    ZoneMapTileType.get_for_id(tile_type_id)
+                    for tile_type_id in tile_types_ids.split("\n")
+                    if tile_types_ids
+                ]
+        except FileNotFoundError:
+            return None
+        except (OSError, struct.error, UnicodeDecodeError, KeyError) as exc:
+            kernel_logger.warning(f"Ignore invalid zone cache {cache_file_path}: {exc}")
+            self.metrics.errors += 1
+            return None
+
+        data_offset = HEADER.size + tile_types_length
+        if os.path.getsize(cache_file_path) != data_offset + height * width:
+            kernel_logger.warning(f"Ignore truncated zone cache {cache_file_path}")
+            self.metrics.errors += 1
+            return None
+
+        return _CacheHeader(
+            mtime_ns=mtime_ns,
+            size=size,
+            sha1=sha1,
+            height=height,
+            width=width,
+            tile_types=tile_types,
+            data_offset=data_offset,
+        )
+
+    def _map_tile_ids(
+        self, cache_file_path: str, header: _CacheHeader
+    ) -> numpy.ndarray:
+        if not header.height or not header.width:
+            return numpy.zeros((header.height, header.width), dtype=numpy.uint8)
+
+        return numpy.memmap(
+            cache_file_path,
+            dtype=numpy.uint8,
+            mode="r",
+            offset=header.data_offset,
+            shape=(header.height, header.width),
+        )
+
+    def _write(
+        self,
+        cache_file_path: str,
+        source_stat: os.stat_result,
+        sha1: bytes,
+        geography: ZoneMapGeography,
+    ) -> None:
+        tile_types = "\n".join(
+            tile_type.id for tile_type in geography.tile_types
+        ).encode()
+        header = HEADER.pack(
+            MAGIC,
+            VERSION,
+            source_stat.st_mtime_ns,
+            source_stat.st_size,
+            sha1,
+            geography.height,
+            geography.width,
+            len(tile_types),
+        )
+
+        try:
+            os.makedirs(self._folder, exist_ok=True)
+            # Replace cache file atomically: a previous version may be mapped
+            file_descriptor, temp_file_path = tempfile.mkstemp(dir=self._folder)
+            try:
+                with os.fdopen(file_descriptor, "wb") as f:
+                    f.write(header)
+                    f.write(tile_types)
+                    f.write(
+                        numpy.ascontiguousarray(
+                            geography.tile_ids, dtype=numpy.uint8
+                        ).tobytes()
+                    )
+                os.replace(temp_file_path, cache_file_path)
+            except BaseException:
+                os.unlink(temp_file_path)
+                raise
+        except OSError as exc:
+            # Cache is an optimization, zone is loaded anyway
+            kernel_logger.warning(
+                f"Unable to write zone cache {cache_file_path}: {exc}"
+            )
+            self.metrics.errors += 1
+            return
+
+        self.metrics.writes += 1
+
+    def stats(self) -> dict:
+        return dataclasses.asdict(self.metrics)
+
+
+@dataclasses.dataclass
+class ResidentZoneMapsMetrics:
+    loads: int = 0
+    evictions: int = 0
+    load_time: float = 0.0
+    load_time_max: float = 0.0
+
+
+class ResidentZoneMaps(collections.abc.Mapping):
+    """Zone maps by position, loaded on first access. At most max_resident
+    zones are kept in memory: least recently used ones are evicted, except
+    pinned ones (see is_pinned)."""
+
+    def __init__(
+        self,
+        load: typing.Callable[[str], "ZoneMap"],
+        max_resident: int = 256,
+        is_pinned: typing.Optional[typing.Callable[[ZonePosition], bool]] = None,
+    ) -> None:
+        self._load = load
+        self._max_resident = max_resident
+        self._is_pinned = is_pinned or (lambda position: False)
+        self._file_paths: typing.Dict[ZonePosition, str] = {}
+        self._resident: "collections.OrderedDict[ZonePosition, ZoneMap]" = (
+            collections.OrderedDict()
+        )
+        self.metrics = ResidentZoneMapsMetrics()
+
+    def register(self, position: ZonePosition, file_path: str) -> None:
+        """Declare zone source file, (re)loaded at next access"""
+        self._file_paths[position] = file_path
+        self._resident.pop(position, None)
+
+    def __getitem__(self, position: ZonePosition) -> "ZoneMap":
+        try:
+            self._resident.move_to_end(position)
+            return self._resident[position]
+        except KeyError:
+            pass
+
+        file_path = self._file_paths[position]
+        started = time.perf_counter()
+        zone_map = self._load(file_path)
+        load_time = time.perf_counter() - started
+        self.metrics.loads += 1
+        self.metrics.load_time += load_time
+        self.metrics.load_time_max = max(self.metrics.load_time_max, load_time)
+
+        self._resident[position] = zone_map
+        self._evict(keep=position)
+        return zone_map
+
+    def __contains__(self, position: object) -> bool:
+        return position in self._file_paths
+
+    def __iter__(self) -> typing.Iterator[ZonePosition]:
+        return iter(self._file_paths)
+
+    def __len__(self) -> int:
+        return len(self._file_paths)
+
+    def is_resident(self, position: ZonePosition) -> bool:
+        return position in self._resident
+
+    def clear(self) -> None:
+        self._resident.clear()
+
+    def _evict(self, keep: ZonePosition) -> None:
+        if len(self._resident) <= self._max_resident:
+            return
+
+        # Oldest first; pinned zones stay resident even if over budget
+        for position in list(self._resident.keys()):
+            if len(self._resident) <= self._max_resident:
+                return
+            if position != keep and not self._is_pinned(position):
+                del self._resident[position]
+                self.metrics.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "zones": len(self._file_paths),
+            "resident": len(self._resident),
+            "max_resident": self._max_resident,
+            "loads": self.metrics.loads,
+            "evictions": self.metrics.evictions,
+            "load_time_avg": (
+                self.metrics.load_time / self.metrics.loads
+                if self.metrics.loads
+                else 0.0
+            ),
+            "load_time_max": self.metrics.load_time_max,
+        }
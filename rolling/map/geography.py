@@ -1,4 +1,5 @@
 # coding: utf-8
+import numpy
 import random
 import typing
 
@@ -6,29 +7,34 @@ from rolling.exception import SourceLoadError
 from rolling.exception import TileTypeNotFound
 from rolling.map.legend import MapLegend
 from rolling.map.type.base import MapTileType
-from rolling.map.type.world import WorldMapTileType
+from rolling.map.type.property.traversable import traversable_properties
 import rolling.map.type.zone as zone
 from rolling.map.type.zone import Nothing
+from rolling.model.meta import TransportType
 from rolling.model.zone import ZoneTileProperties
 
 if typing.TYPE_CHECKING:
     from rolling.kernel import Kernel
 
+TilesProperties = typing.Dict[typing.Type[MapTileType], ZoneTileProperties]
+
 
 class MapGeography:
+    """Geography stored as an uint8 array of tile type ids"""
+
     def __init__(
         self,
         legend: MapLegend,
         raw_lines: typing.List[str],
         missing_right_tile_str: typing.Optional[str] = None,
     ) -> None:
-        self._rows: typing.List[typing.List[typing.Type[WorldMapTileType]]] = []
-        self._tile_type_positions: typing.Dict[
-            typing.Type[MapTileType], typing.List[typing.Tuple[int, int]]
-        ] = {}
         self.legend = legend
+        self._tile_types: typing.List[typing.Type[MapTileType]] = []
+        self._tile_type_ids: typing.Dict[typing.Type[MapTileType], int] = {}
 
         length = self._get_max_length(raw_lines)
+        tile_ids = numpy.zeros((len(raw_lines), length), dtype=numpy.uint8)
+        ids_by_char: typing.Dict[str, int] = {}
         for row_i, raw_line in enumerate(raw_lines):
             if length != len(raw_line) and missing_right_tile_str is None:
                 raise SourceLoadError(
@@ -39,19 +45,60 @@ class MapGeography:
             elif length != len(raw_line) and missing_right_tile_str:
                 raw_line += missing_right_tile_str * (length - len(raw_line))
 
-            row_tile_types: typing.List[WorldMapTileType] = []
+            row_tile_ids = tile_ids[row_i]
             for col_i, char in enumerate(raw_line):
-                char_tile_type = legend.get_type_with_str(char)
-                row_tile_types.append(char_tile_type)
-                if char_tile_type != Nothing:
-                    self._tile_type_positions.setdefault(char_tile_type, []).append(
-                        (row_i, col_i)
+                try:
+                    row_tile_ids[col_i] = ids_by_char[char]
+                except KeyError:
+                    tile_type_id = self._get_tile_type_id(
+                        legend.get_type_with_str(char)
                     )
+                    ids_by_char[char] = tile_type_id
+                    row_tile_ids[col_i] = tile_type_id
+
+        self._set_tile_ids(self._tile_types, tile_ids)
+
+    @classmethod
+    def from_tile_ids(
+        cls,
+        legend: MapLegend,
+        tile_types: typing.List[typing.Type[MapTileType]],
+        tile_ids: numpy.ndarray,
+    ) -> "MapGeography":
+        """Build geography from already parsed tile ids (tile_ids values are
+        tile_types indexes), without parsing source text"""
+        geography = cls.__new__(cls)
+        geography.legend = legend
+        geography._set_tile_ids(tile_types, tile_ids)
+        return geography
 
-            self._rows.append(row_tile_types)
+    def _set_tile_ids(
+        self,
+        tile_types: typing.List[typing.Type[MapTileType]],
+        tile_ids: numpy.ndarray,
+    ) -> None:
+        self._tile_types = list(tile_types)
+        self._tile_type_ids = {
+            tile_type: tile_type_id for tile_type_id, tile_type in enumerate(tile_types)
+        }
+        self._tile_ids = tile_ids
+        self._height, self._width = tile_ids.shape
+        self._rows: typing.Optional[
+            typing.List[typing.List[typing.Type[MapTileType]]]
+        ] = None
+        self._tile_type_positions: typing.Optional[
+            typing.Dict[typing.Type[MapTileType], typing.List[typing.Tuple[int, int]]]
+        ] = None
 
-        self._width = length
-        self._height = len(self._rows)
+    def _get_tile_type_id(self, tile_type: typing.Type[MapTileType]) -> int:
+        try:
+            return self._tile_type_ids[tile_type]
+        except KeyError:
+            if len(self._tile_types) > numpy.iinfo(numpy.uint8).max:
+                raise SourceLoadError("Error loading geography: too much tile types")
+            self._tile_type_ids[tile_type] = len(self._tile_types)
+            self._tile_types.append(tile_type)
+            return self._tile_type_ids[tile_type]
 
     def _get_max_length(self, raw_lines: typing.List[str]) -> int:
         max_length = 0
@@ -60,8 +107,22 @@ class MapGeography:
                 max_length = len(raw_line)
         return max_length
 
+    @property
+    def tile_ids(self) -> numpy.ndarray:
+        return self._tile_ids
+
+    @property
+    def tile_types(self) -> typing.List[typing.Type[MapTileType]]:
+        """Tile types indexed by tile_ids values"""
+        return self._tile_types
+
     @property
     def rows(self) -> typing.List[typing.List[typing.Type[MapTileType]]]:
+        if self._rows is None:
+            self._rows = [
+                [self._tile_types[tile_type_id] for tile_type_id in row]
+                for row in self._tile_ids.tolist()
+            ]
         return self._rows
 
     @property
@@ -76,19 +137,72 @@ class MapGeography:
     def tile_type_positions(
         self,
     ) -> typing.Dict[typing.Type[MapTileType], typing.List[typing.Tuple[int, int]]]:
+        if self._tile_type_positions is None:
+            self._tile_type_positions = {}
+            for tile_type_id, tile_type in enumerate(self._tile_types):
+                if tile_type == Nothing:
+                    continue
+                # Tile type can be known but no more used (see set_tile_type)
+                positions = [
+                    (row_i, col_i)
+                    for row_i, col_i in numpy.argwhere(
+                        self._tile_ids == tile_type_id
+                    ).tolist()
+                ]
+                if positions:
+                    self._tile_type_positions[tile_type] = positions
         return self._tile_type_positions
 
+    def set_tile_type(
+        self, row_i: int, col_i: int, tile_type: typing.Type[MapTileType]
+    ) -> None:
+        """Replace tile type of one tile, keeping computed indexes up to date"""
+        if not self._tile_ids.flags.writeable:
+            # Memory mapped cache file, copy it before first change
+            self._tile_ids = numpy.array(self._tile_ids)
+
+        previous_tile_type = self._tile_types[self._tile_ids[row_i, col_i]]
+        self._tile_ids[row_i, col_i] = self._get_tile_type_id(tile_type)
+        if self._rows is not None:
+            self._rows[row_i][col_i] = tile_type
+        if self._tile_type_positions is not None:
+            if previous_tile_type != Nothing:
+                self._tile_type_positions[previous_tile_type].remove((row_i, col_i))
+                if not self._tile_type_positions[previous_tile_type]:
+                    del self._tile_type_positions[previous_tile_type]
+            if tile_type != Nothing:
+                self._tile_type_positions.setdefault(tile_type, []).append(
+                    (row_i, col_i)
+                )
+        self._tile_type_changed(row_i, col_i, previous_tile_type, tile_type)
+
+    def _tile_type_changed(
+        self,
+        row_i: int,
+        col_i: int,
+        previous_tile_type: typing.Type[MapTileType],
+        tile_type: typing.Type[MapTileType],
+    ) -> None:
+        pass
+
     def get_tile_type(self, row_i: int, col_i: int) -> typing.Type[MapTileType]:
-        if row_i < 0 or col_i < 0:
-            return zone.Nothing
-        if row_i >= len(self.rows):
+        if not self.contains(row_i, col_i):
             return zone.Nothing
 
-        cols = self.rows[row_i]
-        if col_i >= len(cols):
-            return zone.Nothing
+        return self._tile_types[self._tile_ids[row_i, col_i]]
 
-        return cols[col_i]
+    def contains(self, row_i: int, col_i: int) -> bool:
+        return 0 <= row_i < self._height and 0 <= col_i < self._width
+
+    def tile_types_mask(
+        self, predicate: typing.Callable[[typing.Type[MapTileType]], bool]
+    ) -> numpy.ndarray:
+        """Return a boolean array, True where tile type match predicate"""
+        matches = numpy.array(
+            [bool(predicate(tile_type)) for tile_type in self._tile_types] or [False],
+            dtype=bool,
+        )
+        return matches[self._tile_ids]
 
 
 class WorldMapGeography(MapGeography):
@@ -96,23 +210,113 @@ class WorldMapGeography(MapGeography):
 
 
 class ZoneMapGeography(MapGeography):
+    def _set_tile_ids(
+        self,
+        tile_types: typing.List[typing.Type[MapTileType]],
+        tile_ids: numpy.ndarray,
+    ) -> None:
+        super()._set_tile_ids(tile_types, tile_ids)
+        self._traversable_masks: typing.Dict[TransportType, numpy.ndarray] = {
+            transport_type: self.tile_types_mask(
+                lambda tile_type: traversable_properties.get(tile_type, {}).get(
+                    transport_type.value, False
+                )
+            )
+            for transport_type in TransportType
+        }
+        self._buildable_mask = self.tile_types_mask(
+            lambda tile_type: getattr(tile_type, "permit_build", False)
+        )
+        self._resource_positions: typing.Optional[
+            typing.Dict[str, typing.List[typing.Tuple[int, int]]]
+        ] = None
+        self._resource_positions_for: typing.Optional[TilesProperties] = None
+
+    def _tile_type_changed(
+        self,
+        row_i: int,
+        col_i: int,
+        previous_tile_type: typing.Type[MapTileType],
+        tile_type: typing.Type[MapTileType],
+    ) -> None:
+        for transport_type, traversable_mask in self._traversable_masks.items():
+            traversable_mask[row_i, col_i] = traversable_properties.get(
+                tile_type, {}
+            ).get(transport_type.value, False)
+        self._buildable_mask[row_i, col_i] = getattr(tile_type, "permit_build", False)
+
+        if self._resource_positions is not None:
+            for resource_id in self._produced_resource_ids(previous_tile_type):
+                self._resource_positions[resource_id].remove((row_i, col_i))
+                if not self._resource_positions[resource_id]:
+                    del self._resource_positions[resource_id]
+            for resource_id in self._produced_resource_ids(tile_type):
+                self._resource_positions.setdefault(resource_id, []).append(
+                    (row_i, col_i)
+                )
+
+    def _produced_resource_ids(
+        self, tile_type: typing.Type[MapTileType]
+    ) -> typing.Set[str]:
+        if tile_type == Nothing:
+            return set()
+        try:
+            tile_properties = self._resource_positions_for[tile_type]
+        except KeyError:
+            return set()
+        return {production.resource.id for production in tile_properties.produce}
+
+    def get_resource_positions(
+        self, tiles_properties: TilesProperties
+    ) -> typing.Dict[str, typing.List[typing.Tuple[int, int]]]:
+        """Positions of tiles producing each resource id. Computed once for given
+        tiles properties (game config), then updated by set_tile_type."""
+        if (
+            self._resource_positions is None
+            or self._resource_positions_for is not tiles_properties
+        ):
+            self._resource_positions_for = tiles_properties
+            self._resource_positions = {}
+            for tile_type, tile_positions in self.tile_type_positions.items():
+                if not tile_positions:
+                    continue
+                for resource_id in self._produced_resource_ids(tile_type):
+                    self._resource_positions.setdefault(resource_id, []).extend(
+                        tile_positions
+                    )
+        return self._resource_positions
+
+    def is_there_resource(
+        self, resource_id: str, tiles_properties: TilesProperties
+    ) -> bool:
+        return resource_id in self.get_resource_positions(tiles_properties)
+
+    def traversable_mask(
+        self, transport_type: TransportType = TransportType.WALKING
+    ) -> numpy.ndarray:
+        return self._traversable_masks[transport_type]
+
+    def is_traversable(
+        self,
+        row_i: int,
+        col_i: int,
+        transport_type: TransportType = TransportType.WALKING,
+    ) -> bool:
+        return self.contains(row_i, col_i) and bool(
+            self._traversable_masks[transport_type][row_i, col_i]
+        )
+
+    def is_buildable(self, row_i: int, col_i: int) -> bool:
+        return self.contains(row_i, col_i) and bool(self._buildable_mask[row_i, col_i])
+
     def get_random_tile_position_containing_resource(
         self, resource_id: str, kernel: "Kernel"
     ) -> typing.Tuple[int, int]:
-        for tile_type, tile_positions in self.tile_type_positions.items():
-            tiles_properties = kernel.game.world_manager.world.tiles_properties
-            try:
-                tile_properties: ZoneTileProperties = tiles_properties[tile_type]
-            except KeyError:
-                continue
-            try:
-                next(
-                    produce.resource.id
-                    for produce in tile_properties.produce
-                    if produce.resource.id == resource_id
-                )
-                return random.choice(self.tile_type_positions[tile_type])
-            except StopIteration:
-                pass
-
-        raise TileTypeNotFound(f"No tile contaning {resource_id} in this zone")
+        try:
+            return random.choice(
+                self.get_resource_positions(
+                    kernel.game.world_manager.world.tiles_properties
+                )[resource_id]
+            )
+        except KeyError:
+            raise TileTypeNotFound(f"No tile contaning {resource_id} in this zone")
@@ -0,0 +1,85 @@
+# coding: utf-8
+import numpy
+import typing
+
+from rolling.model.meta import TransportType
+
+if typing.TYPE_CHECKING:
+    from rolling.model.build import BuildDescription
+
+
+def build_is_traversable(
+    build_description: "BuildDescription", transport_type: TransportType
+) -> bool:
+    # TODO: traversable to update here
+    return build_description.traversable.get(
+        transport_type.value, True
+    ) and build_description.traversable.get(transport_type, True)
+
+
+class BuildOverlay:
+    """Count, for each zone tile, the builds blocking transport types, the
+    builds which are not floors and the door rules. Updated incrementally when
+    builds are placed or deleted and when door rules are set or removed."""
+
+    def __init__(self, height: int, width: int) -> None:
+        self._height = height
+        self._width = width
+        self._not_traversable: typing.Dict[TransportType, numpy.ndarray] = {
+            transport_type: numpy.zeros((height, width), dtype=numpy.int16)
+            for transport_type in TransportType
+        }
+        self._not_floor = numpy.zeros((height, width), dtype=numpy.int16)
+        self._door_rules = numpy.zeros((height, width), dtype=numpy.int16)
+
+    def add(
+        self,
+        zone_row_i: int,
+        zone_col_i: int,
+        build_description: "BuildDescription",
+        count: int = 1,
+    ) -> None:
+        """Count a build on tile (use count=-1 to count a build removal)"""
+        if not (0 <= zone_row_i < self._height and 0 <= zone_col_i < self._width):
+            return
+
+        for transport_type, not_traversable in self._not_traversable.items():
+            if not build_is_traversable(build_description, transport_type):
+                not_traversable[zone_row_i, zone_col_i] += count
+
+        if not build_description.is_floor:
+            self._not_floor[zone_row_i, zone_col_i] += count
+
+    def add_door_rule(self, zone_row_i: int, zone_col_i: int, count: int = 1) -> None:
+        """Count a door rule on tile (use count=-1 to count a rule removal)"""
+        if not (0 <= zone_row_i < self._height and 0 <= zone_col_i < self._width):
+            return
+
+        self._door_rules[zone_row_i, zone_col_i] += count
+
+    def not_traversable(
+        self, transport_type: TransportType = TransportType.WALKING
+    ) -> numpy.ndarray:
+        return self._not_traversable[transport_type]
+
+    def is_traversable(
+        self,
+        zone_row_i: int,
+        zone_col_i: int,
+        transport_type: TransportType = TransportType.WALKING,
+    ) -> bool:
+        return not self._not_traversable[transport_type][zone_row_i, zone_col_i]
+
+    def is_there_not_floor_build(self, zone_row_i: int, zone_col_i: int) -> bool:
+        return bool(self._not_floor[zone_row_i, zone_col_i])
+
+    def door_rules(self) -> numpy.ndarray:
+        return self._door_rules
+
+    def is_walkable(self, zone_row_i: int, zone_col_i: int) -> bool:
+        """Walkable for anyone: not blocked by a build nor by a door which may
+        be locked (door locks depend on characters, see DoorLib)"""
+        return not (
+            self._not_traversable[TransportType.WALKING][zone_row_i, zone_col_i]
+            or self._door_rules[zone_row_i, zone_col_i]
+        )
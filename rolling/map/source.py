@@ -110,13 +110,26 @@ class WorldMapSource(MapSource):
 
 
 class ZoneMapSource(MapSource):
-    def __init__(self, kernel: "Kernel", raw_source: str) -> None:
+    def __init__(
+        self,
+        kernel: "Kernel",
+        raw_source: typing.Optional[str] = None,
+        geography: typing.Optional[ZoneMapGeography] = None,
+        file_path: typing.Optional[str] = None,
+    ) -> None:
+        """When file_path is given, raw source is not kept in memory but read
+        from file when needed"""
         super().__init__(kernel)
+        assert raw_source is not None or file_path is not None
         self._raw_source = raw_source
-        self._geography = self._create_geography(raw_source)
+        self._file_path = file_path
+        self._geography = geography or self._create_geography(self.raw_source)
 
     @property
     def raw_source(self) -> str:
+        if self._raw_source is None:
+            with open(self._file_path, "r") as f:
+                return f.read()
         return self._raw_source
 
     @property
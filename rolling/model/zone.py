@@ -38,6 +38,14 @@ class ZoneTileTypeModel(TileTypeModel):
     hump: typing.Optional[typing.Dict[str, str]]
 
 
+@dataclasses.dataclass(frozen=True)
+class NeighbourhoodCounts:
+    stuff_count: int
+    resource_count: int
+    build_count: int
+    character_count: int
+
+
 @dataclasses.dataclass(frozen=True)
 class GetZonePathModel:
     row_i: int = number_field(cast_on_load=True)
@@ -2,6 +2,7 @@
 import typing
 
 from guilang.description import Description
+from rolling.action.base import Action
 from rolling.action.base import CharacterAction
 from rolling.action.base import WithBuildAction
 from rolling.action.base import WithCharacterAction
@@ -205,111 +206,105 @@ class ActionFactory:
             ActionType.POWER_OFF_BUILD: PowerOffBuildAction,
             ActionType.DESTROY_BUILD: DestroyBuildAction,
         }
+        # Actions are stateless: one instance per action description, built at
+        # first use from game config
+        self._instances: typing.Optional[
+            typing.Dict[typing.Tuple[ActionType, str], Action]
+        ] = None
+        self._instances_by_type: typing.Dict[ActionType, typing.List[Action]] = {}
+
+    def reload(self) -> None:
+        """Forget action instances, they will be built again from (reloaded)
+        game config"""
+        self._instances = None
+        self._instances_by_type = {}
+
+    def _get_instances(
+        self,
+    ) -> typing.Dict[typing.Tuple[ActionType, str], Action]:
+        if self._instances is None:
+            instances: typing.Dict[typing.Tuple[ActionType, str], Action] = {}
+            instances_by_type: typing.Dict[ActionType, typing.List[Action]] = {}
+            for action_type, action_class in self.actions.items():
+                for action_description in self._kernel.game.config.actions.get(
+                    action_type, []
+                ):
+                    action = action_class(
+                        kernel=self._kernel, description=action_description
+                    )
+                    instances[(action_type, action_description.id)] = action
+                    instances_by_type.setdefault(action_type, []).append(action)
+            self._instances = instances
+            self._instances_by_type = instances_by_type
+        return self._instances
+
+    def _get_action(
+        self,
+        actions: typing.Dict[ActionType, typing.Type[Action]],
+        action_description: "ActionDescriptionModel",
+    ) -> Action:
+        action_type = action_description.action_type
+        action = self._get_instances().get((action_type, action_description.id))
+        if action is None or action.description is not action_description:
+            # Description which is not (or no more) part of game config
+            return actions[action_type](self._kernel, description=action_description)
+        return action
+
+    def _get_all_actions(
+        self,
+        actions: typing.Dict[ActionType, typing.Type[Action]],
+        filter_action_types: typing.Optional[typing.List[str]] = None,
+    ) -> typing.List[Action]:
+        self._get_instances()
+        return [
+            action
+            for action_type in actions
+            if filter_action_types is None or action_type.value in filter_action_types
+            for action in self._instances_by_type.get(action_type, [])
+        ]
 
     def get_with_stuff_action(
         self, action_description: "ActionDescriptionModel"
     ) -> WithStuffAction:
-        return self._with_stuff_actions[action_description.action_type](
-            self._kernel, description=action_description
-        )
+        return self._get_action(self._with_stuff_actions, action_description)
 
     def get_with_resource_action(
         self, action_description: "ActionDescriptionModel"
     ) -> WithResourceAction:
-        return self._with_resource_actions[action_description.action_type](
-            self._kernel, description=action_description
-        )
+        return self._get_action(self._with_resource_actions, action_description)
 
     def get_character_action(
         self, action_description: "ActionDescriptionModel"
     ) -> CharacterAction:
-        return self._character_actions[action_description.action_type](
-            self._kernel, description=action_description
-        )
+        return self._get_action(self._character_actions, action_description)
 
     def get_build_action(
         self, action_description: "ActionDescriptionModel"
     ) -> CharacterAction:
-        return self._build_actions[action_description.action_type](
-            self._kernel, description=action_description
-        )
+        return self._get_action(self._build_actions, action_description)
 
     def get_with_build_action(
         self, action_description: "ActionDescriptionModel"
     ) -> WithBuildAction:
-        return self._with_build_actions[action_description.action_type](
-            self._kernel, description=action_description
-        )
+        return self._get_action(self._with_build_actions, action_description)
 
     def get_all_character_actions(
         self,
         filter_action_types: typing.Optional[typing.List[str]] = None,
     ) -> typing.List[CharacterAction]:
-        actions: typing.List[CharacterAction] = []
-
-        for action_type, action_class in self._character_actions.items():
-            if (
-                filter_action_types is not None
-                and action_type.value not in filter_action_types
-            ):
-                continue
-
-            for action_description in self._kernel.game.config.actions.get(
-                action_type, []
-            ):
-                actions.append(
-                    action_class(kernel=self._kernel, description=action_description)
-                )
-
-        return actions
+        return self._get_all_actions(self._character_actions, filter_action_types)
 
     def get_all_build_actions(self) -> typing.List[CharacterAction]:
-        actions: typing.List[CharacterAction] = []
-
-        for action_type, action_class in self._build_actions.items():
-            for action_description in self._kernel.game.config.actions.get(
-                action_type, []
-            ):
-                actions.append(
-                    action_class(kernel=self._kernel, description=action_description)
-                )
-
-        return actions
+        return self._get_all_actions(self._build_actions)
 
     def get_all_with_build_actions(
         self,
         filter_action_types: typing.Optional[typing.List[str]] = None,
     ) -> typing.List[WithBuildAction]:
-        actions: typing.List[WithBuildAction] = []
-
-        for action_type, action_class in self._with_build_actions.items():
-            if (
-                filter_action_types is not None
-                and action_type.value not in filter_action_types
-            ):
-                continue
-
-            for action_description in self._kernel.game.config.actions.get(
-                action_type, []
-            ):
-                actions.append(
-                    action_class(kernel=self._kernel, description=action_description)
-                )
-
-        return actions
+        return self._get_all_actions(self._with_build_actions, filter_action_types)
 
     def get_all_with_character_actions(self) -> typing.List[WithCharacterAction]:
-        actions: typing.List[WithCharacterAction] = []
-
-        for action_type, action_class in self._with_character_actions.items():
-            for action_description in self._kernel.game.config.actions.get(
-                action_type, []
-            ):
-                actions.append(
-                    action_class(kernel=self._kernel, description=action_description)
-                )
-
-        return actions
+        return self._get_all_actions(self._with_character_actions)
 
     def create_action(
         self,
@@ -322,24 +317,13 @@ class ActionFactory:
         CharacterAction,
         WithResourceAction,
     ]:
-        if (
-            action_type in self._with_stuff_actions
-            or action_type in self._with_resource_actions
-            or action_type in self._character_actions
-            or action_type in self._build_actions
-            or action_type in self._with_build_actions
-            or action_type in self._with_character_actions
-        ):
-            for action_description in self._kernel.game.config.actions.get(
-                action_type, []
-            ):
-                if (
-                    action_description_id is None
-                    or action_description.id == action_description_id
-                ):
-                    return self.actions[action_type](
-                        self._kernel, description=action_description
-                    )
+        instances = self._get_instances()
+        if action_description_id is None:
+            actions = self._instances_by_type.get(action_type)
+            if actions:
+                return actions[0]
+        elif (action_type, action_description_id) in instances:
+            return instances[(action_type, action_description_id)]
 
         raise NotImplementedError(f"Unknown {action_description_id}:{action_type}")
 
@@ -6,8 +6,6 @@ from aiohttp.web_middlewares import middleware
 from aiohttp.web_request import Request
 from aiohttp.web_response import Response
 import base64
-import json
-import serpyco
 
 from guilang.description import Description
 from rolling.exception import AccountNotFound
@@ -28,6 +26,7 @@ from rolling.server.controller.world import WorldController
 from rolling.server.controller.zone import ZoneController
 from rolling.server.event import ThereIsAroundProcessor
 from rolling.server.lib.character import CharacterLib
+from rolling.server.processor import description_decorator
 
 if typing.TYPE_CHECKING:
     from rolling.kernel import Kernel
@@ -42,7 +41,6 @@ def get_application(
     serve_static_files: typing.Optional[str] = None,
 ) -> Application:
     character_lib = CharacterLib(kernel)
-    description_serializer = serpyco.Serializer(Description)
 
     @middleware
     async def auth(request: Request, handler):
@@ -102,7 +100,7 @@ def get_application(
                     except (KeyError, IndexError, ValueError):
                         return response_401
                     try:
-                        account = kernel.account_lib.get_account_for_credentials(
+                        principal = kernel.account_lib.authenticate_credentials(
                             login=login, password=password
                         )
                     except AccountNotFound:
@@ -114,7 +112,7 @@ def get_application(
                         return response_401
 
                     try:
-                        account = kernel.account_lib.get_account_for_token(token)
+                        principal = kernel.account_lib.authenticate_token(token)
                     except AccountNotFound:
                         return response_401
                 else:
@@ -122,8 +120,8 @@ def get_application(
             else:
                 return response_401
 
-            request["account_id"] = account.id
-            request["account_character_id"] = account.current_character_id
+            request["account_id"] = principal.account_id
+            request["account_character_id"] = principal.current_character_id
 
         return await handler(request)
 
@@ -134,38 +132,29 @@ def get_application(
         if not account_character_id:
             return await handler(request)
 
-        response = await handler(request)
-
-        if "application/json" != response.headers.get("Content-Type"):
-            return response
-
-        body_as_json = json.loads(response.body._value)
-        try:
-            description = description_serializer.load(body_as_json)
-        except serpyco.ValidationError:
-            return response
+        def set_character_ap(description: Description) -> None:
+            action_points = character_lib.get_action_points(account_character_id)
+            if action_points is not None:
+                description.character_ap = str(round(action_points, 1))
 
-        # Description is VERY permissive, consider is not a description if no title
-        if not description.title:
-            return response
-
-        character = character_lib.get(account_character_id)
-        description.character_ap = str(round(character.action_points, 1))
-
-        new_response = Response(
-            body=description_serializer.dump_json(description),
-            status=response.status,
-            content_type="application/json",
-        )
-        new_response._cookies = response._cookies
-        return new_response
+        with description_decorator(set_character_ap):
+            return await handler(request)
 
     @middleware
     async def quick_actions(request: Request, handler):
         account_character_id = request.get("account_character_id")
-        response = await handler(request)
-
         action_uuid = request.query.get("action_uuid", None)
+
+        if action_uuid is None:
+            response = await handler(request)
+        else:
+
+            def set_action_uuid(description: Description) -> None:
+                description.action_uuid = action_uuid
+
+            with description_decorator(set_action_uuid):
+                response = await handler(request)
+
         is_quick_action = request.query.get("quick_action", "0") == "1"
         disable_resend_quick_actions = (
             request.query.get("disable_resend_quick_actions", "0") == "1"
@@ -192,24 +181,6 @@ def get_application(
                     explode_take=explode_take,
                 )
 
-        if action_uuid is not None:
-            body_as_json = json.loads(response.body._value)
-            try:
-                description = description_serializer.load(body_as_json)
-            except serpyco.ValidationError:
-                return response
-
-            # Description is VERY permissive, consider is not a description if no title
-            if not description.title:
-                return response
-
-            description.action_uuid = action_uuid
-            return Response(
-                body=description_serializer.dump_json(description),
-                status=response.status,
-                content_type="application/json",
-            )
-
         return response
 
     @middleware
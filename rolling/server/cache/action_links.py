@@ -0,0 +1,125 @@
+# coding: utf-8
+import copy
+import dataclasses
+import itertools
+import typing
+
+from sqlalchemy.orm import Session
+
+from rolling.server.cache.base import VersionedCache
+from rolling.server.cache.base import changed_values
+
+if typing.TYPE_CHECKING:
+    from rolling.types import WorldPoint
+
+_ALL_ZONES = None
+
+
+@dataclasses.dataclass
+class ActionLinksCacheCounters:
+    hits: int = 0
+    misses: int = 0
+    outdated: int = 0
+    bypassed: int = 0
+    zone_bumps: int = 0
+    global_bumps: int = 0
+
+
+# Tables which never change available actions
+_ACTION_LINKS_IGNORED_TABLES = {
+    "account",
+    "account_token",
+    "conversation_participant",
+    "event",
+    "image",
+    "message",
+    "story_page",
+    "zone_message_cursor",
+}
+_ACTION_LINKS_PENDING_INFO_KEY = "action_links_cache_pending"
+
+
+class ActionLinksCache(VersionedCache):
+    """Characters on place action links, valid while their zone version is
+    unchanged. Zone version is bumped by each committed change of a document
+    located in this zone (or of a character of this zone, or of a document
+    of such character). Changes which can't be located bump all zones."""
+
+    pending_info_key = _ACTION_LINKS_PENDING_INFO_KEY
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 30.0) -> None:
+        super().__init__(max_entries, ttl, ActionLinksCacheCounters())
+        # Known characters zones, to locate their documents changes
+        self._character_points: typing.Dict[str, "WorldPoint"] = {}
+
+    def get_or_compute(
+        self,
+        session: Session,
+        character_id: str,
+        world_point: "WorldPoint",
+        key: typing.Hashable,
+        compute: typing.Callable[[], typing.List[typing.Any]],
+    ) -> typing.List[typing.Any]:
+        world_point = (world_point[0], world_point[1])
+        self._character_points[character_id] = world_point
+        # Cached links must not be altered by callers
+        return copy.deepcopy(
+            self._get_or_compute(session, (character_id, key), world_point, compute)
+        )
+
+    def bump(self, world_point: typing.Optional["WorldPoint"] = _ALL_ZONES) -> None:
+        if world_point is not _ALL_ZONES:
+            world_point = (world_point[0], world_point[1])
+            self.counters.zone_bumps += 1
+        self._bump_version(world_point)
+
+    def clear(self) -> None:
+        self._character_points.clear()
+        super().clear()
+
+    def _collect_document(
+        self, state: typing.Any, table_name: str, pending: typing.Set[typing.Any]
+    ) -> None:
+        """Collect changed world points, _ALL_ZONES when document can't be
+        located"""
+        if table_name in _ACTION_LINKS_IGNORED_TABLES:
+            return
+
+        located = False
+        column_keys = state.mapper.columns.keys()
+        if "world_row_i" in column_keys and "world_col_i" in column_keys:
+            rows = changed_values(state, "world_row_i")
+            cols = changed_values(state, "world_col_i")
+            pending.update(itertools.product(rows, cols))
+            located = bool(rows and cols)
+
+        for character_id in self._character_ids(state):
+            pending.add(self._character_points.get(character_id, _ALL_ZONES))
+            located = True
+
+        if not located:
+            pending.add(_ALL_ZONES)
+
+    def _collect_statement(
+        self, table_name: str, pending: typing.Set[typing.Any]
+    ) -> None:
+        if table_name not in _ACTION_LINKS_IGNORED_TABLES:
+            pending.add(_ALL_ZONES)
+
+    def _apply_changes(self, changes: typing.Set[typing.Any]) -> None:
+        if _ALL_ZONES in changes:
+            self.bump()
+            return
+        for world_point in changes:
+            self.bump(world_point)
+
+    @staticmethod
+    def _character_ids(state: typing.Any) -> typing.Set[str]:
+        character_ids = set()
+        for column_key, column in state.mapper.columns.items():
+            if any(
+                foreign_key.target_fullname == "character.id"
+                for foreign_key in column.foreign_keys
+            ):
+                character_ids.update(changed_values(state, column_key))
+        return character_ids
@@ -0,0 +1,136 @@
+# coding: utf-8
+import dataclasses
+import hashlib
+import hmac
+import secrets
+import time
+import typing
+
+from rolling.server.cache.base import SessionChangesListener
+from rolling.server.document.account import AccountAuthTokenDocument
+from rolling.server.document.account import AccountDocument
+
+_AUTH_PENDING_INFO_KEY = "auth_cache_pending"
+
+
+@dataclasses.dataclass(frozen=True)
+class AuthPrincipal:
+    account_id: str
+    current_character_id: typing.Optional[str]
+
+
+@dataclasses.dataclass
+class AuthCacheCounters:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+
+class AuthCache(SessionChangesListener):
+    """Authenticated accounts by token or by credentials digest, kept ttl
+    seconds (and never after token expiration). Entries of an account are
+    invalidated when a session commit touched the account or its tokens."""
+
+    pending_info_key = _AUTH_PENDING_INFO_KEY
+
+    def __init__(self, ttl: float = 30.0) -> None:
+        self._ttl = ttl
+        # Credentials are not kept in memory, only their keyed digest
+        self._secret = secrets.token_bytes(32)
+        self._entries: typing.Dict[bytes, typing.Tuple[float, AuthPrincipal]] = {}
+        self._keys_by_account: typing.Dict[str, typing.Set[bytes]] = {}
+        self._next_sweep = time.monotonic() + ttl
+        self.counters = AuthCacheCounters()
+
+    def token_key(self, token: str) -> bytes:
+        return b"token:" + token.encode()
+
+    def credentials_key(self, login: str, password: str) -> bytes:
+        return (
+            b"basic:"
+            + hmac.new(
+                self._secret, f"{login}\0{password}".encode(), hashlib.sha256
+            ).digest()
+        )
+
+    def get(self, key: bytes) -> typing.Optional[AuthPrincipal]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.counters.misses += 1
+            return None
+
+        self.counters.hits += 1
+        return entry[1]
+
+    def set(
+        self,
+        key: bytes,
+        principal: AuthPrincipal,
+        expire_timestamp: typing.Optional[float] = None,
+    ) -> None:
+        ttl = self._ttl
+        if expire_timestamp is not None:
+            ttl = min(ttl, expire_timestamp - time.time())
+        if ttl <= 0:
+            return
+
+        now = time.monotonic()
+        if now > self._next_sweep:
+            self._sweep(now)
+            self._next_sweep = now + self._ttl
+
+        self._entries[key] = (now + ttl, principal)
+        self._keys_by_account.setdefault(principal.account_id, set()).add(key)
+
+    def invalidate_account(self, account_id: str) -> None:
+        for key in self._keys_by_account.pop(account_id, set()):
+            if self._entries.pop(key, None) is not None:
+                self.counters.invalidations += 1
+
+    def clear(self) -> None:
+        self.counters.invalidations += len(self._entries)
+        self._entries.clear()
+        self._keys_by_account.clear()
+
+    def _sweep(self, now: float) -> None:
+        for key, (expire_at, principal) in list(self._entries.items()):
+            if expire_at < now:
+                del self._entries[key]
+                keys = self._keys_by_account.get(principal.account_id)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._keys_by_account[principal.account_id]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "accounts": len(self._keys_by_account),
+            "ttl": self._ttl,
+            **dataclasses.asdict(self.counters),
+        }
+
+    def _collect_document(
+        self, state: typing.Any, table_name: str, pending: typing.Set[typing.Any]
+    ) -> None:
+        """Collect changed account ids, None means all accounts"""
+        if isinstance(state.object, AccountDocument):
+            pending.add(state.object.id)
+        elif isinstance(state.object, AccountAuthTokenDocument):
+            pending.add(state.object.account_id)
+
+    def _collect_statement(
+        self, table_name: str, pending: typing.Set[typing.Any]
+    ) -> None:
+        if table_name in (
+            AccountDocument.__tablename__,
+            AccountAuthTokenDocument.__tablename__,
+        ):
+            pending.add(None)
+
+    def _apply_changes(self, changes: typing.Set[typing.Any]) -> None:
+        if None in changes:
+            self.clear()
+            return
+        for account_id in changes:
+            self.invalidate_account(account_id)
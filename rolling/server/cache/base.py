@@ -0,0 +1,196 @@
+# coding: utf-8
+import abc
+import collections
+import dataclasses
+import itertools
+import time
+import typing
+
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm import sessionmaker
+
+
+@dataclasses.dataclass
+class DocumentSnapshot:
+    """Session independent copy of a loaded document columns"""
+
+    document_class: type
+    values: typing.Dict[str, typing.Any]
+
+    @classmethod
+    def from_document(cls, document: typing.Any) -> "DocumentSnapshot":
+        state = sqlalchemy.inspect(document)
+        return cls(
+            document_class=type(document),
+            values={
+                attr.key: state.dict[attr.key]
+                for attr in state.mapper.column_attrs
+                if attr.key in state.dict
+            },
+        )
+
+    def merge(self, session: Session) -> typing.Any:
+        document = self.document_class(**self.values)
+        make_transient_to_detached(document)
+        return session.merge(document, load=False)
+
+
+def changed_values(state: typing.Any, key: str) -> typing.Set[typing.Any]:
+    """Current and previous (not None) values of a document attribute"""
+    return set(state.attrs[key].history.sum()) - {None}
+
+
+def is_or_was_none(state: typing.Any, key: str) -> bool:
+    values = state.attrs[key].history.sum()
+    return not values or None in values
+
+
+class SessionChangesListener(abc.ABC):
+    """Base of caches invalidated by session changes. Changes are collected in
+    session info (as hashable items) when documents are flushed or bulk
+    statements executed, then applied when transaction ends."""
+
+    pending_info_key: str
+
+    @abc.abstractmethod
+    def _collect_document(
+        self, state: typing.Any, table_name: str, pending: typing.Set[typing.Any]
+    ) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _collect_statement(
+        self, table_name: str, pending: typing.Set[typing.Any]
+    ) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _apply_changes(self, changes: typing.Set[typing.Any]) -> None:
+        pass
+
+    def _pending(self, session: Session) -> typing.Set[typing.Any]:
+        return session.info.setdefault(self.pending_info_key, set())
+
+
+def listen_session_changes(
+    session_maker: sessionmaker, listeners: typing.Sequence[SessionChangesListener]
+) -> None:
+    """Register listeners on sessions events. Flushed documents are inspected once
+    for all listeners."""
+
+    def on_after_flush(session: Session, flush_context: typing.Any) -> None:
+        pendings = [(listener, listener._pending(session)) for listener in listeners]
+
+        for document in itertools.chain(session.new, session.dirty, session.deleted):
+            state = sqlalchemy.inspect(document)
+            table_name = state.mapper.persist_selectable.name
+            for listener, pending in pendings:
+                listener._collect_document(state, table_name, pending)
+
+    def on_orm_execute(orm_execute_state: typing.Any) -> None:
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+
+        table = getattr(orm_execute_state.statement, "table", None)
+        table_name = getattr(table, "name", None)
+        for listener in listeners:
+            listener._collect_statement(
+                table_name, listener._pending(orm_execute_state.session)
+            )
+
+    def on_transaction_end(session: Session) -> None:
+        for listener in listeners:
+            listener._apply_changes(session.info.pop(listener.pending_info_key, set()))
+
+    event.listen(session_maker, "after_flush", on_after_flush)
+    event.listen(session_maker, "do_orm_execute", on_orm_execute)
+    event.listen(session_maker, "after_commit", on_transaction_end)
+    # Rollback of a savepoint can happen after flushes of the outer
+    # transaction: invalidate too, it is always safe
+    event.listen(session_maker, "after_rollback", on_transaction_end)
+
+
+class VersionedCache(SessionChangesListener):
+    """Base of caches which entries are valid while the version of their scope
+    (and the global version) is unchanged. Entries expire after ttl seconds (to
+    cover writes made by other processes) and least recently used ones are
+    evicted above max_entries."""
+
+    def __init__(self, max_entries: int, ttl: float, counters: typing.Any) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._global_version = 0
+        self._scope_versions: typing.Dict[typing.Hashable, int] = {}
+        self._entries: typing.OrderedDict[
+            typing.Hashable,
+            typing.Tuple[float, typing.Hashable, int, int, typing.Any],
+        ] = collections.OrderedDict()
+        self.counters = counters
+
+    def _get_or_compute(
+        self,
+        session: Session,
+        key: typing.Hashable,
+        scope: typing.Hashable,
+        compute: typing.Callable[[], typing.Any],
+    ) -> typing.Any:
+        # Versions must be read before compute: a change committed meanwhile
+        # makes the entry outdated
+        versions = (self._global_version, self._scope_versions.get(scope, 0))
+
+        entry = self._entries.get(key)
+        if self._has_uncommitted_changes(session):
+            # Cached values don't know these changes. Computed ones are stored
+            # anyway: commit or rollback will bump their version.
+            self.counters.bypassed += 1
+        elif entry is not None:
+            expire_at, entry_scope, global_version, scope_version, value = entry
+            if (
+                expire_at >= time.monotonic()
+                and entry_scope == scope
+                and (global_version, scope_version) == versions
+            ):
+                self._entries.move_to_end(key)
+                self.counters.hits += 1
+                return value
+            self.counters.outdated += 1
+        else:
+            self.counters.misses += 1
+
+        value = compute()
+        self._entries[key] = (time.monotonic() + self._ttl, scope, *versions, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def _has_uncommitted_changes(self, session: Session) -> bool:
+        return bool(
+            session.info.get(self.pending_info_key)
+            or session.new
+            or session.dirty
+            or session.deleted
+        )
+
+    def _bump_version(self, scope: typing.Optional[typing.Hashable]) -> None:
+        """Outdate entries of given scope, or all entries if scope is None"""
+        if scope is None:
+            self._global_version += 1
+            self.counters.global_bumps += 1
+        else:
+            self._scope_versions[scope] = self._scope_versions.get(scope, 0) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bump_version(None)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self._max_entries,
+            "ttl": self._ttl,
+            **dataclasses.asdict(self.counters),
+        }
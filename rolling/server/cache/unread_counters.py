@@ -0,0 +1,133 @@
+# coding: utf-8
+import dataclasses
+import itertools
+import typing
+
+from sqlalchemy.orm import Session
+
+from rolling.server.cache.base import VersionedCache
+from rolling.server.cache.base import changed_values
+
+
+@dataclasses.dataclass(frozen=True)
+class UnreadCounters:
+    events: int = 0
+    zone_messages: int = 0
+    conversation_messages: int = 0
+    affinity_requests: int = 0
+    transactions: int = 0
+    pending_actions: int = 0
+    # Affinities where requests are voted by the character
+    chief_affinity_ids: typing.FrozenSet[int] = frozenset()
+
+
+@dataclasses.dataclass
+class UnreadCountersCacheCounters:
+    hits: int = 0
+    misses: int = 0
+    outdated: int = 0
+    bypassed: int = 0
+    character_bumps: int = 0
+    global_bumps: int = 0
+
+
+# Column of each counted table giving concerned character
+_UNREAD_COUNTERS_CHARACTER_COLUMNS = {
+    "event": "character_id",
+    "message": "recipient_ids",
+    "conversation_participant": "character_id",
+    "zone_message_cursor": "character_id",
+    "offer": "with_character_id",
+    "authorize_pending_action": "authorized_character_id",
+    "character_affinity": "character_id",
+}
+# Column of each counted table giving concerned affinity (and so its chiefs)
+_UNREAD_COUNTERS_AFFINITY_COLUMNS = {
+    "affinity": "id",
+    "character_affinity": "affinity_id",
+}
+_UNREAD_COUNTERS_TABLES = {"pending_action"} | set(
+    itertools.chain(
+        _UNREAD_COUNTERS_CHARACTER_COLUMNS, _UNREAD_COUNTERS_AFFINITY_COLUMNS
+    )
+)
+_UNREAD_COUNTERS_PENDING_INFO_KEY = "unread_counters_cache_pending"
+_ALL_CHARACTERS = None
+
+
+class UnreadCountersCache(VersionedCache):
+    """Characters unread counters (events, messages, transactions, affinity
+    requests, pending actions), valid while their character version is
+    unchanged. Character version is bumped by each committed change of counted
+    documents concerning the character (or an affinity it is chief of). Bulk
+    updates bump all characters."""
+
+    pending_info_key = _UNREAD_COUNTERS_PENDING_INFO_KEY
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 30.0) -> None:
+        super().__init__(max_entries, ttl, UnreadCountersCacheCounters())
+
+    def get_or_compute(
+        self,
+        session: Session,
+        character_id: str,
+        compute: typing.Callable[[], UnreadCounters],
+    ) -> UnreadCounters:
+        return self._get_or_compute(session, character_id, character_id, compute)
+
+    def bump(self, character_id: typing.Optional[str] = _ALL_CHARACTERS) -> None:
+        if character_id is not _ALL_CHARACTERS:
+            self.counters.character_bumps += 1
+        self._bump_version(character_id)
+
+    def _collect_document(
+        self, state: typing.Any, table_name: str, pending: typing.Set[typing.Any]
+    ) -> None:
+        """Collect changes as ("character", id), ("affinity", id) or
+        _ALL_CHARACTERS"""
+        if table_name not in _UNREAD_COUNTERS_TABLES:
+            return
+
+        located = False
+        if column_key := _UNREAD_COUNTERS_CHARACTER_COLUMNS.get(table_name):
+            character_ids = self._character_ids(state, column_key)
+            pending.update(("character", id_) for id_ in character_ids)
+            located = bool(character_ids)
+        if column_key := _UNREAD_COUNTERS_AFFINITY_COLUMNS.get(table_name):
+            affinity_ids = changed_values(state, column_key)
+            pending.update(("affinity", id_) for id_ in affinity_ids)
+            located = located or bool(affinity_ids)
+
+        if not located:
+            pending.add(_ALL_CHARACTERS)
+
+    def _collect_statement(
+        self, table_name: str, pending: typing.Set[typing.Any]
+    ) -> None:
+        if table_name in _UNREAD_COUNTERS_TABLES:
+            pending.add(_ALL_CHARACTERS)
+
+    def _apply_changes(self, changes: typing.Set[typing.Any]) -> None:
+        if _ALL_CHARACTERS in changes:
+            self.bump()
+            return
+
+        character_ids = {id_ for kind, id_ in changes if kind == "character"}
+        if affinity_ids := {id_ for kind, id_ in changes if kind == "affinity"}:
+            character_ids.update(
+                character_id
+                for character_id, entry in self._entries.items()
+                if not entry[-1].chief_affinity_ids.isdisjoint(affinity_ids)
+            )
+        for character_id in character_ids:
+            self.bump(character_id)
+
+    @staticmethod
+    def _character_ids(state: typing.Any, column_key: str) -> typing.Set[str]:
+        character_ids = set()
+        for value in state.attrs[column_key].history.sum():
+            if isinstance(value, (list, tuple)):
+                character_ids.update(value)
+            elif isinstance(value, str):
+                character_ids.add(value)
+        return character_ids
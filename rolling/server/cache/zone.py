@@ -0,0 +1,151 @@
+# coding: utf-8
+import collections
+import dataclasses
+import itertools
+import time
+import typing
+
+from rolling.server.cache.base import SessionChangesListener
+from rolling.server.cache.base import changed_values
+from rolling.server.cache.base import is_or_was_none
+from rolling.server.document.affinity import AffinityProtectorate
+from rolling.server.document.build import BuildDocument
+from rolling.server.document.resource import ResourceDocument
+from rolling.server.document.stuff import StuffDocument
+
+if typing.TYPE_CHECKING:
+    from rolling.types import WorldPoint
+
+GROUND_RESOURCES = "ground_resources"
+GROUND_STUFFS = "ground_stuffs"
+BUILDS = "builds"
+PROTECTORATE = "protectorate"
+ZONE_STATE_KINDS = (GROUND_RESOURCES, GROUND_STUFFS, BUILDS, PROTECTORATE)
+_KINDS_BY_TABLE = {
+    ResourceDocument.__tablename__: GROUND_RESOURCES,
+    StuffDocument.__tablename__: GROUND_STUFFS,
+    BuildDocument.__tablename__: BUILDS,
+    AffinityProtectorate.__tablename__: PROTECTORATE,
+}
+_PENDING_INFO_KEY = "zone_state_cache_pending"
+_ALL_ZONES = None
+
+
+@dataclasses.dataclass
+class ZoneStateCacheCounters:
+    hits: int = 0
+    misses: int = 0
+
+
+class ZoneStateCache(SessionChangesListener):
+    """Process wide cache of zones state (ground resources, ground stuffs, builds
+    and protectorate state). Entries are invalidated when a session commit
+    touched related documents and expire after ttl seconds (to cover writes
+    made by other processes)."""
+
+    pending_info_key = _PENDING_INFO_KEY
+
+    def __init__(self, max_zones: int = 256, ttl: float = 60.0) -> None:
+        self._max_zones = max_zones
+        self._ttl = ttl
+        self._zones: typing.OrderedDict[
+            "WorldPoint", typing.Dict[str, typing.Tuple[float, typing.Any]]
+        ] = collections.OrderedDict()
+        self._counters: typing.Dict[str, ZoneStateCacheCounters] = {
+            kind: ZoneStateCacheCounters() for kind in ZONE_STATE_KINDS
+        }
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, world_point: "WorldPoint", kind: str) -> typing.Optional[typing.Any]:
+        world_point = (world_point[0], world_point[1])
+        entries = self._zones.get(world_point)
+        entry = entries.get(kind) if entries is not None else None
+
+        if entry is None or entry[0] < time.monotonic():
+            self._counters[kind].misses += 1
+            return None
+
+        self._zones.move_to_end(world_point)
+        self._counters[kind].hits += 1
+        return entry[1]
+
+    def set(self, world_point: "WorldPoint", kind: str, value: typing.Any) -> None:
+        world_point = (world_point[0], world_point[1])
+        entries = self._zones.setdefault(world_point, {})
+        entries[kind] = (time.monotonic() + self._ttl, value)
+        self._zones.move_to_end(world_point)
+
+        while len(self._zones) > self._max_zones:
+            self._zones.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate(
+        self, world_point: "WorldPoint", kinds: typing.Iterable[str] = ZONE_STATE_KINDS
+    ) -> None:
+        entries = self._zones.get((world_point[0], world_point[1]))
+        if entries is None:
+            return
+
+        for kind in kinds:
+            if entries.pop(kind, None) is not None:
+                self._invalidations += 1
+
+    def clear(self, kinds: typing.Iterable[str] = ZONE_STATE_KINDS) -> None:
+        for world_point in list(self._zones.keys()):
+            self.invalidate(world_point, kinds=kinds)
+
+    def stats(self) -> dict:
+        return {
+            "zones": len(self._zones),
+            "max_zones": self._max_zones,
+            "ttl": self._ttl,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+            "kinds": {
+                kind: dataclasses.asdict(counters)
+                for kind, counters in self._counters.items()
+            },
+        }
+
+    def _collect_document(
+        self, state: typing.Any, table_name: str, pending: typing.Set[typing.Any]
+    ) -> None:
+        """Collect (world_point, kind) changes, world_point is _ALL_ZONES when
+        document can't be located"""
+        kind = _KINDS_BY_TABLE.get(table_name)
+        if kind is None:
+            return
+
+        if kind in (GROUND_RESOURCES, GROUND_STUFFS) and not (
+            is_or_was_none(state, "carried_by_id")
+            and is_or_was_none(state, "in_built_id")
+        ):
+            return
+
+        rows = changed_values(state, "world_row_i")
+        cols = changed_values(state, "world_col_i")
+        if not rows or not cols:
+            pending.add((_ALL_ZONES, kind))
+            return
+
+        pending.update(
+            (world_point, kind) for world_point in itertools.product(rows, cols)
+        )
+
+    def _collect_statement(
+        self, table_name: str, pending: typing.Set[typing.Any]
+    ) -> None:
+        kind = _KINDS_BY_TABLE.get(table_name)
+        if kind is not None:
+            pending.add((_ALL_ZONES, kind))
+
+    def _apply_changes(self, changes: typing.Set[typing.Any]) -> None:
+        cleared_kinds = {
+            kind for world_point, kind in changes if world_point is _ALL_ZONES
+        }
+        if cleared_kinds:
+            self.clear(kinds=cleared_kinds)
+        for world_point, kind in changes:
+            if world_point is not _ALL_ZONES:
+                self.invalidate(world_point, kinds=[kind])
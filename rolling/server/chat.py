@@ -1,3 +1,4 @@
+import asyncio
 import collections
 import time
 import typing
@@ -17,12 +18,18 @@ if typing.TYPE_CHECKING:
 
 
 class State:
-    def __init__(self, max_age: MessageAge) -> None:
+    """Live chat history: a ring buffer per zone, bounded by messages count and
+    by messages age"""
+
+    _NO_MESSAGES: typing.Tuple[CachedMessage, ...] = ()
+
+    def __init__(self, max_age: MessageAge, max_count: int = 100) -> None:
         self._max_age = max_age
-        self._messages: typing.DefaultDict[
+        self._max_count = max_count
+        self._messages: typing.Dict[
             WorldPoint,
-            typing.List[CachedMessage],
-        ] = collections.defaultdict(list)
+            typing.Deque[CachedMessage],
+        ] = {}
 
     def add_message(
         self,
@@ -30,21 +37,41 @@ class State:
         author_id: MessageAuthorId,
         message: MessageContent,
     ) -> None:
-        self._messages[world_point].append(
-            CachedMessage(time.time(), author_id, message)
-        )
+        try:
+            zone_messages = self._messages[world_point]
+        except KeyError:
+            zone_messages = self._messages[world_point] = collections.deque(
+                maxlen=self._max_count
+            )
+        zone_messages.append(CachedMessage(time.time(), author_id, message))
+
+    def messages(self, world_point: WorldPoint) -> typing.Sequence[CachedMessage]:
+        """Return not too old messages for world point (older are dropped)"""
+        zone_messages = self._messages.get(world_point)
+        if zone_messages is None:
+            return self._NO_MESSAGES
 
-    def messages(self, world_point: WorldPoint) -> typing.List[CachedMessage]:
-        """Return not too old messages for world point and drop older"""
-        now = int(time.time())
-        zone_messages = self._messages[world_point]
-        zone_messages = [
-            message
-            for message in zone_messages
-            if (now - message.timestamp) < self._max_age
-        ]
+        self._expire(zone_messages, time.time())
         return zone_messages
 
+    def sweep(self) -> None:
+        """Drop too old messages of all zones, and forget zones without messages"""
+        now = time.time()
+        for world_point, zone_messages in list(self._messages.items()):
+            self._expire(zone_messages, now)
+            if not zone_messages:
+                del self._messages[world_point]
+
+    async def sweep_task(self, interval: float = 60.0) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def _expire(self, zone_messages: typing.Deque[CachedMessage], now: float) -> None:
+        # Messages are appended in chronological order : older ones are at left
+        while zone_messages and (now - zone_messages[0].timestamp) >= self._max_age:
+            zone_messages.popleft()
+
 
 class LiveChatOperator:
     """Class to instantiate and use to deal with received chat messages"""
@@ -225,9 +225,8 @@ class AccountController(BaseController):
                     tracim_account = self._kernel.character_lib.get_tracim_account(
                         account.current_character_id
                     )
-                    rrolling.tracim.Dealer(
-                        self._kernel.server_config.tracim_config
-                    ).set_account_email(
+                    await self._kernel.tracim.call(
+                        "set_account_email",
                         tracim_account,
                         rrolling.tracim.AccountId(character_doc.tracim_user_id),
                         rrolling.tracim.Email(new_email),
@@ -284,7 +283,7 @@ class AccountController(BaseController):
         return web.Response(status=200, body=token)
 
     @hapic.with_api_doc()
-    def open_character_rp(self, request: Request) -> web.Response:
+    async def open_character_rp(self, request: Request) -> web.Response:
         account = self._kernel.account_lib.get_account_for_id(request["account_id"])
         character = self._kernel.character_lib.get_document(
             request.match_info["character_id"]
@@ -294,9 +293,9 @@ class AccountController(BaseController):
         if character.account_id != account.id:
             return web.Response(status=404)
 
-        session_key = rrolling.tracim.Dealer(
-            self._kernel.server_config.tracim_config
-        ).get_new_session_key(tracim_account)
+        session_key = await self._kernel.tracim.call(
+            "get_new_session_key", tracim_account
+        )
 
         response = web.HTTPTemporaryRedirect(self._kernel.server_config.rp_url)
         response.set_cookie(
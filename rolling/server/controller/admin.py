@@ -27,6 +27,13 @@ class AdminController(BaseController):
                 web.post("/admin/configs", self.configs),
                 web.get("/admin/config/{name}", self.config),
                 web.put("/admin/refresh/characters", self.refresh_characters),
+                web.get("/admin/cache/zones", self.zone_state_cache),
+                web.get("/admin/zones", self.zones),
+                web.get("/admin/websockets", self.websockets),
+                web.get("/admin/tracim", self.tracim),
+                web.get("/admin/cache/auth", self.auth_cache),
+                web.get("/admin/cache/action-links", self.action_links_cache),
+                web.get("/admin/cache/unread", self.unread_counters_cache),
             ]
         )
 
@@ -130,7 +137,7 @@ class AdminController(BaseController):
                 stuff_file.write(backup_stuff_content)
                 world_file.write(backup_world_content)
 
-            self._kernel._game = game
+            self._kernel.set_game(game)
             updated = True
 
         with open(os.path.join(config_folder_path, "game.toml")) as game_file, open(
@@ -154,3 +161,31 @@ class AdminController(BaseController):
     async def refresh_characters(self, request: Request) -> Response:
         await self._kernel.refresh_characters()
         return Response(status=204)
+
+    async def zone_state_cache(self, request: Request) -> Response:
+        return web.json_response(self._kernel.zone_state_cache.stats())
+
+    async def auth_cache(self, request: Request) -> Response:
+        return web.json_response(self._kernel.auth_cache.stats())
+
+    async def action_links_cache(self, request: Request) -> Response:
+        return web.json_response(self._kernel.action_links_cache.stats())
+
+    async def unread_counters_cache(self, request: Request) -> Response:
+        return web.json_response(self._kernel.unread_counters_cache.stats())
+
+    async def zones(self, request: Request) -> Response:
+        return web.json_response(
+            {
+                **self._kernel.tile_maps_by_position.stats(),
+                "compiled": self._kernel.zone_map_cache.stats(),
+            }
+        )
+
+    async def websockets(self, request: Request) -> Response:
+        return web.json_response(
+            self._kernel.server_zone_events_manager.outbound.stats()
+        )
+
+    async def tracim(self, request: Request) -> Response:
+        return web.json_response(self._kernel.tracim.stats())
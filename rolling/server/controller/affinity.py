@@ -251,7 +251,7 @@ class AffinityController(BaseController):
             data = {}
 
         if data.get("name"):
-            if not self._kernel.affinity_lib.name_available(data["name"]):
+            if not await self._kernel.affinity_lib.name_available(data["name"]):
                 raise UserDisplayError(f"Le nom n'est pas disponible")
 
             affinity_doc = self._kernel.affinity_lib.create(
@@ -270,9 +270,8 @@ class AffinityController(BaseController):
                 request=True,  # creator is chief
             )
 
-            space_id = rrolling.tracim.Dealer(
-                self._kernel.server_config.tracim_config
-            ).ensure_space(
+            space_id = await self._kernel.tracim.call(
+                "ensure_space",
                 rrolling.tracim.SpaceName(
                     self._kernel.affinity_lib.affinity_space_name(affinity_doc)
                 ),
@@ -284,9 +283,8 @@ class AffinityController(BaseController):
             character_doc = self._kernel.character_lib.get_document(
                 hapic_data.path.character_id
             )
-            rrolling.tracim.Dealer(
-                self._kernel.server_config.tracim_config
-            ).ensure_space_role(
+            self._kernel.tracim.post(
+                "ensure_space_role",
                 rrolling.tracim.SpaceId(space_id),
                 rrolling.tracim.AccountId(character_doc.tracim_user_id),
                 "contributor",
@@ -552,17 +550,15 @@ class AffinityController(BaseController):
 
                 if tracim_space_member is not None:
                     if tracim_space_member:
-                        rrolling.tracim.Dealer(
-                            self._kernel.server_config.tracim_config
-                        ).ensure_space_role(
+                        self._kernel.tracim.post(
+                            "ensure_space_role",
                             rrolling.tracim.SpaceId(affinity.tracim_space_id),
                             rrolling.tracim.AccountId(character_doc.tracim_user_id),
                             "content-manager",
                         )
                     else:
-                        rrolling.tracim.Dealer(
-                            self._kernel.server_config.tracim_config
-                        ).ensure_not_in_space(
+                        self._kernel.tracim.post(
+                            "ensure_not_in_space",
                             rrolling.tracim.SpaceId(affinity.tracim_space_id),
                             rrolling.tracim.AccountId(character_doc.tracim_user_id),
                         )
@@ -879,17 +875,15 @@ class AffinityController(BaseController):
                             request.character_id
                         )
                         if tracim_space_member:
-                            rrolling.tracim.Dealer(
-                                self._kernel.server_config.tracim_config
-                            ).ensure_space_role(
+                            self._kernel.tracim.post(
+                                "ensure_space_role",
                                 rrolling.tracim.SpaceId(affinity.tracim_space_id),
                                 rrolling.tracim.AccountId(character_doc.tracim_user_id),
                                 "content-manager",
                             )
                         else:
-                            rrolling.tracim.Dealer(
-                                self._kernel.server_config.tracim_config
-                            ).ensure_not_in_space(
+                            self._kernel.tracim.post(
+                                "ensure_not_in_space",
                                 rrolling.tracim.SpaceId(affinity.tracim_space_id),
                                 rrolling.tracim.AccountId(character_doc.tracim_user_id),
                             )
@@ -997,9 +991,8 @@ class AffinityController(BaseController):
             self._kernel.server_db_session.add(relation)
             self._kernel.server_db_session.commit()
 
-            rrolling.tracim.Dealer(
-                self._kernel.server_config.tracim_config
-            ).ensure_not_in_space(
+            self._kernel.tracim.post(
+                "ensure_not_in_space",
                 rrolling.tracim.SpaceId(affinity.tracim_space_id),
                 rrolling.tracim.AccountId(character_doc.tracim_user_id),
             )
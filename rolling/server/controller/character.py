@@ -80,7 +80,6 @@ from rolling.model.stuff import StuffModel
 from rolling.model.zone import MoveZoneInfos
 from rolling.model.zone import ZoneRequiredPlayerData
 from rolling.rolling_types import ActionType
-from rolling.server.action import ActionFactory
 from rolling.server.controller.base import BaseController
 from rolling.server.controller.url import CHARACTER_ACTION
 from rolling.server.controller.url import DESCRIBE_INVENTORY_RESOURCE_ACTION
@@ -103,6 +102,7 @@ from rolling.server.lib.character import (
     CharacterLib,
 )
 from rolling.server.lib.stuff import StuffLib
+from rolling.server.processor import decorate_description
 from rolling.server.transfer import TransferStuffOrResources
 from rolling.util import (
     ILLUSTRATION_AVATAR_PATTERN,
@@ -436,7 +436,7 @@ class CharacterController(BaseController):
         self._character_lib = CharacterLib(self._kernel)
         self._stuff_lib = StuffLib(self._kernel)
         self._effect_manager = EffectManager(self._kernel)
-        self._action_factory = ActionFactory(self._kernel)
+        self._action_factory = self._kernel.action_factory
 
     @hapic.with_api_doc()
     @hapic.input_query(CreateCharacterQueryModel)
@@ -2307,30 +2307,28 @@ class CharacterController(BaseController):
             password=rrolling.tracim.Password(character_doc.tracim_password),
             email=rrolling.tracim.Email(account.email),
         )
-        tracim_user_id = rrolling.tracim.Dealer(
-            self._kernel.server_config.tracim_config
-        ).ensure_account(tracim_account)
+        tracim_user_id = await self._kernel.tracim.call(
+            "ensure_account", tracim_account
+        )
         character_doc.tracim_user_id = tracim_user_id
 
         # Create Tracim space and access
         space_name = self._kernel.character_lib.character_home_space_name(character_doc)
-        tracim_home_space_id = rrolling.tracim.Dealer(
-            self._kernel.server_config.tracim_config
-        ).ensure_space(rrolling.tracim.SpaceName(space_name))
+        tracim_home_space_id = await self._kernel.tracim.call(
+            "ensure_space", rrolling.tracim.SpaceName(space_name)
+        )
         character_doc.tracim_home_space_id = tracim_home_space_id
 
-        rrolling.tracim.Dealer(
-            self._kernel.server_config.tracim_config
-        ).ensure_space_role(
+        self._kernel.tracim.post(
+            "ensure_space_role",
             rrolling.tracim.SpaceId(tracim_home_space_id),
             rrolling.tracim.AccountId(character_doc.tracim_user_id),
             "reader",
         )
 
         for space_id, role in self._kernel.server_config.tracim_common_spaces:
-            rrolling.tracim.Dealer(
-                self._kernel.server_config.tracim_config
-            ).ensure_space_role(
+            self._kernel.tracim.post(
+                "ensure_space_role",
                 rrolling.tracim.SpaceId(space_id),
                 rrolling.tracim.AccountId(character_doc.tracim_user_id),
                 role,
@@ -2345,7 +2343,7 @@ class CharacterController(BaseController):
             message=f"<p>{self._kernel.game.config.create_character_event_story_text}</p>",
         )
 
-        spritesheet_filename = self._kernel.character_lib.spritesheet_filename(
+        spritesheet_filename = await self._kernel.character_lib.render_spritesheet(
             character_doc
         )
         await self._kernel.send_to_zone_sockets(
@@ -2510,7 +2508,7 @@ class CharacterController(BaseController):
                 to_world_row=hapic_data.query.to_world_row,
                 to_world_col=hapic_data.query.to_world_col,
             )
-            spritesheet_filename = self._kernel.character_lib.spritesheet_filename(
+            spritesheet_filename = await self._kernel.character_lib.render_spritesheet(
                 character_doc
             )
             await self._kernel.send_to_zone_sockets(
@@ -3007,13 +3005,13 @@ class CharacterController(BaseController):
             open_new_tab=self._kernel.server_config.rp_url,
         )
 
-        session_key = rrolling.tracim.Dealer(
-            self._kernel.server_config.tracim_config
-        ).get_new_session_key(tracim_account)
+        session_key = await self._kernel.tracim.call(
+            "get_new_session_key", tracim_account
+        )
 
         response = web.Response(
             status=200,
-            body=Description.serializer().dump_json(description),
+            body=Description.serializer().dump_json(decorate_description(description)),
             content_type="application/json",
         )
         response.set_cookie(
@@ -3034,11 +3032,8 @@ class CharacterController(BaseController):
         character_id = hapic_data.path.character_id
         character_doc = self._kernel.character_lib.get_document(character_id)
         tracim_account = self._kernel.character_lib.get_tracim_account(character_id)
-        count = rrolling.tracim.Dealer(
-            self._kernel.server_config.tracim_config
-        ).get_unread_messages_count(
-            tracim_account,
-            rrolling.tracim.AccountId(character_doc.tracim_user_id),
+        count = await self._kernel.tracim.get_unread_messages_count(
+            tracim_account, character_doc.tracim_user_id
         )
 
         response = web.Response(
@@ -3162,8 +3157,8 @@ class CharacterController(BaseController):
             self._kernel.server_db_session.commit()
             reload_zone = True
 
-        illustration_name = self._kernel.spritesheet_illustration(
-            character_identifiers,
+        illustration_name = (
+            await self._kernel.spritesheet_illustration(character_identifiers)
         ).name
         return Description(
             title="Apparence du personnage",
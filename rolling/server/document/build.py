@@ -5,6 +5,7 @@ from sqlalchemy import Column
 from sqlalchemy import DateTime
 from sqlalchemy import Enum
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import Numeric
 from sqlalchemy import String
@@ -16,6 +17,15 @@ from rolling.server.extension import ServerSideDocument as Document
 
 class BuildDocument(Document):
     __tablename__ = "build"
+    __table_args__ = (
+        Index(
+            "build_position_idx",
+            "world_row_i",
+            "world_col_i",
+            "zone_row_i",
+            "zone_col_i",
+        ),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     world_col_i = Column(Integer, nullable=False)
     world_row_i = Column(Integer, nullable=False)
@@ -2,6 +2,7 @@
 from sqlalchemy import Boolean
 from sqlalchemy import Column
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import Numeric
 from sqlalchemy import String
@@ -20,6 +21,15 @@ from rolling.server.extension import ServerSideDocument as Document
 
 class CharacterDocument(CorpseMixin, Document):
     __tablename__ = "character"
+    __table_args__ = (
+        Index(
+            "character_position_idx",
+            "world_row_i",
+            "world_col_i",
+            "zone_row_i",
+            "zone_col_i",
+        ),
+    )
     id = Column(String(255), primary_key=True)
     name = Column(String(255), nullable=False)
 
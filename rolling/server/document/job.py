@@ -0,0 +1,55 @@
+# coding: utf-8
+import datetime
+import enum
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import Enum
+from sqlalchemy import Float
+from sqlalchemy import Index
+from sqlalchemy import Integer
+from sqlalchemy import JSON
+from sqlalchemy import String
+from sqlalchemy import Text
+
+from rolling.server.extension import ServerSideDocument as Document
+
+
+class JobStatus(enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class JobDocument(Document):
+    """A task processed by workers (see rolling-server-worker). Running job is
+    leased to its worker until locked_until: an expired lease (crashed worker)
+    makes it available again."""
+
+    __tablename__ = "job"
+    __table_args__ = (
+        Index("job_status_idx", "status", "id"),
+        Index("job_group_idx", "group_id"),
+    )
+    id = Column(Integer, autoincrement=True, primary_key=True)
+    name = Column(String(255), nullable=False)
+    parameters = Column(JSON, nullable=False, default=dict)
+    # Jobs enqueued together (ex. one by zone), to report their progress
+    group_id = Column(String(255), nullable=True)
+    status = Column(
+        Enum(*[s.value for s in JobStatus], name="job__status"),
+        nullable=False,
+        default=JobStatus.PENDING.value,
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    progress = Column(Float, nullable=False, default=0.0)
+    progress_message = Column(String, nullable=True)
+    # Handler data kept between attempts, to resume after a crash
+    checkpoint = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    locked_by = Column(String(255), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -4,29 +4,75 @@ from sqlalchemy import Boolean
 from sqlalchemy import Column
 from sqlalchemy import DateTime
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import JSON
 from sqlalchemy import String
 from sqlalchemy import Text
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
 
 from rolling.server.extension import ServerSideDocument as Document
 
 
 class MessageDocument(Document):
+    """A zone or conversation message, stored once for all its recipients (see
+    ZoneMessageCursorDocument and ConversationParticipantDocument for what
+    each character read)"""
+
     __tablename__ = "message"
+    __table_args__ = (
+        Index("message_conversation_idx", "first_message", "id"),
+        Index(
+            "message_zone_idx",
+            "zone_row_i",
+            "zone_col_i",
+            "id",
+            postgresql_where=text("zone = true"),
+        ),
+        Index("message_recipient_idx", "recipient_ids", postgresql_using="gin"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     subject = Column(String, nullable=True)
     text = Column(Text, nullable=False)
-    character_id = Column(String(255), ForeignKey("character.id"), nullable=False)
     author_id = Column(String(255), ForeignKey("character.id"), nullable=False)
     author_name = Column(String, nullable=False)
     datetime = Column(DateTime, default=datetime.datetime.utcnow)
-    read = Column(Boolean, default=False)
     zone_row_i = Column(Integer, nullable=True)
     zone_col_i = Column(Integer, nullable=True)
     zone = Column(Boolean, nullable=False)
     concerned = Column(JSON(), default="[]")  # list of character_id
+    # Characters who can read the message: zone characters when message was
+    # posted, or conversation concerned characters (maybe filtered by zone)
+    recipient_ids = Column(JSONB, nullable=False, default=list)
     is_outzone_message = Column(Boolean, default=False)
     first_message = Column(Integer, ForeignKey("message.id"), nullable=True)
     is_first_message = Column(Boolean, nullable=False, default=False)
     affinity_id = Column(String, nullable=True, default=None)
+
+
+class ConversationParticipantDocument(Document):
+    """Characters concerned by a conversation (see MessageDocument.concerned of
+    conversation first message) and their last read message"""
+
+    __tablename__ = "conversation_participant"
+    __table_args__ = (
+        Index(
+            "conversation_participant_character_idx",
+            "character_id",
+            "conversation_id",
+        ),
+    )
+    conversation_id = Column(Integer, ForeignKey("message.id"), primary_key=True)
+    character_id = Column(String(255), ForeignKey("character.id"), primary_key=True)
+    last_read_message_id = Column(Integer, nullable=True, default=None)
+
+
+class ZoneMessageCursorDocument(Document):
+    """Last zone message read by a character in a zone"""
+
+    __tablename__ = "zone_message_cursor"
+    character_id = Column(String(255), ForeignKey("character.id"), primary_key=True)
+    world_row_i = Column(Integer, primary_key=True)
+    world_col_i = Column(Integer, primary_key=True)
+    last_read_message_id = Column(Integer, nullable=False)
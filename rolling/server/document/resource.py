@@ -3,10 +3,12 @@ from sqlalchemy import Boolean
 from sqlalchemy import Column
 from sqlalchemy import Enum
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import Numeric
 from sqlalchemy import String
 from sqlalchemy import UniqueConstraint
+from sqlalchemy import text
 
 from rolling.model.measure import Unit
 from rolling.server.extension import ServerSideDocument as Document
@@ -15,6 +17,28 @@ from rolling.server.extension import ServerSideDocument as Document
 # FIXME BS: id, unit pas utilisés
 class ResourceDocument(Document):
     __tablename__ = "resource"
+    __table_args__ = (
+        Index(
+            "resource_ground_idx",
+            "world_row_i",
+            "world_col_i",
+            "zone_row_i",
+            "zone_col_i",
+            postgresql_where=text("carried_by_id IS NULL AND in_built_id IS NULL"),
+        ),
+        Index(
+            "resource_carried_by_idx",
+            "carried_by_id",
+            "resource_id",
+            postgresql_where=text("carried_by_id IS NOT NULL"),
+        ),
+        Index(
+            "resource_in_built_idx",
+            "in_built_id",
+            "resource_id",
+            postgresql_where=text("in_built_id IS NOT NULL"),
+        ),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     resource_id = Column(String(255), nullable=False)
     world_col_i = Column(Integer, nullable=True)
@@ -4,9 +4,11 @@ from sqlalchemy import Boolean
 from sqlalchemy import Column
 from sqlalchemy import Enum
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import Numeric
 from sqlalchemy import String
+from sqlalchemy import text
 import typing
 
 from rolling.exception import CantEmpty
@@ -21,6 +23,28 @@ if typing.TYPE_CHECKING:
 
 class StuffDocument(Document):
     __tablename__ = "stuff"
+    __table_args__ = (
+        Index(
+            "stuff_ground_idx",
+            "world_row_i",
+            "world_col_i",
+            "zone_row_i",
+            "zone_col_i",
+            postgresql_where=text("carried_by_id IS NULL AND in_built_id IS NULL"),
+        ),
+        Index(
+            "stuff_carried_by_idx",
+            "carried_by_id",
+            "stuff_id",
+            postgresql_where=text("carried_by_id IS NOT NULL"),
+        ),
+        Index(
+            "stuff_in_built_idx",
+            "in_built_id",
+            "stuff_id",
+            postgresql_where=text("in_built_id IS NOT NULL"),
+        ),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     stuff_id = Column(String(255), nullable=False)
     world_col_i = Column(Integer, nullable=True)
@@ -31,7 +31,6 @@ from rolling.server.link import CharacterActionLink, QuickAction
 from rolling.types import WorldPoint
 from rolling.util import (
     ROLLGUI1_COMPAT,
-    get_on_and_around_coordinates,
     url_without_zone_coordinates,
 )
 
@@ -138,56 +137,14 @@ class ThereIsAroundProcessor(EventProcessor):
         character = self._kernel.character_lib.get_document(character_id)
 
         if ROLLGUI1_COMPAT:
-            around_character = get_on_and_around_coordinates(
-                x=character.zone_row_i, y=character.zone_col_i
+            counts = self._kernel.zone_lib.get_neighbourhood_counts(
+                world_row_i=character.world_row_i,
+                world_col_i=character.world_col_i,
+                zone_row_i=character.zone_row_i,
+                zone_col_i=character.zone_col_i,
+                exclude_character_ids=[character.id],
             )
 
-            stuff_count = 0
-            for row_i, col_i in around_character:
-                # FIXME BS: Optimisation here (give all coordinates and make only one query)
-                # And only id/name
-                stuff_count += self._kernel.stuff_lib.count_zone_stuffs(
-                    world_row_i=character.world_row_i,
-                    world_col_i=character.world_col_i,
-                    zone_row_i=row_i,
-                    zone_col_i=col_i,
-                )
-
-            resource_count = 0
-            for row_i, col_i in around_character:
-                # FIXME BS: Optimisation here (give all coordinates and make only one query)
-                # And only id/name
-                resource_count += self._kernel.resource_lib.count_ground_resource(
-                    world_row_i=character.world_row_i,
-                    world_col_i=character.world_col_i,
-                    zone_row_i=row_i,
-                    zone_col_i=col_i,
-                )
-
-            build_count = 0
-            for row_i, col_i in around_character:
-                # FIXME BS: Optimisation here (give all coordinates and make only one query)
-                # And only id/name
-                build_count += self._kernel.build_lib.count_zone_build(
-                    world_row_i=character.world_row_i,
-                    world_col_i=character.world_col_i,
-                    zone_row_i=row_i,
-                    zone_col_i=col_i,
-                    is_floor=False,
-                )
-
-            character_count = 0
-            for row_i, col_i in around_character:
-                # FIXME BS: Optimisation here (give all coordinates and make only one query)
-                # And only id/name
-                character_count += self._kernel.character_lib.count_zone_characters(
-                    row_i=character.world_row_i,
-                    col_i=character.world_col_i,
-                    zone_row_i=row_i,
-                    zone_col_i=col_i,
-                    exclude_ids=[character.id],
-                )
-
         quick_actions = self._kernel.character_lib.get_on_place_actions(
             character.id, quick_actions_only=True
         )
@@ -268,10 +225,10 @@ class ThereIsAroundProcessor(EventProcessor):
             world_row_i=character.world_row_i,
             world_col_i=character.world_col_i,
             data=ThereIsAroundData(
-                stuff_count=stuff_count,
-                resource_count=resource_count,
-                build_count=build_count,
-                character_count=character_count,
+                stuff_count=counts.stuff_count,
+                resource_count=counts.resource_count,
+                build_count=counts.build_count,
+                character_count=counts.character_count,
                 quick_actions=new_quick_actions,
             ),
         )
@@ -400,7 +357,10 @@ class RequestChatProcessor(EventProcessor):
         )
 
         # Send previous messages (TODO: optimize with one ws object)
-        cached_messages = self._kernel.chat_state.messages(WorldPoint((row_i, col_i)))
+        # NOTE: copy because chat state can receive messages while we are sending
+        cached_messages = list(
+            self._kernel.chat_state.messages(WorldPoint((row_i, col_i)))
+        )
         for cached_message in cached_messages:
             await self._kernel.message_lib.send_character_chat_message(
                 world_row_i=row_i,
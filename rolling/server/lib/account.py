@@ -14,6 +14,7 @@ import uuid
 from uuid import uuid4
 
 from rolling.exception import AccountNotFound
+from rolling.server.cache.auth import AuthPrincipal
 from rolling.server.document.account import AccountDocument, AccountAuthTokenDocument
 
 if typing.TYPE_CHECKING:
@@ -61,6 +62,51 @@ class AccountLib:
 
         return try_account
 
+    def authenticate_token(self, token: str) -> AuthPrincipal:
+        key = self._kernel.auth_cache.token_key(token)
+        if (principal := self._kernel.auth_cache.get(key)) is not None:
+            return principal
+
+        try:
+            account_id, current_character_id, authentication_expire = (
+                self._kernel.server_db_session.query(
+                    AccountDocument.id,
+                    AccountDocument.current_character_id,
+                    AccountAuthTokenDocument.authentication_expire,
+                )
+                .join(
+                    AccountAuthTokenDocument,
+                    AccountAuthTokenDocument.account_id == AccountDocument.id,
+                )
+                .filter(AccountAuthTokenDocument.authentication_token == token)
+                .filter(
+                    AccountAuthTokenDocument.authentication_expire > round(time.time())
+                )
+                .one()
+            )
+        except NoResultFound:
+            raise AccountNotFound()
+
+        principal = AuthPrincipal(
+            account_id=account_id, current_character_id=current_character_id
+        )
+        self._kernel.auth_cache.set(
+            key, principal, expire_timestamp=authentication_expire
+        )
+        return principal
+
+    def authenticate_credentials(self, login: str, password: str) -> AuthPrincipal:
+        key = self._kernel.auth_cache.credentials_key(login, password)
+        if (principal := self._kernel.auth_cache.get(key)) is not None:
+            return principal
+
+        account = self.get_account_for_credentials(login, password)
+        principal = AuthPrincipal(
+            account_id=account.id, current_character_id=account.current_character_id
+        )
+        self._kernel.auth_cache.set(key, principal)
+        return principal
+
     def username_exist(self, username: str) -> bool:
         return bool(
             self._kernel.server_db_session.query(AccountDocument)
@@ -15,7 +15,6 @@ from rolling.server.document.affinity import CHIEF_STATUS
 from rolling.server.document.affinity import MEMBER_STATUS
 from rolling.server.document.affinity import WARLORD_STATUS
 from rolling.server.document.character import CharacterDocument
-import rrolling
 
 if typing.TYPE_CHECKING:
     from rolling.kernel import Kernel
@@ -45,7 +44,7 @@ class AffinityLib:
 
         return doc
 
-    def name_available(self, name: str) -> bool:
+    async def name_available(self, name: str) -> bool:
         name_to_test = slugify.slugify(name)
         names = [
             row[0]
@@ -57,9 +56,7 @@ class AffinityLib:
                 return False
 
         # Affinities can be deleted but Tracim spaces still exists, so check if name is available
-        return not rrolling.tracim.Dealer(
-            self._kernel.server_config.tracim_config
-        ).space_slug_used(name_to_test)
+        return not await self._kernel.tracim.call("space_slug_used", name_to_test)
 
     def affinity_space_name(self, affinity: AffinityDocument) -> str:
         return f"🏰 {affinity.name}"
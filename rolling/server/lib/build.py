@@ -9,6 +9,7 @@ from rolling.model.character import CharacterModel
 from rolling.model.event import NewBuildData, WebSocketEvent, ZoneEventType
 from rolling.server.document.build import BuildDocument
 from rolling.server.link import CharacterActionLink
+from rolling.server.util import get_around_filters
 
 if typing.TYPE_CHECKING:
     from rolling.kernel import Kernel
@@ -41,6 +42,7 @@ class BuildLib:
                     is_floor=True,
                 )[0]
                 self._kernel.server_db_session.delete(existing_floor)
+                self._kernel.update_build_overlay(existing_floor, count=-1)
             except IndexError:
                 pass
 
@@ -57,6 +59,7 @@ class BuildLib:
             health=build_description.robustness,
         )
         self._kernel.server_db_session.add(build_doc)
+        self._kernel.update_build_overlay(build_doc, count=1)
 
         if commit:
             self._kernel.server_db_session.commit()
@@ -199,6 +202,19 @@ class BuildLib:
             .order_by(BuildDocument.is_floor.desc())
         )
 
+    def get_around_query(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        zone_row_i: int,
+        zone_col_i: int,
+        distance: int = 1,
+        is_floor: typing.Optional[bool] = None,
+    ) -> Query:
+        return self.get_zone_query(
+            world_row_i=world_row_i, world_col_i=world_col_i, is_floor=is_floor
+        ).filter(*get_around_filters(BuildDocument, zone_row_i, zone_col_i, distance))
+
     def count_zone_build(
         self,
         world_row_i: int,
@@ -286,6 +302,39 @@ class BuildLib:
 
         return [row[0] for row in query.all()]
 
+    def sync_health(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        on_row_done: typing.Optional[typing.Callable[[int], None]] = None,
+    ) -> int:
+        """Set robustness as health of zone builds without health, calling
+        on_row_done after each zone row having such builds. Return fixed builds
+        count."""
+        query = self._kernel.server_db_session.query(BuildDocument).filter(
+            BuildDocument.world_row_i == world_row_i,
+            BuildDocument.world_col_i == world_col_i,
+            BuildDocument.health == None,
+        )
+        zone_row_is = [
+            row[0]
+            for row in query.with_entities(BuildDocument.zone_row_i)
+            .distinct()
+            .order_by(BuildDocument.zone_row_i)
+        ]
+
+        fixed = 0
+        for zone_row_i in zone_row_is:
+            for build_doc in query.filter(BuildDocument.zone_row_i == zone_row_i):
+                build_description = self._kernel.game.config.builds[build_doc.build_id]
+                if build_description.robustness is not None:
+                    build_doc.health = build_description.robustness
+                    fixed += 1
+            if on_row_done is not None:
+                on_row_done(zone_row_i)
+        self._kernel.server_db_session.commit()
+        return fixed
+
     def is_there_build_here(
         self,
         world_row_i: int,
@@ -312,6 +361,7 @@ class BuildLib:
             build_id
         ).all():
             self._kernel.server_db_session.delete(door_relation)
+            self._kernel.update_door_rules_overlay(build_doc, count=-1)
 
         for carried_resource in self._kernel.resource_lib.get_stored_in_build(build_id):
             self._kernel.resource_lib.reduce_stored_in(
@@ -340,6 +390,7 @@ class BuildLib:
             self._kernel.server_db_session.add(stuff_doc)
 
         self._kernel.server_db_session.delete(build_doc)
+        self._kernel.update_build_overlay(build_doc, count=-1)
 
         if commit:
             self._kernel.server_db_session.commit()
@@ -3,13 +3,13 @@ import collections
 import datetime
 import math
 import os
-import random
 import uuid
 import sqlalchemy
 from sqlalchemy import Float
 from sqlalchemy import and_
 from sqlalchemy import cast
 from sqlalchemy.orm import Query
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.orm.exc import NoResultFound
 import typing
 import slugify
@@ -46,7 +46,7 @@ from rolling.model.stuff import CharacterInventoryModel
 from rolling.model.stuff import StuffModel
 from rolling.model.zone import MoveZoneInfos
 from rolling.rolling_types import ActionType
-from rolling.server.action import ActionFactory
+from rolling.server.cache.unread_counters import UnreadCounters
 from rolling.server.controller.url import DESCRIBE_LOOK_AT_CHARACTER_URL
 from rolling.server.controller.url import DESCRIBE_LOOK_AT_RESOURCE_URL
 from rolling.server.controller.url import DESCRIBE_LOOK_AT_STUFF_URL
@@ -64,10 +64,11 @@ from rolling.server.document.corpse import AnimatedCorpseType
 from rolling.server.document.event import EventDocument
 from rolling.server.document.event import StoryPageDocument
 from rolling.server.document.knowledge import CharacterKnowledgeDocument
-from rolling.server.document.message import MessageDocument
 from rolling.server.document.skill import CharacterSkillDocument
+from rolling.server.document.stuff import StuffDocument
 from rolling.server.lib.stuff import StuffLib
 from rolling.server.link import CharacterActionLink, ExploitableTile
+from rolling.server.util import get_around_filters
 from rolling.util import character_can_drink_in_its_zone
 from rolling.util import filter_action_links
 from rolling.util import get_coming_from
@@ -91,7 +92,7 @@ class CharacterLib:
     ) -> None:
         self._kernel = kernel
         self._stuff_lib: StuffLib = stuff_lib or StuffLib(kernel)
-        self._action_factory = ActionFactory(kernel)
+        self._action_factory = kernel.action_factory
 
     @property
     def alive_query(self) -> Query:
@@ -155,14 +156,14 @@ class CharacterLib:
             ) = self._kernel.world_map_source.meta.spawn.get_spawn_coordinates(
                 self._kernel.world_map_source
             )
-            traversable_coordinates = self._kernel.get_traversable_coordinates(
+            walkable_coordinate = self._kernel.get_random_walkable_coordinate(
                 world_row_i, world_col_i
             )
-            if not traversable_coordinates:
+            if walkable_coordinate is None:
                 raise RollingError(
                     f"No traversable coordinate in zone {world_row_i},{world_col_i}"
                 )
-            zone_row_i, zone_col_i = random.choice(traversable_coordinates)
+            zone_row_i, zone_col_i = walkable_coordinate
 
         character.world_row_i = world_row_i
         character.world_col_i = world_col_i
@@ -226,6 +227,14 @@ class CharacterLib:
             query = self.alive_query
         return query.filter(CharacterDocument.id == id_).one()
 
+    def get_action_points(self, id_: str) -> typing.Optional[float]:
+        action_points = (
+            self._kernel.server_db_session.query(CharacterDocument.action_points)
+            .filter(CharacterDocument.id == id_)
+            .scalar()
+        )
+        return float(action_points) if action_points is not None else None
+
     def get_tracim_account(self, character_id: str) -> rrolling.tracim.Account:
         character_doc = self._kernel.character_lib.get_document(character_id, dead=None)
 
@@ -245,6 +254,119 @@ class CharacterLib:
 
     def document_to_model(
         self, character_document: CharacterDocument
+    ) -> CharacterModel:
+        return self.documents_to_models([character_document])[0]
+
+    def documents_to_models(
+        self, character_documents: typing.List[CharacterDocument]
+    ) -> typing.List[CharacterModel]:
+        """Build models with one query for all skills, one for all knowledges and
+        one for all equipments, whatever the characters count"""
+        if not character_documents:
+            return []
+
+        character_ids = [doc.id for doc in character_documents]
+        skills_by_character_id: typing.DefaultDict[
+            str, typing.Dict[str, CharacterSkillModel]
+        ] = collections.defaultdict(dict)
+        for skill_document in (
+            self._kernel.server_db_session.query(CharacterSkillDocument)
+            .filter(CharacterSkillDocument.character_id.in_(character_ids))
+            .all()
+        ):
+            skills_by_character_id[skill_document.character_id][
+                skill_document.skill_id
+            ] = CharacterSkillModel(
+                id=skill_document.skill_id,
+                name=self._kernel.game.config.skills[skill_document.skill_id].name,
+                value=float(skill_document.value),
+                counter=float(skill_document.counter),
+            )
+
+        knowledges_by_character_id: typing.DefaultDict[
+            str, typing.Dict[str, KnowledgeDescription]
+        ] = collections.defaultdict(dict)
+        for character_id, knowledge_id in (
+            self._kernel.server_db_session.query(
+                CharacterKnowledgeDocument.character_id,
+                CharacterKnowledgeDocument.knowledge_id,
+            )
+            .filter(
+                CharacterKnowledgeDocument.character_id.in_(character_ids),
+                CharacterKnowledgeDocument.acquired == True,
+            )
+            .all()
+        ):
+            knowledges_by_character_id[character_id][
+                knowledge_id
+            ] = self._kernel.game.config.knowledge[knowledge_id]
+
+        self._load_equipments(character_documents)
+
+        return [
+            self._document_to_model(
+                character_document,
+                skills=skills_by_character_id[character_document.id],
+                knowledges=knowledges_by_character_id[character_document.id],
+            )
+            for character_document in character_documents
+        ]
+
+    def _load_equipments(
+        self, character_documents: typing.List[CharacterDocument]
+    ) -> None:
+        """Populate equipment relationships of given documents with one query
+        (instead of one lazy load per relationship and per character)"""
+        relationships = {
+            "used_as_bag": StuffDocument.used_as_bag_by_id,
+            "used_as_primary_weapon": StuffDocument.used_as_weapon_by_id,
+            "used_as_shield": StuffDocument.used_as_shield_by_id,
+            "used_as_armor": StuffDocument.used_as_armor_by_id,
+        }
+        # Already loaded relationships may contain not flushed changes
+        unloaded_by_character_id = {
+            doc.id: sqlalchemy.inspect(doc).unloaded.intersection(relationships)
+            for doc in character_documents
+        }
+        character_ids = [
+            character_id
+            for character_id, unloaded in unloaded_by_character_id.items()
+            if unloaded
+        ]
+        if not character_ids:
+            return
+
+        stuffs_by_relationship: typing.Dict[
+            str, typing.DefaultDict[str, typing.List[StuffDocument]]
+        ] = {name: collections.defaultdict(list) for name in relationships}
+        for stuff_document in (
+            self._kernel.server_db_session.query(StuffDocument)
+            .filter(
+                sqlalchemy.or_(
+                    *[column.in_(character_ids) for column in relationships.values()]
+                )
+            )
+            .all()
+        ):
+            for name, column in relationships.items():
+                character_id = getattr(stuff_document, column.key)
+                if character_id is not None:
+                    stuffs_by_relationship[name][character_id].append(stuff_document)
+
+        for character_document in character_documents:
+            for name in unloaded_by_character_id[character_document.id]:
+                stuffs = stuffs_by_relationship[name][character_document.id]
+                set_committed_value(
+                    character_document,
+                    name,
+                    stuffs if name == "used_as_bag" else next(iter(stuffs), None),
+                )
+
+    def _document_to_model(
+        self,
+        character_document: CharacterDocument,
+        skills: typing.Dict[str, CharacterSkillModel],
+        knowledges: typing.Dict[str, KnowledgeDescription],
     ) -> CharacterModel:
         weapon = None
         weapon_doc = character_document.used_as_primary_weapon
@@ -261,30 +383,6 @@ class CharacterLib:
         if armor_doc:
             armor = self._kernel.stuff_lib.stuff_model_from_doc(armor_doc)
 
-        skills: typing.Dict[str, CharacterSkillModel] = {
-            skill_document.skill_id: CharacterSkillModel(
-                id=skill_document.skill_id,
-                name=self._kernel.game.config.skills[skill_document.skill_id].name,
-                value=float(skill_document.value),
-                counter=float(skill_document.counter),
-            )
-            for skill_document in self._kernel.server_db_session.query(
-                CharacterSkillDocument
-            )
-            .filter(CharacterSkillDocument.character_id == character_document.id)
-            .all()
-        }
-        knowledges: typing.Dict[str, KnowledgeDescription] = {
-            row[0]: self._kernel.game.config.knowledge[row[0]]
-            for row in self._kernel.server_db_session.query(
-                CharacterKnowledgeDocument.knowledge_id,
-                CharacterKnowledgeDocument.acquired,
-            )
-            .filter(CharacterKnowledgeDocument.character_id == character_document.id)
-            .all()
-            if row[1]
-        }
-
         ability_ids = []
         for knowledge_description in knowledges.values():
             ability_ids.extend(knowledge_description.abilities)
@@ -334,12 +432,79 @@ class CharacterLib:
     def get_multiple(
         self, character_ids: typing.List[str]
     ) -> typing.List[CharacterModel]:
-        return [
-            self.document_to_model(doc)
-            for doc in self.alive_query.filter(
-                CharacterDocument.id.in_(character_ids)
-            ).all()
+        return self.documents_to_models(
+            self.alive_query.filter(CharacterDocument.id.in_(character_ids)).all()
+        )
+
+    def _compute_unread_counters(self, character_id: str) -> UnreadCounters:
+        # TODO BS: Move these compute unread/unvote in respective libs
+        session = self._kernel.server_db_session
+        events = (
+            session.query(EventDocument.id)
+            .filter(
+                and_(
+                    EventDocument.character_id == character_id,
+                    EventDocument.read == False,
+                )
+            )
+            .count()
+        )
+        zone_messages = self._kernel.message_lib.get_unread_zone_message_count(
+            character_id
+        )
+        conversation_messages = (
+            self._kernel.message_lib.get_unread_conversation_message_count(character_id)
+        )
+
+        character_chief_affinity_ids = [
+            r[0]
+            for r in session.query(AffinityRelationDocument.affinity_id)
+            .filter(
+                AffinityRelationDocument.character_id == character_id,
+                AffinityRelationDocument.accepted == True,
+                AffinityRelationDocument.status_id == CHIEF_STATUS[0],
+            )
+            .all()
         ]
+        # TODO BS: implement other direction types
+        chief_affinity_ids = frozenset(
+            a[0]
+            for a in session.query(AffinityDocument.id)
+            .filter(
+                AffinityDocument.id.in_(character_chief_affinity_ids),
+                AffinityDocument.direction_type.in_(
+                    [AffinityDirectionType.ONE_DIRECTOR.value]
+                ),
+            )
+            .all()
+        )
+        affinity_requests = 0
+        if chief_affinity_ids:
+            affinity_requests = (
+                session.query(AffinityRelationDocument)
+                .filter(
+                    AffinityRelationDocument.affinity_id.in_(chief_affinity_ids),
+                    AffinityRelationDocument.accepted == False,
+                    AffinityRelationDocument.request == True,
+                )
+                .count()
+            )
+
+        transactions = (
+            self._kernel.business_lib.get_incoming_transactions_query(character_id)
+            .filter(OfferDocument.read == False)
+            .count()
+        )
+
+        return UnreadCounters(
+            events=events,
+            zone_messages=zone_messages,
+            conversation_messages=conversation_messages,
+            affinity_requests=affinity_requests,
+            transactions=transactions,
+            pending_actions=self.get_pending_actions_count(character_id),
+            chief_affinity_ids=chief_affinity_ids,
+        )
 
     def get(
         self,
@@ -356,92 +521,31 @@ class CharacterLib:
         character_document = self.get_document(id_, dead=dead)
         model = self.document_to_model(character_document)
 
-        # TODO BS: Move these compute unread/unvote in respective libs
         if (
             compute_unread_event
-            and self._kernel.server_db_session.query(EventDocument.id)
-            .filter(
-                and_(EventDocument.character_id == id_, EventDocument.read == False)
-            )
-            .count()
-        ):
-            model.unread_event = True
-
-        if (
-            compute_unread_zone_message
-            and self._kernel.server_db_session.query(MessageDocument.id)
-            .filter(
-                MessageDocument.character_id == id_,
-                MessageDocument.zone_row_i != None,
-                MessageDocument.zone_col_i != None,
-                MessageDocument.read == False,
-            )
-            .count()
+            or compute_unread_zone_message
+            or compute_unread_conversation
+            or compute_unvote_affinity_relation
+            or compute_unread_transactions
+            or compute_pending_actions
         ):
-            model.unread_zone_message = True
-
-        if (
-            compute_unread_conversation
-            and self._kernel.server_db_session.query(MessageDocument.id)
-            .filter(
-                MessageDocument.character_id == id_,
-                MessageDocument.zone == False,
-                MessageDocument.read == False,
+            unread_counters = self._kernel.unread_counters_cache.get_or_compute(
+                self._kernel.server_db_session,
+                character_document.id,
+                lambda: self._compute_unread_counters(character_document.id),
             )
-            .count()
-        ):
-            model.unread_conversation = True
-
-        if compute_unvote_affinity_relation:
-            character_chief_affinity_ids = [
-                r[0]
-                for r in self._kernel.server_db_session.query(
-                    AffinityRelationDocument.affinity_id
-                )
-                .filter(
-                    AffinityRelationDocument.character_id == character_document.id,
-                    AffinityRelationDocument.accepted == True,
-                    AffinityRelationDocument.status_id == CHIEF_STATUS[0],
-                )
-                .all()
-            ]
-            # TODO BS: implement other direction types
-            character_chief_affinity_ids = [
-                a[0]
-                for a in self._kernel.server_db_session.query(AffinityDocument.id)
-                .filter(
-                    AffinityDocument.id.in_(character_chief_affinity_ids),
-                    AffinityDocument.direction_type.in_(
-                        [AffinityDirectionType.ONE_DIRECTOR.value]
-                    ),
-                )
-                .all()
-            ]
-            if (
-                self._kernel.server_db_session.query(AffinityRelationDocument)
-                .filter(
-                    AffinityRelationDocument.affinity_id.in_(
-                        character_chief_affinity_ids
-                    ),
-                    AffinityRelationDocument.accepted == False,
-                    AffinityRelationDocument.request == True,
-                )
-                .count()
-            ):
+            if compute_unread_event and unread_counters.events:
+                model.unread_event = True
+            if compute_unread_zone_message and unread_counters.zone_messages:
+                model.unread_zone_message = True
+            if compute_unread_conversation and unread_counters.conversation_messages:
+                model.unread_conversation = True
+            if compute_unvote_affinity_relation and unread_counters.affinity_requests:
                 model.unvote_affinity_relation = True
-
-        if compute_unread_transactions:
-            if (
-                self._kernel.business_lib.get_incoming_transactions_query(id_)
-                .filter(OfferDocument.read == False)
-                .count()
-            ):
+            if compute_unread_transactions and unread_counters.transactions:
                 model.unread_transactions = True
-
-        if compute_pending_actions:
-            model.pending_actions = self.get_pending_actions_count(
-                character_document.id
-            )
+            if compute_pending_actions:
+                model.pending_actions = unread_counters.pending_actions
 
         if compute_with_fighters:
             model.with_fighters_count = self.get_with_fighters_count(
@@ -511,10 +615,22 @@ class CharacterLib:
             zone_col_i=zone_col_i,
             exclude_ids=exclude_ids,
         ).all()
-        return [
-            self.document_to_model(character_document)
-            for character_document in character_documents
-        ]
+        return self.documents_to_models(character_documents)
+
+    def get_around_query(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        zone_row_i: int,
+        zone_col_i: int,
+        distance: int = 1,
+        exclude_ids: typing.Optional[typing.List[str]] = None,
+    ) -> Query:
+        return self._get_zone_characters_query(
+            row_i=world_row_i, col_i=world_col_i, exclude_ids=exclude_ids
+        ).filter(
+            *get_around_filters(CharacterDocument, zone_row_i, zone_col_i, distance)
+        )
 
     def count_zone_characters(
         self,
@@ -963,6 +1079,34 @@ class CharacterLib:
         character_id: str,
         quick_actions_only: bool = False,
         filter_action_types: typing.Optional[typing.List[str]] = None,
+    ) -> typing.List[CharacterActionLink]:
+        world_point = (
+            self._kernel.server_db_session.query(
+                CharacterDocument.world_row_i, CharacterDocument.world_col_i
+            )
+            .filter(CharacterDocument.id == character_id)
+            .one()
+        )
+        return self._kernel.action_links_cache.get_or_compute(
+            self._kernel.server_db_session,
+            character_id,
+            world_point,
+            (
+                quick_actions_only,
+                tuple(filter_action_types) if filter_action_types is not None else None,
+            ),
+            lambda: self._get_on_place_actions(
+                character_id,
+                quick_actions_only=quick_actions_only,
+                filter_action_types=filter_action_types,
+            ),
+        )
+
+    def _get_on_place_actions(
+        self,
+        character_id: str,
+        quick_actions_only: bool = False,
+        filter_action_types: typing.Optional[typing.List[str]] = None,
     ) -> typing.List[CharacterActionLink]:
         character = self.get(character_id)
         character_actions_: typing.List[CharacterActionLink] = []
@@ -1221,9 +1365,8 @@ class CharacterLib:
         message: str,
     ) -> None:
         character_doc = self.get_document(character_id)
-        rrolling.tracim.Dealer(
-            self._kernel.server_config.tracim_config
-        ).create_publication(
+        self._kernel.tracim.post(
+            "create_publication",
             rrolling.tracim.SpaceId(character_doc.tracim_home_space_id),
             title,
             message,
@@ -1368,9 +1511,8 @@ class CharacterLib:
         ).update({"accepted": False, "request": False, "fighter": False})
 
         tracim_account = self.get_tracim_account(character_id)
-        rrolling.tracim.Dealer(
-            self._kernel.server_config.tracim_config
-        ).set_account_email(
+        self._kernel.tracim.post(
+            "set_account_email",
             tracim_account,
             rrolling.tracim.AccountId(character_doc.tracim_user_id),
             rrolling.tracim.Email(f"{uuid.uuid4().hex}@local"),
@@ -1427,12 +1569,11 @@ class CharacterLib:
     def get_ready_to_fights(
         self, character_ids: typing.List[str], world_row_i: int, world_col_i: int
     ) -> typing.List[CharacterModel]:
-        return [
-            self.document_to_model(doc)
-            for doc in self._get_ready_to_fight_query(
+        return self.documents_to_models(
+            self._get_ready_to_fight_query(
                 character_ids, world_row_i=world_row_i, world_col_i=world_col_i
             ).all()
-        ]
+        )
 
     def reduce_life_points(
         self, character_id: str, value: float, commit: bool = True
@@ -1615,11 +1756,8 @@ class CharacterLib:
             tiredness_class = "yellow"
 
         tracim_account = self.get_tracim_account(character.id)
-        unread_messages = rrolling.tracim.Dealer(
-            self._kernel.server_config.tracim_config
-        ).get_unread_messages_count(
-            tracim_account,
-            rrolling.tracim.AccountId(character.tracim_user_id),
+        unread_messages = self._kernel.tracim.get_cached_unread_messages_count(
+            tracim_account, character.tracim_user_id
         )
 
         return [
@@ -1733,10 +1871,12 @@ class CharacterLib:
         follows_by_id = {f.follower_id: f for f in follows}
 
         return [
-            (follows_by_id[doc.id], self.document_to_model(doc))
-            for doc in self.alive_query.filter(
-                CharacterDocument.id.in_(follows_by_id.keys())
-            ).all()
+            (follows_by_id[model.id], model)
+            for model in self.documents_to_models(
+                self.alive_query.filter(
+                    CharacterDocument.id.in_(follows_by_id.keys())
+                ).all()
+            )
         ]
 
     def get_follower_count(
@@ -1764,10 +1904,12 @@ class CharacterLib:
         follows_by_id = {f.followed_id: f for f in follows}
 
         return [
-            (follows_by_id[doc.id], self.document_to_model(doc))
-            for doc in self.alive_query.filter(
-                CharacterDocument.id.in_(follows_by_id.keys())
-            ).all()
+            (follows_by_id[model.id], model)
+            for model in self.documents_to_models(
+                self.alive_query.filter(
+                    CharacterDocument.id.in_(follows_by_id.keys())
+                ).all()
+            )
         ]
 
     def get_followed_count(
@@ -2166,7 +2308,7 @@ class CharacterLib:
 
     async def signal_spritesheet_change(self, character_id: str):
         character_doc = self.get_document(character_id)
-        spritesheet_filename = self.spritesheet_filename(character_doc)
+        spritesheet_filename = await self.render_spritesheet(character_doc)
         await self._kernel.send_to_zone_sockets(
             character_doc.world_row_i,
             character_doc.world_col_i,
@@ -2182,6 +2324,19 @@ class CharacterLib:
         )
 
     def spritesheet_filename(self, character: CharacterDocument) -> str:
+        """Spritesheet file name, file may be still rendering (see
+        render_spritesheet)"""
+        identifiers = self.spritesheet_identifiers(character)
+        return self._kernel.spritesheet_path(identifiers).name
+
+    async def render_spritesheet(self, character: CharacterDocument) -> str:
+        """Spritesheet file name, once file is rendered"""
+        spritesheet_path = await self._kernel.spritesheets.render(
+            self.spritesheet_identifiers(character)
+        )
+        return spritesheet_path.name
+
+    def spritesheet_identifiers(self, character: CharacterDocument) -> str:
         identifiers = character.spritesheet_identifiers
         identifiers = identifiers or DEFAULT_CHARACTER_SPRITESHEETS_IDENTIFIERS
         additional_identifiers = []
@@ -2192,7 +2347,7 @@ class CharacterLib:
                     armor.stuff_id
                 )
             )
-            for identifier in stuff_properties.sprite_sheet_identifiers:
+            for identifier in stuff_properties.sprite_sheet_identifiers or []:
                 additional_identifiers.append(
                     identifier.format(body_type=character.spritesheet_body_type)
                 )
@@ -2200,4 +2355,4 @@ class CharacterLib:
         if additional_identifiers:
             identifiers = f"{identifiers} {' '.join(additional_identifiers)}"
 
-        return self._kernel.spritesheet_path(identifiers).name
+        return identifiers
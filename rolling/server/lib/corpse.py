@@ -3,6 +3,7 @@ from sqlalchemy.orm import Query
 import typing
 
 from rolling.exception import CantMove
+from rolling.log import server_logger
 from rolling.server.document.corpse import AnimatedCorpseDocument
 from rolling.server.document.corpse import AnimatedCorpseType
 
@@ -56,11 +57,12 @@ class AnimatedCorpseLib:
         to_zone_col_i: int,
         commit: bool = True,
     ):
-        # TODO BS: performance hell here !
-        traversable_coordinates = self._kernel.get_traversable_coordinates(
-            animated_corpse.world_row_i, animated_corpse.world_col_i
-        )
-        if (to_zone_row_i, to_zone_col_i) not in traversable_coordinates:
+        if not self._kernel.is_traversable_coordinate(
+            animated_corpse.world_row_i,
+            animated_corpse.world_col_i,
+            to_zone_row_i,
+            to_zone_col_i,
+        ):
             raise CantMove(f"Can't move to {to_zone_row_i}.{to_zone_col_i}")
 
         animated_corpse.zone_row_i = to_zone_row_i
@@ -76,3 +78,47 @@ class AnimatedCorpseLib:
         self._kernel.server_db_session.add(animated_corpse_doc)
         self._kernel.server_db_session.commit()
         return animated_corpse_doc
+
+    def populate(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        type_: AnimatedCorpseType,
+        count: int,
+        commit: bool = True,
+    ) -> typing.List[AnimatedCorpseDocument]:
+        """Create animated corpses of given type in zone until there is count of
+        them. Return created ones."""
+        missing = count - len(
+            self.get_all(world_row_i=world_row_i, world_col_i=world_col_i, type_=type_)
+        )
+        alive_since = self._kernel.universe_lib.get_last_state().turn
+
+        created = []
+        for _ in range(missing):
+            walkable_coordinate = self._kernel.get_random_walkable_coordinate(
+                world_row_i, world_col_i
+            )
+            if walkable_coordinate is None:
+                server_logger.error(
+                    f"No traversable coordinate found in {world_row_i}.{world_col_i}"
+                )
+                break
+
+            zone_row_i, zone_col_i = walkable_coordinate
+            animated_corpse_doc = AnimatedCorpseDocument(
+                alive_since=alive_since,
+                world_row_i=world_row_i,
+                world_col_i=world_col_i,
+                zone_row_i=zone_row_i,
+                zone_col_i=zone_col_i,
+                alive=True,
+                type_=type_.value,
+            )
+            self._kernel.server_db_session.add(animated_corpse_doc)
+            created.append(animated_corpse_doc)
+
+        self._kernel.server_db_session.flush()
+        if commit:
+            self._kernel.server_db_session.commit()
+        return created
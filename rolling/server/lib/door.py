@@ -4,7 +4,6 @@ from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import Query
 import typing
 
-from rolling.log import server_logger
 from rolling.model.build import ZoneBuildModelContainer
 from rolling.model.event import NewBuildData
 from rolling.model.event import WebSocketEvent
@@ -191,6 +190,9 @@ class DoorLib:
                 character_id=character_id,
                 build_id=build_id,
             )
+            self._kernel.update_door_rules_overlay(
+                self._kernel.build_lib.get_build_doc(build_id), count=1
+            )
 
         if new_mode is not None:
             relation.mode = new_mode
@@ -294,14 +296,9 @@ class DoorLib:
                 event_str = self._kernel.event_serializer_factory.get_serializer(
                     event.type
                 ).dump_json(event)
-                try:
-                    await socket.send_str(event_str)
-                except ConnectionResetError as exc:
-                    server_logger.debug(exc)
-                except Exception:
-                    server_logger.exception(
-                        "Error when compute and send builds to current sockets"
-                    )
+                await self._kernel.server_zone_events_manager.outbound.broadcast(
+                    [socket], event_str
+                )
 
     def delete(self, character_id: str, build_id: int) -> None:
         try:
@@ -309,6 +306,9 @@ class DoorLib:
                 character_id=character_id, build_id=build_id
             ).one()
             self._kernel.server_db_session.delete(relation)
+            self._kernel.update_door_rules_overlay(
+                self._kernel.build_lib.get_build_doc(build_id), count=-1
+            )
             self._kernel.server_db_session.commit()
         except NoResultFound:
             pass
@@ -1,6 +1,7 @@
 # coding: utf-8
 import dataclasses
 import random
+from sqlalchemy import or_
 import typing
 
 from rolling.model.character import CharacterModel
@@ -11,6 +12,7 @@ from rolling.model.fight import DEFAULT_WEAPON_DAMAGE
 from rolling.model.fight import DefendDescription
 from rolling.model.fight import Weapon
 from rolling.server.document.affinity import AffinityDocument
+from rolling.server.document.affinity import AffinityRelationDocument
 from rolling.server.document.character import CharacterDocument
 
 if typing.TYPE_CHECKING:
@@ -52,66 +54,47 @@ class FightLib:
         world_col_i: int,
         attacker_affinity: typing.Optional[AffinityDocument] = None,
     ) -> DefendDescription:
-        helpers: typing.Dict[str, typing.List[int]] = {}
-
-        def search_fighters_for(fighter_id, helping: bool = False):
-            all_fighter_ids_ = []
-            all_affinity_ids_ = []
-            for affinity_relation in self._kernel.affinity_lib.get_accepted_affinities(
-                fighter_id
-            ):
-                all_affinity_fighter_ids = (
-                    self._kernel.affinity_lib.get_affinity_fighter_ids(
-                        affinity_id=affinity_relation.affinity_id
-                    )
-                )
-                here_affinity_fighter_ids = [
-                    r[0]
-                    for r in self._kernel.character_lib.alive_query.filter(
-                        CharacterDocument.id.in_(all_affinity_fighter_ids),
-                        CharacterDocument.world_row_i == world_row_i,
-                        CharacterDocument.world_col_i == world_col_i,
-                    )
-                    .with_entities(CharacterDocument.id)
-                    .all()
-                ]
-                if here_affinity_fighter_ids:
-                    all_affinity_ids_.append(affinity_relation.affinity_id)
-
-                all_fighter_ids_.extend(here_affinity_fighter_ids)
-
-                if (
-                    helping
-                    and attacker_affinity
-                    and affinity_relation.affinity_id != attacker_affinity.id
-                ):
-                    for here_affinity_fighter_id in here_affinity_fighter_ids:
-                        helpers.setdefault(here_affinity_fighter_id, []).append(
-                            affinity_relation.affinity_id
-                        )
+        accepted_affinity_ids, here_fighter_ids = self._get_zone_affinity_graph(
+            origin_target.id, world_row_i=world_row_i, world_col_i=world_col_i
+        )
+        helpers: typing.Dict[str, typing.Set[int]] = {}
+        all_affinity_ids: typing.Set[int] = set()
+        all_fighter_ids_: typing.Set[str] = set()
+
+        # Target affinities fighters, then (transitively) their affinities
+        # fighters, which help them
+        for affinity_id in accepted_affinity_ids.get(origin_target.id, []):
+            if here_fighter_ids.get(affinity_id):
+                all_affinity_ids.add(affinity_id)
+                all_fighter_ids_.update(here_fighter_ids[affinity_id])
+
+        to_visit = list(all_fighter_ids_)
+        visited_affinity_ids: typing.Set[int] = set()
+        while to_visit:
+            fighter_id = to_visit.pop()
+            for affinity_id in accepted_affinity_ids.get(fighter_id, []):
+                if affinity_id in visited_affinity_ids:
+                    continue
+                visited_affinity_ids.add(affinity_id)
 
-            return list(set(all_fighter_ids_)), list(set(all_affinity_ids_))
+                affinity_fighter_ids = here_fighter_ids.get(affinity_id, [])
+                if not affinity_fighter_ids:
+                    continue
+                all_affinity_ids.add(affinity_id)
 
-        all_fighter_ids, all_affinity_ids = search_fighters_for(origin_target.id)
-        same = False
-        while not same:
-            copy_ = list(all_fighter_ids)
-            for fighter_id_ in all_fighter_ids:
-                new_fighter_list, new_affinity_list = search_fighters_for(
-                    fighter_id_, helping=True
-                )
-                all_fighter_ids.extend(new_fighter_list)
-                all_fighter_ids = list(set(all_fighter_ids))
-                all_affinity_ids.extend(new_affinity_list)
-                all_affinity_ids = list(set(all_affinity_ids))
-            if set(copy_) == set(all_fighter_ids):
-                same = True
+                for affinity_fighter_id in affinity_fighter_ids:
+                    if attacker_affinity and affinity_id != attacker_affinity.id:
+                        helpers.setdefault(affinity_fighter_id, set()).add(affinity_id)
+                    if affinity_fighter_id not in all_fighter_ids_:
+                        all_fighter_ids_.add(affinity_fighter_id)
+                        to_visit.append(affinity_fighter_id)
 
+        all_fighter_ids = list(all_fighter_ids_)
         all_fighters = self._kernel.character_lib.get_multiple(
             character_ids=all_fighter_ids
         )
         all_affinities = self._kernel.affinity_lib.get_multiple(
-            affinity_ids=all_affinity_ids
+            affinity_ids=list(all_affinity_ids)
         )
         affinities_by_ids = {a.id: a for a in all_affinities}
         all_fighters += (
@@ -122,11 +105,49 @@ class FightLib:
             ready_fighters=[f for f in all_fighters if f.is_defend_ready],
             affinities=all_affinities,
             helpers={
-                f_id: [affinities_by_ids[a_id] for a_id in set(helpers[f_id])]
+                f_id: [affinities_by_ids[a_id] for a_id in helpers[f_id]]
                 for f_id in helpers
             },
         )
 
+    def _get_zone_affinity_graph(
+        self, origin_target_id: str, world_row_i: int, world_col_i: int
+    ) -> typing.Tuple[
+        typing.Dict[str, typing.List[int]], typing.Dict[int, typing.List[str]]
+    ]:
+        """Return accepted affinity ids by character id (for zone alive characters
+        and origin target) and zone alive fighter ids by affinity id"""
+        here_alive_query = self._kernel.character_lib.alive_query_ids.filter(
+            CharacterDocument.world_row_i == world_row_i,
+            CharacterDocument.world_col_i == world_col_i,
+        )
+        here_alive_ids = {row[0] for row in here_alive_query}
+
+        accepted_affinity_ids: typing.Dict[str, typing.List[int]] = {}
+        here_fighter_ids: typing.Dict[int, typing.List[str]] = {}
+        relations = self._kernel.server_db_session.query(
+            AffinityRelationDocument.character_id,
+            AffinityRelationDocument.affinity_id,
+            AffinityRelationDocument.accepted,
+            AffinityRelationDocument.fighter,
+        ).filter(
+            or_(
+                AffinityRelationDocument.character_id.in_(here_alive_query),
+                AffinityRelationDocument.character_id == origin_target_id,
+            ),
+            or_(
+                AffinityRelationDocument.accepted == True,
+                AffinityRelationDocument.fighter == True,
+            ),
+        )
+        for character_id, affinity_id, accepted, fighter in relations:
+            if accepted:
+                accepted_affinity_ids.setdefault(character_id, []).append(affinity_id)
+            if fighter and character_id in here_alive_ids:
+                here_fighter_ids.setdefault(affinity_id, []).append(character_id)
+
+        return accepted_affinity_ids, here_fighter_ids
+
     def get_attack_description(
         self,
         target: DefendDescription,
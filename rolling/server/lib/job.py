@@ -0,0 +1,391 @@
+# coding: utf-8
+import dataclasses
+import datetime
+import traceback
+import typing
+import uuid
+
+import requests
+from sqlalchemy import and_
+from sqlalchemy import func
+from sqlalchemy import or_
+
+from rolling.log import server_logger
+from rolling.server.document.corpse import AnimatedCorpseType
+from rolling.server.document.job import JobDocument
+from rolling.server.document.job import JobStatus
+
+if typing.TYPE_CHECKING:
+    from rolling.kernel import Kernel
+
+# Seconds a claimed job stays owned by its worker without progress report
+DEFAULT_LEASE_SECONDS = 300
+
+SYNC_ZONE_RESOURCES_JOB = "sync_zone_resources"
+SYNC_BUILD_HEALTH_JOB = "sync_build_health"
+POPULATE_AC_JOB = "populate_ac"
+REFRESH_CHARACTERS_JOB = "refresh_characters"
+
+JobHandler = typing.Callable[["Kernel", "JobContext"], None]
+JOB_HANDLERS: typing.Dict[str, JobHandler] = {}
+
+
+def job_handler(name: str) -> typing.Callable[[JobHandler], JobHandler]:
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[name] = handler
+        return handler
+
+    return decorator
+
+
+class JobContext:
+    """Given to job handlers to read parameters and report progress"""
+
+    def __init__(self, job_lib: "JobLib", job: JobDocument) -> None:
+        self._job_lib = job_lib
+        self._job = job
+
+    @property
+    def parameters(self) -> dict:
+        return self._job.parameters or {}
+
+    @property
+    def queued(self) -> bool:
+        """True if run by a worker from queue (so failure is retried), False if run
+        in current process by run_now"""
+        return self._job.id is not None
+
+    @property
+    def checkpoint(self) -> typing.Optional[typing.Any]:
+        """Checkpoint given by previous attempt, if any"""
+        return self._job.checkpoint
+
+    def progress(
+        self,
+        progress: float,
+        message: typing.Optional[str] = None,
+        checkpoint: typing.Optional[typing.Any] = None,
+    ) -> None:
+        """Report progress (0.0 to 1.0) and commit: pending changes of handler
+        and checkpoint are committed together"""
+        self._job_lib.report_progress(
+            self._job, progress, message=message, checkpoint=checkpoint
+        )
+
+
+@dataclasses.dataclass
+class JobGroupProgress:
+    total: int = 0
+    pending: int = 0
+    running: int = 0
+    done: int = 0
+    failed: int = 0
+    progress: float = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return not self.pending and not self.running
+
+
+class JobLib:
+    def __init__(
+        self, kernel: "Kernel", lease_seconds: int = DEFAULT_LEASE_SECONDS
+    ) -> None:
+        self._kernel = kernel
+        self._lease_seconds = lease_seconds
+
+    def enqueue(
+        self,
+        name: str,
+        parameters: typing.Optional[dict] = None,
+        group_id: typing.Optional[str] = None,
+        max_attempts: int = 3,
+        commit: bool = True,
+    ) -> JobDocument:
+        job = JobDocument(
+            name=name,
+            parameters=parameters or {},
+            group_id=group_id,
+            status=JobStatus.PENDING.value,
+            attempts=0,
+            max_attempts=max_attempts,
+            progress=0.0,
+        )
+        self._kernel.server_db_session.add(job)
+        if commit:
+            self._kernel.server_db_session.commit()
+        return job
+
+    def enqueue_by_zone(
+        self,
+        name: str,
+        parameters: typing.Optional[dict] = None,
+        zones: typing.Optional[typing.Iterable[typing.Tuple[int, int]]] = None,
+    ) -> str:
+        """Enqueue one job by world zone (default is all zones), with zone
+        coordinates added to parameters. Return group id of these jobs."""
+        if zones is None:
+            zones = [
+                (world_row_i, world_col_i)
+                for world_row_i, world_row in enumerate(
+                    self._kernel.world_map_source.geography.rows
+                )
+                for world_col_i, _ in enumerate(world_row)
+            ]
+
+        group_id = uuid.uuid4().hex
+        for world_row_i, world_col_i in zones:
+            self.enqueue(
+                name,
+                {
+                    **(parameters or {}),
+                    "world_row_i": world_row_i,
+                    "world_col_i": world_col_i,
+                },
+                group_id=group_id,
+                commit=False,
+            )
+        self._kernel.server_db_session.commit()
+        return group_id
+
+    def claim(self, worker_id: str) -> typing.Optional[JobDocument]:
+        """Take next pending job, or a running job which lease expired (its
+        worker crashed)"""
+        session = self._kernel.server_db_session
+        while True:
+            now = datetime.datetime.utcnow()
+            job: typing.Optional[JobDocument] = (
+                session.query(JobDocument)
+                .filter(
+                    or_(
+                        JobDocument.status == JobStatus.PENDING.value,
+                        and_(
+                            JobDocument.status == JobStatus.RUNNING.value,
+                            JobDocument.locked_until < now,
+                        ),
+                    )
+                )
+                .order_by(JobDocument.id)
+                .with_for_update(skip_locked=True)
+                .limit(1)
+                .one_or_none()
+            )
+            if job is None:
+                session.commit()
+                return None
+
+            if job.status == JobStatus.RUNNING.value:
+                server_logger.info(
+                    f"Job {job.id} ({job.name}) lease of {job.locked_by} expired"
+                )
+                if job.attempts >= job.max_attempts:
+                    self._finish(job, JobStatus.FAILED, error="Lease expired")
+                    continue
+
+            job.status = JobStatus.RUNNING.value
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.locked_until = now + datetime.timedelta(seconds=self._lease_seconds)
+            job.started_at = now
+            session.commit()
+            return job
+
+    def report_progress(
+        self,
+        job: JobDocument,
+        progress: float,
+        message: typing.Optional[str] = None,
+        checkpoint: typing.Optional[typing.Any] = None,
+    ) -> None:
+        """Update job progress and extend its lease"""
+        job.progress = max(0.0, min(1.0, progress))
+        job.progress_message = message
+        if checkpoint is not None:
+            job.checkpoint = checkpoint
+        if job.locked_until is not None:
+            job.locked_until = datetime.datetime.utcnow() + datetime.timedelta(
+                seconds=self._lease_seconds
+            )
+        self._kernel.server_db_session.commit()
+
+    def _finish(
+        self, job: JobDocument, status: JobStatus, error: typing.Optional[str] = None
+    ) -> None:
+        job.status = status.value
+        job.error = error
+        job.locked_by = None
+        job.locked_until = None
+        if status in (JobStatus.DONE, JobStatus.FAILED):
+            job.finished_at = datetime.datetime.utcnow()
+        if status == JobStatus.DONE:
+            job.progress = 1.0
+        self._kernel.server_db_session.commit()
+
+    def run(self, job: JobDocument) -> bool:
+        """Execute claimed job handler. Failed job is retried (by a next claim)
+        while it has remaining attempts. Return True if job succeed."""
+        try:
+            handler = JOB_HANDLERS[job.name]
+        except KeyError:
+            job.attempts = job.max_attempts
+            self._finish(job, JobStatus.FAILED, error=f"Unknown job '{job.name}'")
+            return False
+
+        try:
+            handler(self._kernel, JobContext(self, job))
+        except Exception:
+            error = traceback.format_exc()
+            server_logger.error(f"Job {job.id} ({job.name}) failed: {error}")
+            self._kernel.server_db_session.rollback()
+            if job.attempts < job.max_attempts:
+                self._finish(job, JobStatus.PENDING, error=error)
+            else:
+                self._finish(job, JobStatus.FAILED, error=error)
+            return False
+
+        self._finish(job, JobStatus.DONE)
+        return True
+
+    def run_now(self, name: str, parameters: typing.Optional[dict] = None) -> None:
+        """Execute job handler in current process, without queue"""
+        JOB_HANDLERS[name](
+            self._kernel,
+            JobContext(self, JobDocument(name=name, parameters=parameters or {})),
+        )
+
+    def process_next(self, worker_id: str) -> bool:
+        """Claim and run next job. Return False if there is no job to run."""
+        job = self.claim(worker_id)
+        if job is None:
+            return False
+
+        server_logger.info(f"Job {job.id} ({job.name}) {job.parameters} start")
+        if self.run(job):
+            server_logger.info(f"Job {job.id} ({job.name}) done")
+        return True
+
+    def get_group_progress(self, group_id: str) -> JobGroupProgress:
+        group_progress = JobGroupProgress()
+        progress_sum = 0.0
+        for status, count, status_progress_sum in (
+            self._kernel.server_db_session.query(
+                JobDocument.status,
+                func.count(JobDocument.id),
+                func.sum(JobDocument.progress),
+            )
+            .filter(JobDocument.group_id == group_id)
+            .group_by(JobDocument.status)
+        ):
+            setattr(group_progress, JobStatus(status).name.lower(), count)
+            group_progress.total += count
+            progress_sum += status_progress_sum or 0.0
+
+        if group_progress.total:
+            group_progress.progress = progress_sum / group_progress.total
+        return group_progress
+
+    def get_group_failed_jobs(self, group_id: str) -> typing.List[JobDocument]:
+        return (
+            self._kernel.server_db_session.query(JobDocument)
+            .filter(
+                JobDocument.group_id == group_id,
+                JobDocument.status == JobStatus.FAILED.value,
+            )
+            .order_by(JobDocument.id)
+            .all()
+        )
+
+
+def _zone_row_progress(
+    kernel: "Kernel", context: JobContext
+) -> typing.Callable[[int], None]:
+    """Progress callback of zone rows processing: it commits done rows and
+    extends job lease"""
+    height = kernel.get_tile_map(
+        context.parameters["world_row_i"], context.parameters["world_col_i"]
+    ).source.geography.height
+
+    def on_row_done(zone_row_i: int) -> None:
+        context.progress((zone_row_i + 1) / height, f"row {zone_row_i} done")
+
+    return on_row_done
+
+
+@job_handler(SYNC_ZONE_RESOURCES_JOB)
+def sync_zone_resources(kernel: "Kernel", context: JobContext) -> None:
+    created = kernel.zone_lib.sync_zone_resources(
+        context.parameters["world_row_i"],
+        context.parameters["world_col_i"],
+        on_row_done=_zone_row_progress(kernel, context),
+    )
+    context.progress(1.0, f"{created} created")
+
+
+@job_handler(SYNC_BUILD_HEALTH_JOB)
+def sync_build_health(kernel: "Kernel", context: JobContext) -> None:
+    fixed = kernel.build_lib.sync_health(
+        context.parameters["world_row_i"],
+        context.parameters["world_col_i"],
+        on_row_done=_zone_row_progress(kernel, context),
+    )
+    context.progress(1.0, f"{fixed} fixed")
+
+
+@job_handler(POPULATE_AC_JOB)
+def populate_ac(kernel: "Kernel", context: JobContext) -> None:
+    from rolling.server.application import HEADER_NAME__DISABLE_AUTH_TOKEN
+
+    # Created animated corpses not signaled yet to server by a previous attempt
+    signal_ids: typing.List[int] = list(context.checkpoint or [])
+    if not signal_ids:
+        created = kernel.animated_corpse_lib.populate(
+            world_row_i=context.parameters["world_row_i"],
+            world_col_i=context.parameters["world_col_i"],
+            type_=AnimatedCorpseType(context.parameters["type"]),
+            count=context.parameters["count"],
+            commit=False,
+        )
+        signal_ids = [animated_corpse.id for animated_corpse in created]
+        if not context.parameters.get("signal_url"):
+            signal_ids = []
+        # Commit created animated corpses with their checkpoint
+        context.progress(0.0, f"{len(created)} created", checkpoint=signal_ids)
+
+    with requests.Session() as http:
+        for i, animated_corpse_id in enumerate(list(signal_ids)):
+            response = http.put(
+                url=(
+                    f"{context.parameters['signal_url']}"
+                    f"/ac-signal/new/{animated_corpse_id}"
+                ),
+                headers={
+                    HEADER_NAME__DISABLE_AUTH_TOKEN: (
+                        kernel.server_config.disable_auth_token
+                    )
+                },
+            )
+            if response.status_code != 204:
+                error = (
+                    f"Signal animated corpse {animated_corpse_id} "
+                    f"error : code {response.status_code}"
+                )
+                # Raise only under a worker, so the job is retried from checkpoint
+                if context.queued:
+                    raise RuntimeError(error)
+                server_logger.error(error)
+            signal_ids.remove(animated_corpse_id)
+            context.progress(
+                (i + 1) / (i + 1 + len(signal_ids)),
+                f"{i + 1} signaled",
+                checkpoint=signal_ids,
+            )
+
+
+@job_handler(REFRESH_CHARACTERS_JOB)
+def refresh_characters(kernel: "Kernel", context: JobContext) -> None:
+    response = requests.put(
+        f"{kernel.server_config.base_url}/admin/refresh/characters",
+        auth=(kernel.server_config.admin_login, kernel.server_config.admin_password),
+    )
+    server_logger.info(f"Refresh characters response: {response.status_code}")
+    response.raise_for_status()
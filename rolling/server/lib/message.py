@@ -1,7 +1,7 @@
 # coding: utf-8
-from sqlalchemy import String
-from sqlalchemy import cast
+from sqlalchemy import func
 from sqlalchemy.orm import Query
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm.exc import NoResultFound
 from aiohttp import web
 import typing
@@ -12,7 +12,9 @@ from rolling.model.event import NewChatMessageData
 from rolling.model.event import WebSocketEvent
 from rolling.model.event import ZoneEventType
 from rolling.server.document.character import CharacterDocument
+from rolling.server.document.message import ConversationParticipantDocument
 from rolling.server.document.message import MessageDocument
+from rolling.server.document.message import ZoneMessageCursorDocument
 
 if typing.TYPE_CHECKING:
     from rolling.kernel import Kernel
@@ -22,20 +24,32 @@ class MessageLib:
     def __init__(self, kernel: "Kernel") -> None:
         self._kernel = kernel
 
-    def _get_character_messages_query(
-        self,
-        character_id: str,
-        zone: typing.Optional[bool] = None,
-        select=MessageDocument,
+    def _get_character_zone_messages_query(
+        self, character_id: str, select=MessageDocument
     ) -> Query:
-        query = self._kernel.server_db_session.query(select).filter(
-            MessageDocument.character_id == character_id
+        return self._kernel.server_db_session.query(select).filter(
+            MessageDocument.zone == True,
+            MessageDocument.recipient_ids.contains([character_id]),
         )
 
-        if zone is not None:
-            query = query.filter(MessageDocument.zone == zone)
-
-        return query
+    def _get_character_conversation_messages_query(
+        self, character_id: str, select=MessageDocument
+    ) -> Query:
+        return (
+            self._kernel.server_db_session.query(select)
+            .join(
+                ConversationParticipantDocument,
+                (
+                    ConversationParticipantDocument.conversation_id
+                    == MessageDocument.first_message
+                )
+                & (ConversationParticipantDocument.character_id == character_id),
+            )
+            .filter(
+                MessageDocument.zone == False,
+                MessageDocument.recipient_ids.contains([character_id]),
+            )
+        )
 
     def get_character_zone_messages(
         self,
@@ -43,84 +57,134 @@ class MessageLib:
         message_count: typing.Optional[int] = None,
         order=MessageDocument.datetime.desc(),
     ) -> typing.List[MessageDocument]:
-        query = self._get_character_messages_query(character_id, zone=True).order_by(
-            order
-        )
+        query = self._get_character_zone_messages_query(character_id).order_by(order)
         if message_count is not None:
             query = query.limit(message_count)
         return query.all()
 
-    def mark_character_zone_messages_as_read(self, character_id: str) -> None:
-        self._get_character_messages_query(character_id, zone=True).filter(
-            MessageDocument.read == False
-        ).update({MessageDocument.read: True})
+    def mark_character_zone_messages_as_read(
+        self,
+        character_id: str,
+        world_row_i: typing.Optional[int] = None,
+        world_col_i: typing.Optional[int] = None,
+    ) -> None:
+        """Move character read cursors to the last zone message it received, in
+        given zone or (default) in all zones"""
+        query = self._get_character_zone_messages_query(character_id)
+        if world_row_i is not None and world_col_i is not None:
+            query = query.filter(
+                MessageDocument.zone_row_i == world_row_i,
+                MessageDocument.zone_col_i == world_col_i,
+            )
+
+        for zone_row_i, zone_col_i, last_message_id in query.with_entities(
+            MessageDocument.zone_row_i,
+            MessageDocument.zone_col_i,
+            func.max(MessageDocument.id),
+        ).group_by(MessageDocument.zone_row_i, MessageDocument.zone_col_i):
+            self._kernel.server_db_session.merge(
+                ZoneMessageCursorDocument(
+                    character_id=character_id,
+                    world_row_i=zone_row_i,
+                    world_col_i=zone_col_i,
+                    last_read_message_id=last_message_id,
+                )
+            )
 
     def mark_character_conversation_messages_as_read(
         self, character_id: str, conversation_id: int
     ) -> None:
-        self._get_character_messages_query(character_id, zone=False).filter(
-            MessageDocument.read == False,
-            MessageDocument.first_message == conversation_id,
-        ).update({MessageDocument.read: True})
+        last_message_id = (
+            self._kernel.server_db_session.query(func.max(MessageDocument.id))
+            .filter(MessageDocument.first_message == conversation_id)
+            .scalar()
+        )
+        # Updated through its document, so caches know which character changed
+        participant_doc: typing.Optional[ConversationParticipantDocument] = (
+            self._kernel.server_db_session.query(ConversationParticipantDocument)
+            .filter(
+                ConversationParticipantDocument.conversation_id == conversation_id,
+                ConversationParticipantDocument.character_id == character_id,
+            )
+            .one_or_none()
+        )
+        if participant_doc is not None:
+            participant_doc.last_read_message_id = last_message_id
+
+    def get_unread_zone_message_count(self, character_id: str) -> int:
+        return (
+            self._get_character_zone_messages_query(
+                character_id, select=func.count(MessageDocument.id)
+            )
+            .outerjoin(
+                ZoneMessageCursorDocument,
+                (ZoneMessageCursorDocument.character_id == character_id)
+                & (ZoneMessageCursorDocument.world_row_i == MessageDocument.zone_row_i)
+                & (ZoneMessageCursorDocument.world_col_i == MessageDocument.zone_col_i),
+            )
+            .filter(
+                MessageDocument.author_id != character_id,
+                MessageDocument.id
+                > func.coalesce(ZoneMessageCursorDocument.last_read_message_id, 0),
+            )
+            .scalar()
+        )
+
+    def get_unread_conversation_message_count(self, character_id: str) -> int:
+        last_read_message_id = ConversationParticipantDocument.last_read_message_id
+        return (
+            self._get_character_conversation_messages_query(
+                character_id, select=func.count(MessageDocument.id)
+            )
+            .filter(
+                MessageDocument.author_id != character_id,
+                MessageDocument.id > func.coalesce(last_read_message_id, 0),
+            )
+            .scalar()
+        )
 
     def get_last_character_zone_messages(
         self, character_id: str, zone: bool = False
     ) -> MessageDocument:
-        return (
-            self._get_character_messages_query(character_id, zone=zone)
-            .order_by(MessageDocument.datetime.desc())
-            .limit(1)
-            .one()
+        if zone:
+            query = self._get_character_zone_messages_query(character_id)
+        else:
+            query = self._get_character_conversation_messages_query(character_id)
+        return query.order_by(MessageDocument.datetime.desc()).limit(1).one()
+
+    async def add_zone_message(
+        self,
+        character_id: str,
+        message: str,
+        # FIXME BS : rename these param ton world_row_i and world_col_i
+        zone_row_i: int,
+        zone_col_i: int,
+        commit: bool = True,
+    ) -> None:
+        """Store message once for the zone: characters in the zone receive it
+        and read it by their zone read cursor"""
+        if not message.strip():
+            return
+
+        author_doc = self._kernel.character_lib.get_document(character_id)
+        zone_character_ids = self._kernel.character_lib.get_zone_character_ids(
+            zone_row_i, zone_col_i, alive=True
+        )
+        self._kernel.server_db_session.add(
+            MessageDocument(
+                text=message,
+                author_id=character_id,
+                author_name=author_doc.name,
+                zone=True,
+                zone_row_i=zone_row_i,
+                zone_col_i=zone_col_i,
+                concerned=zone_character_ids,
+                recipient_ids=zone_character_ids,
+            )
         )
 
-    # FIXME : delete this view by conversation reforming
-    # async def add_zone_message(
-    #     self,
-    #     character_id: str,
-    #     message: str,
-    #     # FIXME BS : rename these param ton world_row_i and world_col_i
-    #     zone_row_i: int,
-    #     zone_col_i: int,
-    #     commit: bool = True,
-    # ) -> None:
-    #     if not message.strip():
-    #         return
-
-    #     author_doc = self._kernel.character_lib.get_document(character_id)
-    #     zone_characters = self._kernel.character_lib.get_zone_characters(
-    #         row_i=zone_row_i, col_i=zone_col_i
-    #     )
-    #     active_zone_characters_ids = (
-    #         self._kernel.server_zone_events_manager.get_active_zone_characters_ids(
-    #             author_doc.world_row_i, author_doc.world_col_i
-    #         )
-    #     )
-    #     zone_characters_ids = [c.id for c in zone_characters]
-    #     for zone_character in zone_characters:
-    #         self._kernel.server_db_session.add(
-    #             MessageDocument(
-    #                 text=message,
-    #                 character_id=zone_character.id,
-    #                 author_id=character_id,
-    #                 author_name=author_doc.name,
-    #                 read=author_doc.id == zone_character.id
-    #                 or zone_character.id in active_zone_characters_ids,
-    #                 zone=True,
-    #                 zone_row_i=zone_row_i,
-    #                 zone_col_i=zone_col_i,
-    #                 concerned=zone_characters_ids,
-    #             )
-    #         )
-
-    #     if commit:
-    #         self._kernel.server_db_session.commit()
-
-    #     await self.send_new_message_events(
-    #         world_row_i=author_doc.world_row_i,
-    #         world_col_i=author_doc.world_col_i,
-    #         author_id=character_id,
-    #         message=f"{author_doc.name}: {message}",
-    #     )
+        if commit:
+            self._kernel.server_db_session.commit()
 
     def get_last_conversation_message(self, conversation_id: int) -> MessageDocument:
         return (
@@ -131,71 +195,55 @@ class MessageLib:
             .one()
         )
 
-    # FIXME : delete this view by conversation reforming
-    # async def add_conversation_message(
-    #     self,
-    #     author_id: str,
-    #     subject: str,
-    #     message: str,
-    #     concerned: typing.List[str],
-    #     conversation_id: typing.Optional[int] = None,
-    #     is_first_message: bool = False,
-    #     filter_by_same_zone_than_author: bool = False,
-    # ) -> int:
-    #     author_doc = self._kernel.character_lib.get_document(author_id)
-    #     concerned = list(set([author_id] + concerned))
-    #     messages = []
-    #     active_zone_characters_ids = (
-    #         self._kernel.server_zone_events_manager.get_active_zone_characters_ids(
-    #             author_doc.world_row_i, author_doc.world_col_i
-    #         )
-    #     )
-    #     for character_id in set(concerned):
-    #         if filter_by_same_zone_than_author:
-    #             character_doc = self._kernel.character_lib.get_document(character_id)
-    #             if (
-    #                 character_doc.world_row_i != author_doc.world_row_i
-    #                 or character_doc.world_col_i != author_doc.world_col_i
-    #             ):
-    #                 continue
-
-    #         message_obj = MessageDocument(
-    #             subject=subject,
-    #             text=message,
-    #             character_id=character_id,
-    #             author_id=author_id,
-    #             author_name=author_doc.name,
-    #             read=author_doc.id == character_id
-    #             or character_id in active_zone_characters_ids,
-    #             zone=False,
-    #             concerned=concerned,
-    #             first_message=conversation_id,
-    #             is_first_message=is_first_message,
-    #         )
-    #         messages.append(message_obj)
-    #         self._kernel.server_db_session.add(message_obj)
-
-    #     self._kernel.server_db_session.commit()
-
-    #     if not conversation_id:
-    #         first_message = messages[0]
-
-    #         for message_ in messages:
-    #             message_.first_message = first_message.id
-
-    #         self._kernel.server_db_session.commit()
-    #         conversation_id = first_message.id
-
-    #     await self.send_new_message_events(
-    #         world_row_i=author_doc.world_row_i,
-    #         world_col_i=author_doc.world_col_i,
-    #         author_id=author_id,
-    #         message=f"{author_doc.name}: {message}",
-    #         conversation_id=conversation_id,
-    #         concerned=concerned,
-    #     )
-
-    #     return conversation_id
+    async def add_conversation_message(
+        self,
+        author_id: str,
+        subject: str,
+        message: str,
+        concerned: typing.List[str],
+        conversation_id: typing.Optional[int] = None,
+        is_first_message: bool = False,
+        filter_by_same_zone_than_author: bool = False,
+    ) -> int:
+        """Store message once for the conversation: participants read it by their
+        conversation read cursor. With filter_by_same_zone_than_author, only
+        concerned characters in author zone receive the message."""
+        author_doc = self._kernel.character_lib.get_document(author_id)
+        concerned = list(set([author_id] + concerned))
+        recipient_ids = concerned
+        if filter_by_same_zone_than_author:
+            recipient_ids = [
+                r[0]
+                for r in self._kernel.server_db_session.query(CharacterDocument.id)
+                .filter(
+                    CharacterDocument.id.in_(concerned),
+                    CharacterDocument.world_row_i == author_doc.world_row_i,
+                    CharacterDocument.world_col_i == author_doc.world_col_i,
+                )
+                .all()
+            ]
+
+        message_doc = MessageDocument(
+            subject=subject,
+            text=message,
+            author_id=author_id,
+            author_name=author_doc.name,
+            zone=False,
+            concerned=concerned,
+            recipient_ids=recipient_ids,
+            first_message=conversation_id,
+            is_first_message=is_first_message,
+        )
+        self._kernel.server_db_session.add(message_doc)
+        self._kernel.server_db_session.flush()
+
+        if not conversation_id:
+            message_doc.first_message = message_doc.id
+            self.add_conversation_participants(message_doc.id, concerned)
+            conversation_id = message_doc.id
+
+        self._kernel.server_db_session.commit()
+        return conversation_id
 
     async def send_character_chat_message(
         self,
@@ -260,10 +308,11 @@ class MessageLib:
         to_character_ids: typing.Optional[typing.List[str]] = None,
     ) -> None:
         if only_to is not None:
-            await only_to.send_str(
+            await self._kernel.server_zone_events_manager.outbound.broadcast(
+                [only_to],
                 self._kernel.event_serializer_factory.get_serializer(
                     ZoneEventType.NEW_CHAT_MESSAGE
-                ).dump_json(event)
+                ).dump_json(event),
             )
         else:
             await self._kernel.send_to_zone_sockets(
@@ -315,18 +364,33 @@ class MessageLib:
         select=MessageDocument,
     ) -> Query:
         query = (
-            self._get_character_messages_query(character_id, zone=False, select=select)
+            self._get_character_conversation_messages_query(character_id, select=select)
             .filter(MessageDocument.is_first_message == True)
             .order_by(order_by)
         )
 
         if with_character_id:
-            query = query.filter(
-                cast(MessageDocument.concerned, String).contains(with_character_id)
+            with_participant = aliased(ConversationParticipantDocument)
+            query = query.join(
+                with_participant,
+                (with_participant.conversation_id == MessageDocument.first_message)
+                & (with_participant.character_id == with_character_id),
             )
 
         return query
 
+    def add_conversation_participants(
+        self, conversation_id: int, character_ids: typing.Iterable[str]
+    ) -> None:
+        """Index conversation concerned characters, must be called when conversation
+        first message is created"""
+        for character_id in set(character_ids):
+            self._kernel.server_db_session.merge(
+                ConversationParticipantDocument(
+                    conversation_id=conversation_id, character_id=character_id
+                )
+            )
+
     def get_conversation_messages(
         self,
         character_id: str,
@@ -335,7 +399,7 @@ class MessageLib:
         order=MessageDocument.datetime.desc(),
     ) -> typing.List[MessageDocument]:
         query = (
-            self._get_character_messages_query(character_id, zone=False)
+            self._get_character_conversation_messages_query(character_id)
             .filter(MessageDocument.first_message == conversation_id)
             .order_by(order)
         )
@@ -393,7 +457,21 @@ class MessageLib:
     def search_conversation_first_message_for_concerned(
         self, character_id: str, concerned: typing.List[str]
     ) -> typing.Optional[int]:
-        for message in self.get_conversation_first_messages(character_id):
-            if all([concern in message.concerned for concern in concerned]):
-                return message.first_message or message.id
-        return None
+        concerned_ids = list(set(concerned))
+        conversation_ids_query = (
+            self._kernel.server_db_session.query(
+                ConversationParticipantDocument.conversation_id
+            )
+            .filter(ConversationParticipantDocument.character_id.in_(concerned_ids))
+            .group_by(ConversationParticipantDocument.conversation_id)
+            .having(func.count() == len(concerned_ids))
+        )
+        message = (
+            self.get_conversation_first_messages_query(character_id)
+            .filter(MessageDocument.first_message.in_(conversation_ids_query))
+            .limit(1)
+            .one_or_none()
+        )
+        if message is None:
+            return None
+        return message.first_message
@@ -20,9 +20,9 @@ from rolling.model.event import (
 from rolling.model.measure import Unit
 from rolling.model.resource import CarriedResourceDescriptionModel
 from rolling.model.resource import ResourceDescriptionModel
-from rolling.server.action import ActionFactory
 from rolling.server.document.resource import ResourceDocument
 from rolling.server.link import CharacterActionLink
+from rolling.server.util import get_around_filters
 from rolling.server.util import get_round_resource_quantity
 
 
@@ -35,7 +35,7 @@ if typing.TYPE_CHECKING:
 class ResourceLib:
     def __init__(self, kernel: "Kernel") -> None:
         self._kernel = kernel
-        self._action_factory = ActionFactory(kernel)
+        self._action_factory = kernel.action_factory
 
     def get_base_query(
         self,
@@ -298,6 +298,46 @@ class ResourceLib:
             zone_col_i=zone_col_i,
         ).count()
 
+    def get_around_query(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        zone_row_i: int,
+        zone_col_i: int,
+        distance: int = 1,
+    ) -> Query:
+        return self.get_base_query(
+            world_row_i=world_row_i, world_col_i=world_col_i
+        ).filter(
+            *get_around_filters(ResourceDocument, zone_row_i, zone_col_i, distance)
+        )
+
+    def get_ground_quantities_around(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        zone_row_i: int,
+        zone_col_i: int,
+        distance: int = 1,
+    ) -> typing.List[typing.Tuple[int, int, str, float]]:
+        """(zone_row_i, zone_col_i, resource_id, quantity) of ground resources on
+        and around given position, without loading documents"""
+        return [
+            (row.zone_row_i, row.zone_col_i, row.resource_id, float(row.quantity))
+            for row in self.get_base_query(
+                world_row_i=world_row_i,
+                world_col_i=world_col_i,
+                only_columns=[
+                    ResourceDocument.zone_row_i,
+                    ResourceDocument.zone_col_i,
+                    ResourceDocument.resource_id,
+                    ResourceDocument.quantity,
+                ],
+            ).filter(
+                *get_around_filters(ResourceDocument, zone_row_i, zone_col_i, distance)
+            )
+        ]
+
     def get_one_carried_by(
         self,
         character_id: str,
@@ -16,9 +16,9 @@ from rolling.model.event import (
 from rolling.model.measure import Unit
 from rolling.model.stuff import StuffModel
 from rolling.model.stuff import StuffProperties
-from rolling.server.action import ActionFactory
 from rolling.server.document.stuff import StuffDocument
 from rolling.server.link import CharacterActionLink
+from rolling.server.util import get_around_filters
 
 if typing.TYPE_CHECKING:
     from rolling.kernel import Kernel
@@ -28,7 +28,7 @@ if typing.TYPE_CHECKING:
 class StuffLib:
     def __init__(self, kernel: "Kernel") -> None:
         self._kernel = kernel
-        self._action_factory = ActionFactory(kernel)
+        self._action_factory = kernel.action_factory
 
     def get_base_query(
         self,
@@ -224,6 +224,43 @@ class StuffLib:
             zone_col_i=zone_col_i,
         ).count()
 
+    def get_around_query(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        zone_row_i: int,
+        zone_col_i: int,
+        distance: int = 1,
+    ) -> Query:
+        return self.get_base_query(
+            world_row_i=world_row_i, world_col_i=world_col_i
+        ).filter(*get_around_filters(StuffDocument, zone_row_i, zone_col_i, distance))
+
+    def get_zone_stuff_ids_around(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        zone_row_i: int,
+        zone_col_i: int,
+        distance: int = 1,
+    ) -> typing.List[typing.Tuple[int, int, str]]:
+        """(zone_row_i, zone_col_i, stuff_id) of zone stuffs on and around given
+        position, without loading documents"""
+        return [
+            (row.zone_row_i, row.zone_col_i, row.stuff_id)
+            for row in self.get_base_query(
+                world_row_i=world_row_i,
+                world_col_i=world_col_i,
+                only_columns=[
+                    StuffDocument.zone_row_i,
+                    StuffDocument.zone_col_i,
+                    StuffDocument.stuff_id,
+                ],
+            ).filter(
+                *get_around_filters(StuffDocument, zone_row_i, zone_col_i, distance)
+            )
+        ]
+
     def get_stuff(self, stuff_id: int) -> StuffModel:
         doc = self.get_stuff_doc(stuff_id)
         return self.stuff_model_from_doc(doc)
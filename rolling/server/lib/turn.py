@@ -1,11 +1,14 @@
 # coding: utf-8
+import dataclasses
 from itertools import cycle
 from logging import Logger
 import random
+from sqlalchemy import func
 from sqlalchemy.orm.exc import NoResultFound
 import typing
 import requests
 
+from rolling import util
 from rolling.action.drink import DrinkStuffAction
 from rolling.action.eat import EatResourceAction
 from rolling.exception import NoCarriedResource
@@ -14,14 +17,66 @@ from rolling.log import server_logger
 from rolling.map.type.zone import Nothing
 from rolling.model.stuff import ZoneGenerationStuff
 from rolling.server.document.build import BuildDocument
+from rolling.server.document.character import CharacterDocument
 from rolling.server.document.resource import ResourceDocument
 from rolling.server.lib.character import CharacterLib
+from rolling.server.lib.job import REFRESH_CHARACTERS_JOB
 from rolling.server.lib.stuff import StuffLib
-from rolling.util import character_can_drink_in_its_zone
 from rolling.util import get_stuffs_filled_with_resource_id
 from rolling.availability import Availability
 
 
+@dataclasses.dataclass
+class TurnCharacter:
+    """Character state modified by turn phases, written back at end of them"""
+
+    id: str
+    name: str
+    world_row_i: int
+    world_col_i: int
+    life_points: float
+    max_life_comp: float
+    thirst: float
+    hunger: float
+    tiredness: int
+    action_points: float
+    max_action_points: float
+    alive_since: int
+    killed: bool = False
+    # Values known to be in database, changes are written relatively to them
+    stored: typing.Dict[str, float] = dataclasses.field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.stored:
+            self.mark_stored(*TURN_CHARACTER_WRITTEN_FIELDS)
+
+    @property
+    def is_alive(self) -> bool:
+        return self.life_points > 0
+
+    def mark_stored(self, *field_names: str) -> None:
+        for field_name in field_names:
+            self.stored[field_name] = getattr(self, field_name)
+
+    def get_deltas(self) -> typing.Dict[str, float]:
+        deltas = {}
+        for field_name in TURN_CHARACTER_WRITTEN_FIELDS:
+            delta = getattr(self, field_name) - self.stored[field_name]
+            if delta:
+                deltas[field_name] = delta
+        return deltas
+
+
+TURN_CHARACTER_WRITTEN_FIELDS = (
+    "life_points",
+    "thirst",
+    "hunger",
+    "tiredness",
+    "action_points",
+    "alive_since",
+)
+
+
 class TurnLib:
     def __init__(
         self,
@@ -30,20 +85,29 @@ class TurnLib:
         stuff_lib: StuffLib,
         logger: typing.Optional[Logger] = None,
         disable_natural_needs: bool = False,
+        enqueue_refresh: bool = False,
     ) -> None:
         self._kernel = kernel
         self._character_lib = character_lib
         self._stuff_lib = stuff_lib
         self._logger = logger or server_logger
         self._disable_natural_needs = disable_natural_needs
+        self._enqueue_refresh = enqueue_refresh
+        self._zones_contains_fresh_water: typing.Dict[typing.Tuple[int, int], bool] = {}
 
     def execute_turn(self) -> None:
+        # Characters phases work on an in-memory snapshot written back at once
+        self._zones_contains_fresh_water = {}
+        characters = self._get_turn_characters()
         if not self._disable_natural_needs:
-            self._provide_for_natural_needs()
-        self._improve_conditions()
-        self._increment_age()
-        self._kill()
-        self._manage_characters_props()
+            self._provide_for_natural_needs(characters)
+        self._improve_conditions(characters)
+        self._increment_age(characters)
+        self._kill(characters)
+        self._manage_characters_props(characters)
+        self._write_turn_characters(characters)
+        self._kernel.server_db_session.commit()
+
         self._builds_consumptions()
         self._grow()
         self._delete_empty_affinities()
@@ -54,15 +118,12 @@ class TurnLib:
         self._kernel.server_db_session.commit()
 
         # Require refresh for currently connected players
+        if self._enqueue_refresh:
+            self._kernel.job_lib.enqueue(REFRESH_CHARACTERS_JOB)
+            return
+
         try:
-            response = requests.put(
-                f"{self._kernel.server_config.base_url}/admin/refresh/characters",
-                auth=(
-                    self._kernel.server_config.admin_login,
-                    self._kernel.server_config.admin_password,
-                ),
-            )
-            self._logger.info(f"Refresh characters response: {response.status_code}")
+            self._kernel.job_lib.run_now(REFRESH_CHARACTERS_JOB)
         except requests.exceptions.RequestException as exc:
             self._logger.info("Error when refreshing players:", exc)
 
@@ -141,37 +202,120 @@ class TurnLib:
                     self._stuff_lib.add_stuff(stuff_doc, commit=False)
         self._kernel.server_db_session.commit()
 
-    def _provide_for_natural_needs(self) -> None:
-        character_ids = list(self._character_lib.get_all_character_ids())
-        self._logger.info(f"Provide natural needs of {len(character_ids)} characters")
+    def _get_turn_characters(self) -> typing.Dict[str, TurnCharacter]:
+        return {
+            row.id: TurnCharacter(
+                id=row.id,
+                name=row.name,
+                world_row_i=row.world_row_i,
+                world_col_i=row.world_col_i,
+                life_points=float(row.life_points),
+                max_life_comp=float(row.max_life_comp),
+                thirst=float(row.thirst),
+                hunger=float(row.hunger),
+                tiredness=row.tiredness,
+                action_points=float(row.action_points),
+                max_action_points=float(row.max_action_points),
+                alive_since=row.alive_since,
+            )
+            for row in self._kernel.server_db_session.query(
+                CharacterDocument.id,
+                CharacterDocument.name,
+                CharacterDocument.world_row_i,
+                CharacterDocument.world_col_i,
+                CharacterDocument.life_points,
+                CharacterDocument.max_life_comp,
+                CharacterDocument.thirst,
+                CharacterDocument.hunger,
+                CharacterDocument.tiredness,
+                CharacterDocument.action_points,
+                CharacterDocument.max_action_points,
+                CharacterDocument.alive_since,
+            )
+            .filter(CharacterDocument.alive == True)
+            .all()
+        }
+
+    def _write_turn_characters(
+        self, characters: typing.Dict[str, TurnCharacter]
+    ) -> None:
+        # Write changes relatively to database values to keep changes made by
+        # the server while turn was running
+        bounds = {
+            "life_points": (0.0, CharacterDocument.max_life_comp),
+            "thirst": (0.0, 100.0),
+            "hunger": (0.0, 100.0),
+            "tiredness": (0, None),
+            "action_points": (None, CharacterDocument.max_action_points),
+            "alive_since": (None, None),
+        }
+        for character in characters.values():
+            deltas = character.get_deltas()
+            if not deltas:
+                continue
+
+            values = {}
+            for field_name, delta in deltas.items():
+                column = getattr(CharacterDocument, field_name)
+                lower, upper = bounds[field_name]
+                value = column + delta
+                if delta > 0 and upper is not None:
+                    value = func.least(upper, value)
+                elif delta < 0 and lower is not None:
+                    value = func.greatest(lower, value)
+                values[column] = value
+
+            self._kernel.server_db_session.query(CharacterDocument).filter(
+                CharacterDocument.id == character.id
+            ).update(values, synchronize_session=False)
+
+    def _zone_contains_fresh_water(self, world_row_i: int, world_col_i: int) -> bool:
+        zone_position = (world_row_i, world_col_i)
+        if zone_position not in self._zones_contains_fresh_water:
+            self._zones_contains_fresh_water[
+                zone_position
+            ] = util.is_there_resource_id_in_zone(
+                self._kernel,
+                self._kernel.game.config.fresh_water_resource_id,
+                self._kernel.tile_maps_by_position[zone_position].source,
+            )
+
+        return self._zones_contains_fresh_water[zone_position]
+
+    def _provide_for_natural_needs(
+        self, characters: typing.Dict[str, TurnCharacter]
+    ) -> None:
+        self._logger.info(f"Provide natural needs of {len(characters)} characters")
 
-        for character_id in character_ids:
-            character_document = self._character_lib.get_document(character_id)
-            character = self._character_lib.get(character_id)
-            if not character_document.is_alive:
+        for character_id, turn_character in characters.items():
+            if not turn_character.is_alive:
                 continue
 
             self._logger.info(
-                f"Provide natural needs of {character_document.name} {character_document.id}"
+                f"Provide natural needs of {turn_character.name} {character_id}"
             )
-            zone_contains_fresh_water = character_can_drink_in_its_zone(
-                self._kernel, character
+            zone_contains_fresh_water = self._zone_contains_fresh_water(
+                turn_character.world_row_i, turn_character.world_col_i
             )
 
             # DRINKING
-            character_document.thirst = min(
+            turn_character.thirst = min(
                 100.0,
-                float(character_document.thirst)
-                + self._kernel.game.config.thirst_change_per_tick,
+                turn_character.thirst + self._kernel.game.config.thirst_change_per_tick,
             )
-            self._logger.info(f"Increase thirst to {character_document.thirst}")
+            self._logger.info(f"Increase thirst to {turn_character.thirst}")
 
             drink_in = []
             while (
-                character_document.thirst
-                > self._kernel.game.config.stop_auto_drink_thirst
+                turn_character.thirst > self._kernel.game.config.stop_auto_drink_thirst
             ):
-                stuff_with_fresh_water = None
+                if zone_contains_fresh_water:
+                    self._logger.info(f"Drink in zone")
+                    turn_character.thirst = (
+                        self._kernel.game.config.stop_auto_drink_thirst
+                    )
+                    continue
+
                 try:
                     stuff_with_fresh_water = next(
                         get_stuffs_filled_with_resource_id(
@@ -182,209 +326,185 @@ class TurnLib:
                         )
                     )
                 except StopIteration:
-                    pass
-
-                have_drink = False
-                if zone_contains_fresh_water:
-                    self._logger.info(f"Drink in zone")
-                    have_drink = True
-                    character_document.thirst = (
-                        self._kernel.game.config.stop_auto_drink_thirst
-                    )
-
-                elif stuff_with_fresh_water is not None:
-                    self._logger.info(f"Drink in stuff {stuff_with_fresh_water.id}")
-                    have_drink = True
-
-                    stuff_doc = self._kernel.stuff_lib.get_stuff_doc(
-                        stuff_with_fresh_water.id
-                    )
-                    drink_water_action_description = (
-                        self._kernel.game.get_drink_water_action_description()
-                    )
-                    DrinkStuffAction.drink(
-                        self._kernel,
-                        character_document,
-                        stuff_doc,
-                        all_possible=True,
-                        consume_per_tick=drink_water_action_description.properties[
-                            "consume_per_tick"
-                        ],
-                    )
-                    drink_in.append(stuff_doc)
-                    self._logger.info(f"Now thirst to {character_document.thirst}")
-                else:
                     self._logger.info(f"No drink")
-
-                if not have_drink:
                     break
 
+                self._logger.info(f"Drink in stuff {stuff_with_fresh_water.id}")
+                character_document = self._character_lib.get_document(character_id)
+                character_document.thirst = turn_character.thirst
+                stuff_doc = self._kernel.stuff_lib.get_stuff_doc(
+                    stuff_with_fresh_water.id
+                )
+                drink_water_action_description = (
+                    self._kernel.game.get_drink_water_action_description()
+                )
+                DrinkStuffAction.drink(
+                    self._kernel,
+                    character_document,
+                    stuff_doc,
+                    all_possible=True,
+                    consume_per_tick=drink_water_action_description.properties[
+                        "consume_per_tick"
+                    ],
+                )
+                turn_character.thirst = float(character_document.thirst)
+                turn_character.mark_stored("thirst")
+                drink_in.append(stuff_doc)
+                self._logger.info(f"Now thirst to {turn_character.thirst}")
+
             # Dehydrated ! Losing LP
             if (
-                float(character_document.thirst)
+                turn_character.thirst
                 >= self._kernel.game.config.start_thirst_life_point_loss
             ):
-                character_document.life_points = max(
+                turn_character.life_points = max(
                     0.0,
-                    float(character_document.life_points)
+                    turn_character.life_points
                     - self._kernel.game.config.thirst_life_point_loss_per_tick,
                 )
                 self._logger.info(
-                    f"Losing LP because dehydrated for {character_document.life_points}"
+                    f"Losing LP because dehydrated for {turn_character.life_points}"
                 )
 
             # EATING
-            character_document.hunger = min(
+            turn_character.hunger = min(
                 100.0,
-                float(character_document.hunger)
-                + self._kernel.game.config.hunger_change_per_tick,
+                turn_character.hunger + self._kernel.game.config.hunger_change_per_tick,
             )
-            self._logger.info(f"Increase hunger to {character_document.hunger}")
-
-            eat_resource_ids = []
-            while (
-                character_document.hunger
-                > self._kernel.game.config.stop_auto_eat_hunger
-            ):
-                availability = Availability.with_no_cache(self._kernel, character)
-                eatables = cycle(availability.eatables())
-
-                have_eat = False
-
-                try:
-                    carried_resource, action_description = next(eatables)
-                    have_eat = True
-                    try:
-                        EatResourceAction.eat(
-                            self._kernel,
-                            character_doc=character_document,
-                            resource_id=carried_resource.id,
-                            all_possible=True,
-                            consume_per_tick=action_description.properties[
-                                "consume_per_tick"
-                            ],
-                        )
-                    except NoCarriedResource:
-                        pass
-                    self._logger.info(f"Have eat with {carried_resource.id}")
-                    eat_resource_ids.append(carried_resource.id)
-                except StopIteration:
-                    pass
+            self._logger.info(f"Increase hunger to {turn_character.hunger}")
 
-                if not have_eat:
-                    self._logger.info("Have no eat")
-                    break
+            if turn_character.hunger > self._kernel.game.config.stop_auto_eat_hunger:
+                self._eat(turn_character)
 
-            character_document = self._character_lib.get_document(character_id)
             # Hungry ! Losing LP
             if (
-                float(character_document.hunger)
+                turn_character.hunger
                 >= self._kernel.game.config.start_hunger_life_point_loss
             ):
-                character_document.life_points = max(
+                turn_character.life_points = max(
                     0.0,
-                    float(character_document.life_points)
+                    turn_character.life_points
                     - self._kernel.game.config.hunger_life_point_loss_per_tick,
                 )
                 self._logger.info(
-                    f"Losing LP because hungry for {character_document.life_points}"
+                    f"Losing LP because hungry for {turn_character.life_points}"
+                )
+
+    def _eat(self, turn_character: TurnCharacter) -> None:
+        character = self._character_lib.get(turn_character.id)
+        character_document = self._character_lib.get_document(turn_character.id)
+        character_document.hunger = turn_character.hunger
+
+        while turn_character.hunger > self._kernel.game.config.stop_auto_eat_hunger:
+            availability = Availability.with_no_cache(self._kernel, character)
+            eatables = cycle(availability.eatables())
+
+            try:
+                carried_resource, action_description = next(eatables)
+            except StopIteration:
+                self._logger.info("Have no eat")
+                break
+
+            try:
+                EatResourceAction.eat(
+                    self._kernel,
+                    character_doc=character_document,
+                    resource_id=carried_resource.id,
+                    all_possible=True,
+                    consume_per_tick=action_description.properties["consume_per_tick"],
                 )
+            except NoCarriedResource:
+                pass
+            self._logger.info(f"Have eat with {carried_resource.id}")
+            turn_character.hunger = float(character_document.hunger)
 
-            self._character_lib.update(character_document)
+        # Document hunger is flushed with absolute value, even if nothing eaten
+        turn_character.mark_stored("hunger")
 
-    def _improve_conditions(self) -> None:
-        character_ids = list(self._character_lib.get_all_character_ids())
-        self._logger.info(f"Improve conditions of {len(character_ids)} characters")
+    def _improve_conditions(self, characters: typing.Dict[str, TurnCharacter]) -> None:
+        self._logger.info(f"Improve conditions of {len(characters)} characters")
 
-        for character_id in character_ids:
+        for character_id, turn_character in characters.items():
             # TODO: diseases, effect, etc
-            character_document = self._character_lib.get_document(character_id)
-            if not character_document.is_alive:
+            if not turn_character.is_alive:
                 continue
 
             self._logger.info(
-                f"Provide conditions of {character_document.name} {character_document.id}"
+                f"Provide conditions of {turn_character.name} {character_id}"
             )
 
             if (
-                float(character_document.hunger)
+                turn_character.hunger
                 <= self._kernel.game.config.limit_hunger_increase_life_point
-                and float(character_document.thirst)
+                and turn_character.thirst
                 <= self._kernel.game.config.limit_thirst_increase_life_point
             ):
-                new_tiredness = self._character_lib.reduce_tiredness(
-                    character_id, self._kernel.game.config.reduce_tiredness_per_tick
+                turn_character.tiredness = max(
+                    0,
+                    turn_character.tiredness
+                    - self._kernel.game.config.reduce_tiredness_per_tick,
                 )
-                self._logger.info(f"Reduce tiredness for {new_tiredness}")
+                self._logger.info(f"Reduce tiredness for {turn_character.tiredness}")
 
             if (
-                float(character_document.hunger)
+                turn_character.hunger
                 <= self._kernel.game.config.limit_hunger_reduce_tiredness
-                and float(character_document.thirst)
+                and turn_character.thirst
                 <= self._kernel.game.config.limit_thirst_reduce_tiredness
             ):
-                character_document.life_points = min(
-                    character_document.max_life_comp,
-                    float(character_document.life_points)
+                turn_character.life_points = min(
+                    turn_character.max_life_comp,
+                    turn_character.life_points
                     + self._kernel.game.config.life_point_points_per_tick,
                 )
                 self._logger.info(
-                    f"Increase life points for {character_document.life_points}"
+                    f"Increase life points for {turn_character.life_points}"
                 )
 
-            self._character_lib.update(character_document)
-
-    def _increment_age(self) -> None:
+    def _increment_age(self, characters: typing.Dict[str, TurnCharacter]) -> None:
         # In future, increment role play age
-        character_count = self._character_lib.get_all_character_count()
-        self._logger.info(f"Compute age of {character_count} characters")
+        self._logger.info(f"Compute age of {len(characters)} characters")
 
-        for character_id in self._character_lib.get_all_character_ids():
-            character_document = self._character_lib.get_document(character_id)
-            if not character_document.is_alive:
+        for character_id, turn_character in characters.items():
+            if not turn_character.is_alive:
                 continue
 
+            turn_character.alive_since += 1
             self._logger.info(
-                f'Compute age of "{character_document.name}" ({character_document.id})'
+                f'New age of "{turn_character.name}" ({character_id}): '
+                f"{turn_character.alive_since}"
             )
-            character_document.alive_since += 1
-            self._logger.info(f"New age: {character_document.alive_since}")
-            self._character_lib.update(character_document)
 
-    def _manage_characters_props(self) -> None:
-        character_ids = list(self._character_lib.get_all_character_ids())
-        self._logger.info(f"Manage props of {len(character_ids)} characters")
+    def _manage_characters_props(
+        self, characters: typing.Dict[str, TurnCharacter]
+    ) -> None:
+        self._logger.info(f"Manage props of {len(characters)} characters")
 
-        for character_id in character_ids:
-            character_doc = self._kernel.character_lib.get_document(character_id)
-            if not character_doc.is_alive:
+        for character_id, turn_character in characters.items():
+            if turn_character.killed or not turn_character.is_alive:
                 continue
 
-            self._logger.info(
-                f"Manage props of {character_doc.name} {character_doc.id}"
-            )
-
-            character_doc.action_points = min(
-                float(character_doc.max_action_points),
-                float(character_doc.action_points)
+            turn_character.action_points = min(
+                turn_character.max_action_points,
+                turn_character.action_points
                 + self._kernel.game.config.action_points_per_tick,
             )
-            server_logger.info(f"New AP: {character_doc.action_points}")
-            self._kernel.server_db_session.add(character_doc)
-
-        self._kernel.server_db_session.commit()
+            self._logger.info(
+                f"New AP of {turn_character.name} {character_id}: "
+                f"{turn_character.action_points}"
+            )
 
-    def _kill(self) -> None:
-        # In future, increment role play age
+    def _kill(self, characters: typing.Dict[str, TurnCharacter]) -> None:
         self._logger.info(f"Kill some characters")
 
-        for character_id in self._character_lib.get_all_character_ids():
-            character_doc = self._kernel.character_lib.get_document(character_id)
-            if character_doc.alive and character_doc.life_points <= 0:
+        for character_id, turn_character in characters.items():
+            if turn_character.life_points <= 0:
                 self._logger.info(
-                    f"'{character_doc.name}' have '{character_doc.life_points}' life point. kill it."
+                    f"'{turn_character.name}' have '{turn_character.life_points}' "
+                    f"life point. kill it."
                 )
-                self._kernel.character_lib.kill(character_doc.id)
+                self._kernel.character_lib.kill(character_id)
+                turn_character.killed = True
 
     def _builds_consumptions(self) -> None:
         self._logger.info("Build consumptions")
@@ -2,6 +2,7 @@
 import contextlib
 import pathlib
 from sqlalchemy import and_
+from sqlalchemy import func
 from threading import Lock
 import typing
 
@@ -15,6 +16,7 @@ from rolling.map.type.property.traversable import (
 from rolling.map.type.world import WorldMapTileType
 from rolling.map.type.zone import ZoneMapTileType
 from rolling.model.event import WebSocketEvent, ZoneEventType, ZoneTileReplaceData
+from rolling.model.zone import NeighbourhoodCounts
 from rolling.model.zone import ZoneMapModel
 from rolling.model.zone import ZoneTileTypeModel
 from rolling.server.document.resource import ZoneResourceDocument
@@ -62,6 +64,45 @@ class ZoneLib:
 
         return tiles
 
+    def get_neighbourhood_counts(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        zone_row_i: int,
+        zone_col_i: int,
+        distance: int = 1,
+        exclude_character_ids: typing.Optional[typing.List[str]] = None,
+    ) -> NeighbourhoodCounts:
+        """Count ground stuffs, ground resources, (not floor) builds and alive
+        characters on and around given position with one query"""
+        around = dict(
+            world_row_i=world_row_i,
+            world_col_i=world_col_i,
+            zone_row_i=zone_row_i,
+            zone_col_i=zone_col_i,
+            distance=distance,
+        )
+        # Order of queries (like builds one) is not allowed in count subqueries
+        counts = [
+            query.order_by(None).with_entities(func.count()).scalar_subquery()
+            for query in (
+                self._kernel.stuff_lib.get_around_query(**around),
+                self._kernel.resource_lib.get_around_query(**around),
+                self._kernel.build_lib.get_around_query(**around, is_floor=False),
+                self._kernel.character_lib.get_around_query(
+                    **around, exclude_ids=exclude_character_ids
+                ),
+            )
+        ]
+        counts_row = self._kernel.server_db_session.query(*counts).one()
+        stuff_count, resource_count, build_count, character_count = counts_row
+        return NeighbourhoodCounts(
+            stuff_count=stuff_count,
+            resource_count=resource_count,
+            build_count=build_count,
+            character_count=character_count,
+        )
+
     def get_zone(self, row_i: int, col_i: int) -> ZoneMapModel:
         tile_map = self._kernel.get_tile_map(row_i, col_i)
         zone_type_id = self._kernel.world_map_source.geography.get_tile_type(
@@ -121,6 +162,57 @@ class ZoneLib:
         self._kernel.server_db_session.commit()
         return zone_resource_document
 
+    def sync_zone_resources(
+        self,
+        world_row_i: int,
+        world_col_i: int,
+        on_row_done: typing.Optional[typing.Callable[[int], None]] = None,
+    ) -> int:
+        """Create missing zone resource documents of zone tiles finite productions,
+        calling on_row_done after each zone row. Return created documents count."""
+        existing = set(
+            self._kernel.server_db_session.query(
+                ZoneResourceDocument.zone_row_i,
+                ZoneResourceDocument.zone_col_i,
+                ZoneResourceDocument.resource_id,
+            )
+            .filter(
+                ZoneResourceDocument.world_row_i == world_row_i,
+                ZoneResourceDocument.world_col_i == world_col_i,
+            )
+            .all()
+        )
+        tiles_properties = self._kernel.game.world_manager.world.tiles_properties
+        zone_map = self._kernel.get_tile_map(world_row_i, world_col_i)
+
+        created = 0
+        for zone_row_i, zone_row in enumerate(zone_map.source.geography.rows):
+            for zone_col_i, tile_type in enumerate(zone_row):
+                try:
+                    tile_properties = tiles_properties[tile_type]
+                except KeyError:
+                    continue
+
+                for production in tile_properties.produce:
+                    if production.infinite or (
+                        (zone_row_i, zone_col_i, production.resource.id) in existing
+                    ):
+                        continue
+                    self.create_zone_ressource_doc(
+                        world_row_i=world_row_i,
+                        world_col_i=world_col_i,
+                        zone_row_i=zone_row_i,
+                        zone_col_i=zone_col_i,
+                        resource_id=production.resource.id,
+                        quantity=production.start_capacity,
+                        destroy_when_empty=production.destroy_when_empty,
+                        replace_by_when_destroyed=production.replace_by_when_destroyed,
+                    )
+                    created += 1
+            if on_row_done is not None:
+                on_row_done(zone_row_i)
+        return created
+
     async def reduce_resource_quantity(
         self,
         world_row_i: int,
@@ -208,7 +300,11 @@ class ZoneLib:
             with open(zone_file_path, "w") as zone_file:
                 zone_file.write("\n".join(zone_raw_by_lines))
 
-            self._kernel.load_zone_from_file_path(str(zone_file_path))
+            # Resident zone is updated in place (compiled zone cache will be
+            # refreshed from changed file at next zone load)
+            zone_map.source.geography.set_tile_type(
+                zone_row_i, zone_col_i, replacement_type
+            )
 
             await self._kernel.server_zone_events_manager.send_to_sockets(
                 WebSocketEvent(
@@ -1,25 +1,23 @@
 # coding: utf-8
 import asyncio
-import sqlalchemy.exc
 import click
-from random import choice
-import requests
 import typing
 from concurrent.futures import ThreadPoolExecutor
 
-from rolling.map.source import ZoneMap
 from rolling.map.type.world import WorldMapTileType
-from rolling.model.zone import ZoneMapTileProduction
-from rolling.server.application import HEADER_NAME__DISABLE_AUTH_TOKEN
 from rolling.server.base import get_kernel
-from rolling.server.document.corpse import AnimatedCorpseDocument
 from rolling.server.document.corpse import AnimatedCorpseType
-from rolling.server.document.resource import ZoneResourceDocument
 from rolling.server.document.skill import CharacterSkillDocument
 from rolling.server.lib.character import CharacterLib
+from rolling.server.lib.job import POPULATE_AC_JOB
+from rolling.server.lib.job import SYNC_BUILD_HEALTH_JOB
+from rolling.server.lib.job import SYNC_ZONE_RESOURCES_JOB
 from rolling.server.lib.stuff import StuffLib
 from rolling.kernel import ServerConfig
 
+if typing.TYPE_CHECKING:
+    from rolling.kernel import Kernel
+
 
 @click.group()
 def main():
@@ -149,50 +147,51 @@ def setup(character_name: str, knowledge_id: str, config_file_path: str) -> None
     )
 
 
+def _run_by_zone(
+    kernel: "Kernel",
+    job_name: str,
+    zones: typing.List[typing.Tuple[int, int]],
+    enqueue: bool,
+    parameters: typing.Optional[dict] = None,
+) -> None:
+    if enqueue:
+        group_id = kernel.job_lib.enqueue_by_zone(job_name, parameters, zones=zones)
+        click.echo(f"{len(zones)} jobs enqueued (see job-status {group_id})")
+        return
+
+    for world_row_i, world_col_i in zones:
+        click.echo(f"Process {world_row_i}.{world_col_i} ...")
+        kernel.job_lib.run_now(
+            job_name,
+            {
+                **(parameters or {}),
+                "world_row_i": world_row_i,
+                "world_col_i": world_col_i,
+            },
+        )
+
+
+def _get_zones(
+    kernel: "Kernel",
+    zone_type: typing.Optional[typing.Type[WorldMapTileType]] = None,
+) -> typing.List[typing.Tuple[int, int]]:
+    return [
+        (world_row_i, world_col_i)
+        for world_row_i, world_row in enumerate(kernel.world_map_source.geography.rows)
+        for world_col_i, zone_type_ in enumerate(world_row)
+        if zone_type is None or zone_type_ == zone_type
+    ]
+
+
 @main.command()
+@click.option("--enqueue", is_flag=True, help="Enqueue one job by zone for workers")
 @click.option("--config-file-path", "-c", type=str, default="./server.ini")
-def sync_zone_resources(config_file_path: str) -> None:
+def sync_zone_resources(enqueue: bool, config_file_path: str) -> None:
     click.echo("Preparing kernel")
     config = ServerConfig.from_config_file_path(config_file_path)
     kernel = get_kernel(config)
 
-    for world_row_i, world_row in enumerate(kernel.world_map_source.geography.rows):
-        for world_col_i, zone_type in enumerate(world_row):
-            zone_map: ZoneMap = kernel.tile_maps_by_position[(world_row_i, world_col_i)]
-            click.echo(
-                f"Process {world_row_i}.{world_col_i} ({zone_type.__name__}) ..."
-            )
-            for zone_row_i, zone_row in enumerate(zone_map.source.geography.rows):
-                for zone_col_i, tile_type in enumerate(zone_row):
-                    tiles_properties = kernel.game.world_manager.world.tiles_properties
-                    try:
-                        tile_properties = tiles_properties[tile_type]
-                    except KeyError:
-                        continue
-
-                    production: ZoneMapTileProduction
-                    for production in tile_properties.produce:
-                        if production.infinite:
-                            continue
-                        try:
-                            _ = kernel.zone_lib.get_zone_ressource_doc(
-                                world_row_i=world_row_i,
-                                world_col_i=world_col_i,
-                                zone_row_i=zone_row_i,
-                                zone_col_i=zone_col_i,
-                                resource_id=production.resource.id,
-                            )
-                        except sqlalchemy.exc.NoResultFound:
-                            _ = kernel.zone_lib.create_zone_ressource_doc(
-                                world_row_i=world_row_i,
-                                world_col_i=world_col_i,
-                                zone_row_i=zone_row_i,
-                                zone_col_i=zone_col_i,
-                                resource_id=production.resource.id,
-                                quantity=production.start_capacity,
-                                destroy_when_empty=production.destroy_when_empty,
-                                replace_by_when_destroyed=production.replace_by_when_destroyed,
-                            )
+    _run_by_zone(kernel, SYNC_ZONE_RESOURCES_JOB, _get_zones(kernel), enqueue)
 
 
 @main.command()
@@ -202,6 +201,7 @@ def sync_zone_resources(config_file_path: str) -> None:
 @click.option("--host", default="127.0.0.1")
 @click.option("--port", default=5000, type=int)
 @click.option("--disable-sync", is_flag=True)
+@click.option("--enqueue", is_flag=True, help="Enqueue one job by zone for workers")
 @click.option("--config-file-path", "-c", type=str, default="./server.ini")
 def populate_ac(
     zone_type: str,
@@ -210,6 +210,7 @@ def populate_ac(
     host: str,
     port: int,
     disable_sync: bool,
+    enqueue: bool,
     config_file_path: str,
 ) -> None:
     config = ServerConfig.from_config_file_path(config_file_path)
@@ -218,83 +219,50 @@ def populate_ac(
     animated_corpse_type = AnimatedCorpseType(ac_type)
     filter_zone_type = WorldMapTileType.get_for_id(zone_type)
     kernel = get_kernel(config)
-    universe_state = kernel.universe_lib.get_last_state()
-
-    zone_type: typing.Type[WorldMapTileType]
-    for world_row_i, world_row in enumerate(kernel.world_map_source.geography.rows):
-        for world_col_i, zone_type in enumerate(world_row):
-            if zone_type != filter_zone_type:
-                click.echo(f"Ignore {world_row_i}.{world_col_i} ({zone_type.__name__})")
-                continue
-            click.echo(
-                f"Process {world_row_i}.{world_col_i} ({zone_type.__name__}) ..."
-            )
-
-            animated_corpses = kernel.animated_corpse_lib.get_all(
-                world_row_i=world_row_i,
-                world_col_i=world_col_i,
-                type_=animated_corpse_type,
-            )
-
-            if len(animated_corpses) >= count:
-                click.echo(f"{len(animated_corpses)} found, do nothing")
-                continue
-
-            for _ in range(count - len(animated_corpses)):
-                click.echo(f"Create new animated corpse ...")
-
-                traversable_coordinates = kernel.get_traversable_coordinates(
-                    world_row_i, world_col_i
-                )
-                if not traversable_coordinates:
-                    click.echo(f"ERROR: no traversable coordinate found !")
-                    continue
-                zone_row_i, zone_col_i = choice(traversable_coordinates)
-
-                animated_corpse = kernel.animated_corpse_lib.create(
-                    AnimatedCorpseDocument(
-                        alive_since=universe_state.turn,
-                        world_row_i=world_row_i,
-                        world_col_i=world_col_i,
-                        zone_row_i=zone_row_i,
-                        zone_col_i=zone_col_i,
-                        alive=True,
-                        type_=animated_corpse_type.value,
-                    )
-                )
-
-                if disable_sync:
-                    click.echo(f"Sync is disabled, not not sync")
-                click.echo(f"Sync newly added animated corpse (on {host}:{port})")
-
-                response = requests.put(
-                    url=f"http://{host}:{port}/ac-signal/new/{animated_corpse.id}",
-                    headers={
-                        HEADER_NAME__DISABLE_AUTH_TOKEN: kernel.server_config.disable_auth_token
-                    },
-                )
-                if response.status_code != 204:
-                    click.echo(
-                        f"ERROR: Signal newly added result error : code {response.status_code}"
-                    )
+
+    if disable_sync:
+        click.echo("Sync is disabled, do not sync")
+
+    _run_by_zone(
+        kernel,
+        POPULATE_AC_JOB,
+        _get_zones(kernel, zone_type=filter_zone_type),
+        enqueue,
+        parameters={
+            "type": animated_corpse_type.value,
+            "count": count,
+            "signal_url": None if disable_sync else f"http://{host}:{port}",
+        },
+    )
 
 
 @main.command()
+@click.option("--enqueue", is_flag=True, help="Enqueue one job by zone for workers")
 @click.option("--config-file-path", "-c", type=str, default="./server.ini")
-def sync_build_health(config_file_path: str) -> None:
+def sync_build_health(enqueue: bool, config_file_path: str) -> None:
     config = ServerConfig.from_config_file_path(config_file_path)
 
     click.echo("Preparing kernel")
     kernel = get_kernel(config)
 
-    for build_id in kernel.build_lib.get_all_ids(is_on=None):
-        build_doc = kernel.build_lib.get_build_doc(build_id)
-        build_description = kernel.game.config.builds[build_doc.build_id]
-        if build_description.robustness is not None and build_doc.health is None:
-            click.echo(f"Fixing build {build_doc.id}")
-            build_doc.health = build_description.robustness
-            kernel.server_db_session.add(build_doc)
-            kernel.server_db_session.commit()
+    _run_by_zone(kernel, SYNC_BUILD_HEALTH_JOB, _get_zones(kernel), enqueue)
+
+
+@main.command()
+@click.argument("group_id")
+@click.option("--config-file-path", "-c", type=str, default="./server.ini")
+def job_status(group_id: str, config_file_path: str) -> None:
+    config = ServerConfig.from_config_file_path(config_file_path)
+    kernel = get_kernel(config)
+
+    progress = kernel.job_lib.get_group_progress(group_id)
+    click.echo(
+        f"{progress.done}/{progress.total} done, {progress.running} running, "
+        f"{progress.pending} pending, {progress.failed} failed "
+        f"({round(progress.progress * 100)}%)"
+    )
+    for job in kernel.job_lib.get_group_failed_jobs(group_id):
+        click.echo(f"Job {job.id} {job.parameters} failed: {job.error}")
 
 
 @main.command()
@@ -0,0 +1,159 @@
+# coding: utf-8
+from aiohttp import web
+import asyncio
+import dataclasses
+import time
+import typing
+
+from rolling.log import server_logger
+
+
+@dataclasses.dataclass
+class OutboundMetrics:
+    sent: int = 0
+    batches: int = 0
+    dropped: int = 0
+    disconnected: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+
+
+class SocketOutbound:
+    """Bounded queue of frames waiting to be written on one websocket"""
+
+    def __init__(self, socket: web.WebSocketResponse, max_size: int) -> None:
+        self.socket = socket
+        self.queue: "asyncio.Queue[typing.Tuple[float, str]]" = asyncio.Queue(
+            maxsize=max_size
+        )
+        self.writer: typing.Optional[asyncio.Task] = None
+        self.sending_since: typing.Optional[float] = None
+        self.disconnected = False
+
+
+class OutboundQueues:
+    """Send frames to websockets through one queue and one writer task per
+    socket: a slow client only delays its own frames. Clients which can't
+    follow (full queue or send pending since more than send_timeout) are
+    disconnected when a new frame is pushed to them."""
+
+    def __init__(
+        self, max_size: int = 256, send_timeout: float = 10.0, batch_size: int = 64
+    ) -> None:
+        self._max_size = max_size
+        self._send_timeout = send_timeout
+        self._batch_size = batch_size
+        self._outbounds: typing.Dict[web.WebSocketResponse, SocketOutbound] = {}
+        self.metrics = OutboundMetrics()
+
+    def push(self, socket: web.WebSocketResponse, frame: str) -> bool:
+        outbound = self._outbounds.get(socket)
+        if outbound is None:
+            outbound = self._outbounds[socket] = SocketOutbound(socket, self._max_size)
+            outbound.writer = asyncio.ensure_future(self._write(outbound))
+        elif outbound.disconnected:
+            return False
+
+        now = time.monotonic()
+        if (
+            outbound.sending_since is not None
+            and now - outbound.sending_since > self._send_timeout
+        ):
+            server_logger.warning(f"Websocket {socket} too slow, disconnect it")
+            self._disconnect(outbound)
+            return False
+
+        try:
+            outbound.queue.put_nowait((now, frame))
+        except asyncio.QueueFull:
+            server_logger.warning(
+                f"Outbound queue of websocket {socket} is full, disconnect it"
+            )
+            self._disconnect(outbound)
+            return False
+
+        return True
+
+    async def broadcast(
+        self, sockets: typing.Iterable[web.WebSocketResponse], frame: str
+    ) -> None:
+        for socket in sockets:
+            self.push(socket, frame)
+
+        # Let writers take their frames before continue
+        await asyncio.sleep(0)
+
+    async def flush(self, socket: web.WebSocketResponse) -> None:
+        """Wait (at most send_timeout) for queued frames of socket to be written"""
+        outbound = self._outbounds.get(socket)
+        if outbound is None or outbound.disconnected:
+            return
+
+        try:
+            await asyncio.wait_for(outbound.queue.join(), timeout=self._send_timeout)
+        except asyncio.TimeoutError:
+            server_logger.warning(f"Websocket {socket} queued frames not written")
+
+    def discard(self, socket: web.WebSocketResponse) -> None:
+        outbound = self._outbounds.pop(socket, None)
+        if outbound is not None and outbound.writer is not None:
+            outbound.writer.cancel()
+
+    def depths(self) -> typing.List[int]:
+        return [
+            outbound.queue.qsize()
+            for outbound in self._outbounds.values()
+            if not outbound.disconnected
+        ]
+
+    def stats(self) -> dict:
+        depths = self.depths()
+        return {
+            "sockets": len(depths),
+            "queued": sum(depths),
+            "max_depth": max(depths, default=0),
+            "sent": self.metrics.sent,
+            "batches": self.metrics.batches,
+            "dropped": self.metrics.dropped,
+            "disconnected": self.metrics.disconnected,
+            "latency_avg": (
+                self.metrics.latency_total / self.metrics.sent
+                if self.metrics.sent
+                else 0.0
+            ),
+            "latency_max": self.metrics.latency_max,
+        }
+
+    def _disconnect(self, outbound: SocketOutbound) -> None:
+        self.metrics.dropped += outbound.queue.qsize() + 1
+        self.metrics.disconnected += 1
+        outbound.disconnected = True
+        if outbound.writer is not None:
+            outbound.writer.cancel()
+        # Closing the socket ends its listening loop, which discard it from here
+        asyncio.ensure_future(outbound.socket.close())
+
+    async def _write(self, outbound: SocketOutbound) -> None:
+        while True:
+            # Write all frames queued during the same tick in one wake up
+            batch = [await outbound.queue.get()]
+            while not outbound.queue.empty() and len(batch) < self._batch_size:
+                batch.append(outbound.queue.get_nowait())
+            self.metrics.batches += 1
+
+            for enqueued_at, frame in batch:
+                outbound.sending_since = time.monotonic()
+                try:
+                    await outbound.socket.send_str(frame)
+                except ConnectionResetError as exc:
+                    server_logger.debug(exc)
+                except Exception as exc:
+                    server_logger.exception(exc)
+                else:
+                    latency = time.monotonic() - enqueued_at
+                    self.metrics.sent += 1
+                    self.metrics.latency_total += latency
+                    self.metrics.latency_max = max(self.metrics.latency_max, latency)
+                finally:
+                    outbound.sending_since = None
+                    outbound.queue.task_done()
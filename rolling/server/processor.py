@@ -1,9 +1,41 @@
 # coding: utf-8
+import contextlib
+from contextvars import ContextVar
 from hapic.processor.serpyco import SerpycoProcessor
 import typing
 
 from guilang.description import Description
 
+DescriptionDecorator = typing.Callable[[Description], None]
+# Filled by application middlewares for current request, applied on handler
+# Description just before its (single) serialization
+description_decorators: ContextVar[
+    typing.Optional[typing.List[DescriptionDecorator]]
+] = ContextVar("DescriptionDecorators", default=None)
+
+
+@contextlib.contextmanager
+def description_decorator(
+    decorator: DescriptionDecorator,
+) -> typing.Generator[None, None, None]:
+    """Apply decorator on Description serialized in this block"""
+    token = description_decorators.set(
+        (description_decorators.get() or []) + [decorator]
+    )
+    try:
+        yield
+    finally:
+        # Requests of a keep-alive connection share the same task context
+        description_decorators.reset(token)
+
+
+def decorate_description(description: Description) -> Description:
+    # Description is VERY permissive, consider is not a description if no title
+    if description.title:
+        for decorator in description_decorators.get() or []:
+            decorator(description)
+    return description
+
 
 class RollingSerpycoProcessor(SerpycoProcessor):
     def dump(self, data: typing.Any) -> typing.Any:
@@ -16,5 +48,6 @@ class RollingSerpycoProcessor(SerpycoProcessor):
                 for form_item in item.items:
                     form_item.id = counter
                     counter += 1
+            decorate_description(data)
 
         return super().dump(data)
@@ -35,6 +35,7 @@ async def run(args: argparse.Namespace) -> None:
         stuff_lib=stuff_lib,
         logger=server_logger,
         disable_natural_needs=args.disable_natural_needs,
+        enqueue_refresh=args.enqueue_refresh,
     )
     turn_lib.execute_turn()
 
@@ -56,6 +57,11 @@ def main() -> None:
         action="store_true",
         help="Disable natural needs of characters",
     )
+    parser.add_argument(
+        "--enqueue-refresh",
+        action="store_true",
+        help="Refresh connected players by a job (see rolling-server-worker)",
+    )
 
     args = parser.parse_args()
     asyncio.run(run(args))
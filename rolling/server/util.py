@@ -138,5 +138,15 @@ async def with_multiple_carried_stuffs(
     )
 
 
+def get_around_filters(
+    document: typing.Any, zone_row_i: int, zone_col_i: int, distance: int = 1
+) -> list:
+    """Filters matching the square of tiles around (and on) given zone position"""
+    return [
+        document.zone_row_i.between(zone_row_i - distance, zone_row_i + distance),
+        document.zone_col_i.between(zone_col_i - distance, zone_col_i + distance),
+    ]
+
+
 def get_round_resource_quantity(quantity: float) -> str:
     return str(round(quantity * 0.1, 4))
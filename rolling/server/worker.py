@@ -0,0 +1,90 @@
+# coding: utf-8
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import time
+
+from rolling.kernel import ServerConfig
+from rolling.log import configure_logging
+from rolling.log import server_logger
+from rolling.server.base import get_kernel
+
+
+def work(args: argparse.Namespace) -> None:
+    if args.debug:
+        configure_logging(logging.DEBUG)
+    else:
+        configure_logging(logging.INFO)
+
+    if args.sentry:
+        import sentry_sdk
+        from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+
+        sentry_sdk.init(dsn=args.sentry, integrations=[SqlalchemyIntegration()])
+
+    config = ServerConfig.from_config_file_path(args.server_config_file_path)
+    kernel = get_kernel(config)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    server_logger.info(f"Worker {worker_id} started")
+
+    while True:
+        if kernel.job_lib.process_next(worker_id):
+            continue
+        if args.once:
+            server_logger.info(f"Worker {worker_id}: no more job, exit")
+            return
+        time.sleep(args.poll_interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process queued jobs")
+    parser.add_argument(
+        "server_config_file_path",
+        type=str,
+        help="server config file path",
+        default="./server.ini",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help="Worker processes count (default is job_workers config or 1)",
+        default=None,
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        help="Seconds to wait when there is no job",
+        default=5.0,
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Exit when there is no more job"
+    )
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    parser.add_argument(
+        "--sentry", type=str, help="Sentry address to use", default=None
+    )
+
+    args = parser.parse_args()
+    processes = args.processes
+    if processes is None:
+        config = ServerConfig.from_config_file_path(args.server_config_file_path)
+        processes = int(config.job_workers or 1)
+
+    if processes <= 1:
+        work(args)
+        return
+
+    # Each process has its own kernel and database connection
+    workers = [
+        multiprocessing.Process(target=work, args=(args,)) for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
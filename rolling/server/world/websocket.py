@@ -16,6 +16,7 @@ from rolling.model.event import WebSocketEvent
 from rolling.model.event import ZoneEventType
 from rolling.model.serializer import ZoneEventSerializerFactory
 from rolling.server.event import EventProcessorFactory
+from rolling.server.outbound import OutboundQueues
 
 if typing.TYPE_CHECKING:
     from rolling.kernel import Kernel
@@ -24,6 +25,7 @@ if typing.TYPE_CHECKING:
 class WorldEventsManager:
     def __init__(self, kernel: "Kernel", loop: asyncio.AbstractEventLoop) -> None:
         self._sockets: typing.List[web.WebSocketResponse] = []
+        self.outbound = OutboundQueues()
         self._event_processor_factory = EventProcessorFactory(kernel, self)
         self._event_serializer_factory = ZoneEventSerializerFactory()
         self._loop = loop or asyncio.get_event_loop()
@@ -61,6 +63,7 @@ class WorldEventsManager:
 
         # If this code reached: ws is disconnected
         server_logger.debug(f"remove world websocket")
+        self.outbound.discard(socket)
         self._sockets.remove(socket)
 
         return socket
@@ -78,7 +81,8 @@ class WorldEventsManager:
                 try:
                     await self._process_msg(msg, socket)
                 except DisconnectClient:
-                    await socket.send_str(
+                    await self.outbound.broadcast(
+                        [socket],
                         self._event_serializer_factory.get_serializer(
                             ZoneEventType.SERVER_PERMIT_CLOSE
                         ).dump_json(
@@ -88,8 +92,10 @@ class WorldEventsManager:
                                 type=ZoneEventType.SERVER_PERMIT_CLOSE,
                                 data=EmptyData(),
                             )
-                        )
+                        ),
                     )
+                    # Queued events (like SERVER_PERMIT_CLOSE) are sent before closing
+                    await self.outbound.flush(socket)
                     return
                 except ConnectionResetError as exc:
                     server_logger.debug(str(exc))
@@ -131,12 +137,7 @@ class WorldEventsManager:
             ).dump_json(exception_event)
 
             # FIXME: do kept this feature ?
-            try:
-                await socket.send_str(exception_event_str)
-            except ConnectionResetError as exc:
-                server_logger.debug(exc)
-            except Exception:
-                server_logger.exception("Error when send event (world)")
+            await self.outbound.broadcast([socket], exception_event_str)
 
     def get_sockets(self) -> typing.Iterable[web.WebSocketResponse]:
         for socket in self._sockets:
@@ -148,19 +149,14 @@ class WorldEventsManager:
         world_row_i: int,
         world_col_i: int,
         repeat_to_zone: bool = True,
+        event_str: typing.Optional[str] = None,
     ) -> str:
-        event_str = self._kernel.event_serializer_factory.get_serializer(
-            event.type
-        ).dump_json(event)
-
-        for socket in self.get_sockets():
-            try:
-                server_logger.debug(event_str)
-                await socket.send_str(event_str)
-            except ConnectionResetError as exc:
-                server_logger.debug(exc)
-            except Exception as exc:
-                server_logger.exception(exc)
+        if event_str is None:
+            event_str = self._kernel.event_serializer_factory.get_serializer(
+                event.type
+            ).dump_json(event)
+
+        await self.outbound.broadcast(self.get_sockets(), event_str)
 
         # Replicate message on concerned zone websockets
         if repeat_to_zone:
@@ -175,11 +171,15 @@ class WorldEventsManager:
 
     async def close_websocket(self, socket_to_remove: web.WebSocketResponse) -> None:
         server_logger.debug(f"Close_websocket {socket_to_remove}")
+        if not socket_to_remove.closed:
+            await self.outbound.flush(socket_to_remove)
         try:
             await socket_to_remove.close()
         except CancelledError:
             pass  # consider ok if already closed
 
+        self.outbound.discard(socket_to_remove)
+
         try:
             self._sockets.remove(socket_to_remove)
         except ValueError:
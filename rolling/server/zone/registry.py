@@ -0,0 +1,110 @@
+# coding: utf-8
+from aiohttp import web
+import typing
+
+ZonePosition = typing.Tuple[int, int]
+
+
+class SocketRegistry:
+    """Zone websockets indexes: all operations are O(1) (or O(n) with n the
+    returned sockets count). Insertion order is kept."""
+
+    def __init__(self) -> None:
+        self._zone_by_socket: typing.Dict[web.WebSocketResponse, ZonePosition] = {}
+        self._sockets_by_zone: typing.Dict[
+            ZonePosition, typing.Dict[web.WebSocketResponse, None]
+        ] = {}
+        self._character_id_by_socket: typing.Dict[web.WebSocketResponse, str] = {}
+        self._sockets_by_character_id: typing.Dict[
+            str, typing.Dict[web.WebSocketResponse, None]
+        ] = {}
+        self._reader_token_by_socket: typing.Dict[web.WebSocketResponse, str] = {}
+        self._socket_by_token: typing.Dict[str, web.WebSocketResponse] = {}
+        self._token_by_socket: typing.Dict[web.WebSocketResponse, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._zone_by_socket)
+
+    def add(
+        self,
+        socket: web.WebSocketResponse,
+        zone: ZonePosition,
+        character_id: str,
+        token: typing.Optional[str] = None,
+        reader_token: typing.Optional[str] = None,
+    ) -> None:
+        self._zone_by_socket[socket] = zone
+        self._sockets_by_zone.setdefault(zone, {})[socket] = None
+        self._character_id_by_socket[socket] = character_id
+        self._sockets_by_character_id.setdefault(character_id, {})[socket] = None
+
+        if token:
+            self._socket_by_token[token] = socket
+            self._token_by_socket[socket] = token
+
+        if reader_token:
+            self._reader_token_by_socket[socket] = reader_token
+
+    def remove(self, socket: web.WebSocketResponse) -> None:
+        zone = self._zone_by_socket.pop(socket, None)
+        if zone is not None:
+            self._discard(self._sockets_by_zone, zone, socket)
+
+        character_id = self._character_id_by_socket.pop(socket, None)
+        if character_id is not None:
+            self._discard(self._sockets_by_character_id, character_id, socket)
+
+        self._reader_token_by_socket.pop(socket, None)
+        token = self._token_by_socket.pop(socket, None)
+        if token is not None and self._socket_by_token.get(token) is socket:
+            del self._socket_by_token[token]
+
+    def move(self, socket: web.WebSocketResponse, zone: ZonePosition) -> None:
+        previous_zone = self._zone_by_socket.get(socket)
+        if previous_zone is None:
+            return
+
+        self._discard(self._sockets_by_zone, previous_zone, socket)
+        self._zone_by_socket[socket] = zone
+        self._sockets_by_zone.setdefault(zone, {})[socket] = None
+
+    def sockets(self) -> typing.List[web.WebSocketResponse]:
+        return list(self._zone_by_socket.keys())
+
+    def zone(self, socket: web.WebSocketResponse) -> typing.Optional[ZonePosition]:
+        return self._zone_by_socket.get(socket)
+
+    def zone_sockets(
+        self, zone: ZonePosition
+    ) -> typing.Iterable[web.WebSocketResponse]:
+        return self._sockets_by_zone.get(zone, {}).keys()
+
+    def character_id(self, socket: web.WebSocketResponse) -> str:
+        return self._character_id_by_socket[socket]
+
+    def character_sockets(
+        self, character_id: str
+    ) -> typing.Iterable[web.WebSocketResponse]:
+        return self._sockets_by_character_id.get(character_id, {}).keys()
+
+    def reader_token(self, socket: web.WebSocketResponse) -> typing.Optional[str]:
+        return self._reader_token_by_socket.get(socket)
+
+    def socket_by_token(
+        self, token: typing.Optional[str]
+    ) -> typing.Optional[web.WebSocketResponse]:
+        return self._socket_by_token.get(token)
+
+    @staticmethod
+    def _discard(
+        index: typing.Dict[typing.Any, typing.Dict[web.WebSocketResponse, None]],
+        key: typing.Any,
+        socket: web.WebSocketResponse,
+    ) -> None:
+        sockets = index.get(key)
+        if sockets is None:
+            return
+
+        sockets.pop(socket, None)
+        if not sockets:
+            del index[key]
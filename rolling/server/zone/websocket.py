@@ -17,6 +17,8 @@ from rolling.model.event import WebSocketEvent
 from rolling.model.event import ZoneEventType
 from rolling.model.serializer import ZoneEventSerializerFactory
 from rolling.server.event import EventProcessorFactory
+from rolling.server.outbound import OutboundQueues
+from rolling.server.zone.registry import SocketRegistry
 
 if typing.TYPE_CHECKING:
     from rolling.kernel import Kernel
@@ -24,14 +26,8 @@ if typing.TYPE_CHECKING:
 
 class ZoneEventsManager:
     def __init__(self, kernel: "Kernel", loop: asyncio.AbstractEventLoop) -> None:
-        self._sockets: typing.Dict[
-            typing.Tuple[int, int], typing.List[web.WebSocketResponse]
-        ] = {}
-        self._sockets_character_id: typing.Dict[web.WebSocketResponse, str] = {}
-        self._sockets_associated_reader_token: typing.Dict[
-            web.WebSocketResponse, str
-        ] = {}
-        self._sockets_by_token: typing.Dict[str, web.WebSocketResponse] = {}
+        self._registry = SocketRegistry()
+        self.outbound = OutboundQueues()
         self._event_processor_factory = EventProcessorFactory(kernel, self)
         self._event_serializer_factory = ZoneEventSerializerFactory()
         self._loop = loop or asyncio.get_event_loop()
@@ -40,65 +36,43 @@ class ZoneEventsManager:
     async def garbage_collector_task(self) -> None:
         while True:
             await asyncio.sleep(1.0)
-            for sockets in self._sockets.values():
-                for socket in sockets:
-                    if socket.close_code:
-                        server_logger.debug(
-                            f"Garbage collector :: close websocket {socket}"
-                        )
-                        await self.close_websocket(socket)
+            for socket in self._registry.sockets():
+                if socket.close_code:
+                    server_logger.debug(
+                        f"Garbage collector :: close websocket {socket}"
+                    )
+                    await self.close_websocket(socket)
 
     async def characters_events_task(self) -> None:
         while True:
             await asyncio.sleep(60.0)
-            for sockets in self._sockets.values():
-                for socket in sockets:
-                    character_id = self.get_character_id_for_socket(socket)
-                    character_doc = self._kernel.character_lib.get_document(
-                        character_id
-                    )
-                    await self._kernel.character_lib.refresh_character(character_doc)
+            for socket in self._registry.sockets():
+                character_id = self.get_character_id_for_socket(socket)
+                character_doc = self._kernel.character_lib.get_document(character_id)
+                await self._kernel.character_lib.refresh_character(character_doc)
 
     def get_character_id_for_socket(self, socket: web.WebSocketResponse) -> str:
-        return self._sockets_character_id[socket]
+        return self._registry.character_id(socket)
 
     def get_world_coordinates_for_socket(
         self, socket: web.WebSocketResponse
     ) -> typing.Optional[typing.Tuple[int, int]]:
-        for coordinates, sockets in self._sockets.items():
-            if socket in sockets:
-                return coordinates
-
-        return None
+        return self._registry.zone(socket)
 
     async def close_websocket(self, socket_to_remove: web.WebSocketResponse) -> None:
         character_id = self.get_character_id_for_socket(socket_to_remove)
         character_doc = self._kernel.character_lib.get_document(character_id)
         server_logger.debug(f"Close_websocket {socket_to_remove} ('{character_id}')")
+        if not socket_to_remove.closed:
+            # Queued events (like SERVER_PERMIT_CLOSE) are sent before closing
+            await self.outbound.flush(socket_to_remove)
         try:
             await socket_to_remove.close()
         except CancelledError:
             pass  # consider ok if already closed
 
-        for sockets in self._sockets.values():
-            try:
-                sockets.remove(socket_to_remove)
-            except ValueError:
-                pass
-
-        try:
-            del self._sockets_character_id[socket_to_remove]
-        except KeyError:
-            pass
-
-        try:
-            del self._sockets_associated_reader_token[socket_to_remove]
-        except KeyError:
-            pass
-
-        for token, socket in list(self._sockets_by_token.items()):
-            if socket == socket_to_remove:
-                del self._sockets_by_token[token]
+        self.outbound.discard(socket_to_remove)
+        self._registry.remove(socket_to_remove)
 
         await self._kernel.message_lib.send_system_chat_message(
             world_row_i=character_doc.world_row_i,
@@ -130,14 +104,13 @@ class ZoneEventsManager:
         # Something lik asyncio.ensure_future(self._heartbeat(ws))
 
         # Make it available for send job
-        self._sockets.setdefault((row_i, col_i), []).append(socket)
-        self._sockets_character_id[socket] = character_id
-
-        if token:
-            self._sockets_by_token[token] = socket
-
-        if reader_token:
-            self._sockets_associated_reader_token[socket] = reader_token
+        self._registry.add(
+            socket,
+            (row_i, col_i),
+            character_id,
+            token=token,
+            reader_token=reader_token,
+        )
 
         # Inform them about this connection
         here_character_ids = (
@@ -249,18 +222,16 @@ class ZoneEventsManager:
             ).dump_json(exception_event)
 
             # FIXME: do kept this feature ?
-            try:
-                await socket.send_str(exception_event_str)
-            except ConnectionResetError as exc:
-                server_logger.debug(exc)
-            except Exception:
-                server_logger.exception("Error when send event (zone)")
+            await self.outbound.broadcast([socket], exception_event_str)
+
+    def has_zone_sockets(self, row_i: int, col_i: int) -> bool:
+        return bool(self._registry.zone_sockets((row_i, col_i)))
 
     def get_sockets(
         self, row_i: int, col_i: int
     ) -> typing.Iterable[web.WebSocketResponse]:
-        for socket in self._sockets.get((row_i, col_i), []):
-            yield socket
+        # NOTE: copy because sockets can be closed while caller iterate
+        return list(self._registry.zone_sockets((row_i, col_i)))
 
     async def send_to_sockets(
         self,
@@ -283,21 +254,13 @@ class ZoneEventsManager:
         else:
             sockets = self.get_sockets(world_row_i, world_col_i)
 
-        if sockets:
-            for socket in sockets:
-                if (
-                    character_ids is not None
-                    and self.get_character_id_for_socket(socket) not in character_ids
-                ):
-                    continue
-
-                try:
-                    server_logger.debug(event_str)
-                    await socket.send_str(event_str)
-                except ConnectionResetError as exc:
-                    server_logger.debug(exc)
-                except Exception as exc:
-                    server_logger.exception(exc)
+        if character_ids is not None:
+            sockets = [
+                socket
+                for socket in sockets
+                if self.get_character_id_for_socket(socket) in character_ids
+            ]
+        await self.outbound.broadcast(sockets, event_str)
 
         # Replicate message on world websockets
         if repeat_to_world:
@@ -306,6 +269,7 @@ class ZoneEventsManager:
                 world_row_i=world_row_i,
                 world_col_i=world_col_i,
                 repeat_to_zone=False,
+                event_str=event_str,
             )
 
         return event_str
@@ -321,42 +285,25 @@ class ZoneEventsManager:
     async def respond_to_socket(
         self, socket: web.WebSocketResponse, event_str: str
     ) -> None:
-        associated_reader_token = self._sockets_associated_reader_token.get(socket)
+        associated_reader_token = self._registry.reader_token(socket)
 
         if not associated_reader_token:
-            try:
-                await socket.send_str(event_str)
-            except ConnectionResetError as exc:
-                server_logger.debug(str(exc))
-            except Exception:
-                server_logger.exception("Error when respond to socket")
+            await self.outbound.broadcast([socket], event_str)
             return
 
-        if associated_reader_token not in self._sockets_by_token:
+        associated_reader_ws = self._registry.socket_by_token(associated_reader_token)
+        if associated_reader_ws is None:
             server_logger.warning(
                 f"No associated reader ws for token '{associated_reader_token}' !"
             )
             return
 
-        associated_reader_ws = self._sockets_by_token.get(associated_reader_token)
-        try:
-            await associated_reader_ws.send_str(event_str)
-        except ConnectionResetError as exc:
-            server_logger.debug(str(exc))
-        except Exception:
-            server_logger.exception("Error when respond to socket")
+        await self.outbound.broadcast([associated_reader_ws], event_str)
 
     def change_socket_zone_to(
         self, socket: web.WebSocketResponse, world_row_i: int, world_col_i: int
     ) -> None:
-        for position, sockets in self._sockets.items():
-            for socket_ in sockets:
-                if socket_ == socket:
-                    self._sockets[position].remove(socket_)
-                    self._sockets.setdefault((world_row_i, world_col_i), []).append(
-                        socket_
-                    )
-                    return None
+        self._registry.move(socket, (world_row_i, world_col_i))
 
     def get_character_socket(
         self,
@@ -364,16 +311,15 @@ class ZoneEventsManager:
     ) -> typing.Optional[web.WebSocketResponse]:
         found_sockets = []
 
-        for socket, socket_character_id in self._sockets_character_id.items():
-            if character_id == socket_character_id:
-                # Socket must be a response socket
-                reader_token = self._sockets_associated_reader_token.get(socket)
-                reader_socket = self._sockets_by_token.get(reader_token)
-                if reader_socket is not None and reader_socket.close_code is None:
-                    found_sockets.append(reader_socket)
-                # With rollgui2 there is no more reader token
-                else:
-                    found_sockets.append(socket)
+        for socket in self._registry.character_sockets(character_id):
+            # Socket must be a response socket
+            reader_token = self._registry.reader_token(socket)
+            reader_socket = self._registry.socket_by_token(reader_token)
+            if reader_socket is not None and reader_socket.close_code is None:
+                found_sockets.append(reader_socket)
+            # With rollgui2 there is no more reader token
+            else:
+                found_sockets.append(socket)
 
         if len(found_sockets) > 1:
             server_logger.warning(
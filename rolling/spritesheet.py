@@ -0,0 +1,175 @@
+# coding: utf-8
+import asyncio
+import concurrent.futures
+import hashlib
+import multiprocessing
+import os
+import pathlib
+import typing
+
+from PIL import Image
+import rrolling
+
+from rolling.log import kernel_logger
+
+if typing.TYPE_CHECKING:
+    from rrolling.spritesheets import CharacterSpriteSheetGenerator
+
+SPRITESHEETS_FOLDER = pathlib.Path("game/media")
+
+# Character spritesheet generator of pool processes
+_generator: typing.Optional["CharacterSpriteSheetGenerator"] = None
+
+
+def build_spritesheet(lpcg_spritesheets: str, identifiers: str, output: str) -> None:
+    """Render spritesheet file if not already done (run in pool processes)"""
+    global _generator
+
+    if os.path.exists(output):
+        return
+
+    if _generator is None:
+        _generator = rrolling.spritesheets.CharacterSpriteSheetGenerator(
+            lpcg_spritesheets
+        )
+    _generator.build(identifiers=identifiers, output=output)
+
+
+def build_illustration(spritesheet_path: str, output: str) -> None:
+    """Render illustration file from spritesheet if not already done (run in pool
+    processes)"""
+    if os.path.exists(output):
+        return
+
+    spritesheet_image = Image.open(spritesheet_path)
+    image = spritesheet_image.crop((0, 640, 0 + 65, 640 + 65))
+    image = image.resize((130, 130))
+    back = Image.new(mode="RGB", size=(768, 300))
+    back.paste(
+        image,
+        ((768 // 2) - (image.width // 2), (300 // 2) - (image.height // 2)),
+    )
+    back.save(output)
+
+
+class SpritesheetService:
+    """Character spritesheets: paths are computed once per identifiers and files
+    are rendered in a process pool. Concurrent renders of the same file are
+    done once."""
+
+    def __init__(
+        self,
+        lpcg_spritesheets: str,
+        default_identifiers: str,
+        generator: "rrolling.spritesheets.CharacterSpriteSheetGenerator",
+        max_workers: int = 2,
+        folder: pathlib.Path = SPRITESHEETS_FOLDER,
+    ) -> None:
+        self._lpcg_spritesheets = lpcg_spritesheets
+        self._generator = generator
+        self._default_identifiers = default_identifiers
+        self._max_workers = max_workers
+        self._folder = folder
+        self._paths: typing.Dict[str, pathlib.Path] = {}
+        # Files known as existing
+        self._rendered: typing.Set[pathlib.Path] = set()
+        self._renders: typing.Dict[pathlib.Path, asyncio.Future] = {}
+        self._pool: typing.Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    def path(self, identifiers: typing.Optional[str]) -> pathlib.Path:
+        identifiers = identifiers or self._default_identifiers
+        try:
+            return self._paths[identifiers]
+        except KeyError:
+            image_id = hashlib.md5(identifiers.encode()).hexdigest()
+            path = self._folder / f"character_spritesheet_{image_id}.png"
+            self._paths[identifiers] = path
+            return path
+
+    def illustration_path(self, identifiers: typing.Optional[str]) -> pathlib.Path:
+        spritesheet_path = self.path(identifiers)
+        return spritesheet_path.parent / f"{spritesheet_path.name}_illustration.png"
+
+    def request(self, identifiers: typing.Optional[str]) -> pathlib.Path:
+        """Return spritesheet path without waiting for its file: if needed, file
+        is rendered in background"""
+        path = self.path(identifiers)
+        if path not in self._rendered and path not in self._renders:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # No loop (scripts, turn): nothing to not block
+                self._render_now(identifiers)
+            else:
+                self._schedule(identifiers)
+        return path
+
+    async def render(self, identifiers: typing.Optional[str]) -> pathlib.Path:
+        """Return spritesheet path once its file exists"""
+        path = self.path(identifiers)
+        if path not in self._rendered:
+            await self._schedule(identifiers)
+        return path
+
+    async def illustration(self, identifiers: typing.Optional[str]) -> pathlib.Path:
+        """Return illustration path once its file exists"""
+        spritesheet_path = await self.render(identifiers)
+        path = self.illustration_path(identifiers)
+        if path not in self._rendered:
+            await self._submit(
+                path, build_illustration, str(spritesheet_path), str(path)
+            )
+        return path
+
+    def _schedule(self, identifiers: typing.Optional[str]) -> asyncio.Future:
+        return self._submit(
+            self.path(identifiers),
+            build_spritesheet,
+            self._lpcg_spritesheets,
+            identifiers or self._default_identifiers,
+            str(self.path(identifiers)),
+        )
+
+    def _submit(
+        self, path: pathlib.Path, func: typing.Callable[..., None], *args: str
+    ) -> asyncio.Future:
+        try:
+            return self._renders[path]
+        except KeyError:
+            pass
+
+        loop = asyncio.get_running_loop()
+        if self._pool is None:
+            # Spawn: don't fork server process state (event loop, db connections)
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        future = self._renders[path] = loop.run_in_executor(self._pool, func, *args)
+        future.add_done_callback(lambda future_: self._rendered_callback(path, future_))
+        return future
+
+    def _rendered_callback(self, path: pathlib.Path, future: asyncio.Future) -> None:
+        del self._renders[path]
+        if future.cancelled():
+            return
+        if exception := future.exception():
+            kernel_logger.error(f"Error when rendering {path}: {exception}")
+            return
+        self._rendered.add(path)
+
+    def _render_now(self, identifiers: typing.Optional[str]) -> None:
+        path = self.path(identifiers)
+        if not path.exists():
+            self._generator.build(
+                identifiers=identifiers or self._default_identifiers,
+                output=str(path),
+            )
+        self._rendered.add(path)
+
+    def stats(self) -> dict:
+        return {
+            "paths": len(self._paths),
+            "rendered": len(self._rendered),
+            "rendering": len(self._renders),
+        }
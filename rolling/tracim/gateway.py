@@ -0,0 +1,206 @@
+# coding: utf-8
+import asyncio
+import concurrent.futures
+import dataclasses
+import threading
+import time
+import typing
+
+import rrolling
+
+from rolling.log import server_logger
+
+
+@dataclasses.dataclass
+class TracimGatewayMetrics:
+    calls: int = 0
+    errors: int = 0
+    unread_hits: int = 0
+    unread_misses: int = 0
+    posted: int = 0
+    retries: int = 0
+    dropped: int = 0
+
+
+class TracimGateway:
+    """Tracim calls without blocking the event loop: (blocking) Dealer calls run
+    in a bounded thread pool where each thread reuses its own Dealer (and so its
+    HTTP connections). Unread messages counts are cached for unread_ttl seconds.
+    Fire and forget calls (see post) go through a queue consumed by worker_task
+    and are retried on error. Without running event loop (scripts, turn), calls
+    are made directly."""
+
+    def __init__(
+        self,
+        config: "rrolling.tracim.Config",
+        max_workers: int = 4,
+        unread_ttl: float = 30.0,
+        max_retries: int = 5,
+        retry_delay: float = 1.0,
+        queue_size: int = 1000,
+        dealer_factory: typing.Optional[typing.Callable[[], typing.Any]] = None,
+    ) -> None:
+        self._config = config
+        self._max_workers = max_workers
+        self._unread_ttl = unread_ttl
+        self._max_retries = max_retries
+        self._retry_delay = retry_delay
+        self._queue_size = queue_size
+        self._dealer_factory = dealer_factory or (
+            lambda: rrolling.tracim.Dealer(self._config)
+        )
+        self._local = threading.local()
+        self._executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._queue: typing.Optional[asyncio.Queue] = None
+        # account id: (expire_at, count)
+        self._unread_counts: typing.Dict[int, typing.Tuple[float, int]] = {}
+        self._unread_refreshes: typing.Dict[int, asyncio.Future] = {}
+        self.metrics = TracimGatewayMetrics()
+
+    def _dealer(self) -> typing.Any:
+        try:
+            return self._local.dealer
+        except AttributeError:
+            self._local.dealer = self._dealer_factory()
+            return self._local.dealer
+
+    def call_sync(self, method: str, *args: typing.Any) -> typing.Any:
+        """Blocking call, for code without event loop"""
+        self.metrics.calls += 1
+        try:
+            return getattr(self._dealer(), method)(*args)
+        except Exception:
+            self.metrics.errors += 1
+            raise
+
+    async def call(self, method: str, *args: typing.Any) -> typing.Any:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="tracim"
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.call_sync, method, *args
+        )
+
+    async def get_unread_messages_count(
+        self, account: "rrolling.tracim.Account", account_id: int
+    ) -> int:
+        cached = self._unread_counts.get(account_id)
+        if cached is not None and cached[0] > time.monotonic():
+            self.metrics.unread_hits += 1
+            return cached[1]
+
+        self.metrics.unread_misses += 1
+        refresh = self._unread_refreshes.get(account_id)
+        if refresh is None:
+            refresh = self._unread_refreshes[account_id] = asyncio.ensure_future(
+                self._refresh_unread_messages_count(account, account_id)
+            )
+        return await asyncio.shield(refresh)
+
+    def get_cached_unread_messages_count(
+        self, account: "rrolling.tracim.Account", account_id: int
+    ) -> int:
+        """Return last known count (0 if unknown) and refresh it in background
+        if expired. Without running event loop, count is read from Tracim."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self.call_sync(
+                "get_unread_messages_count",
+                account,
+                rrolling.tracim.AccountId(account_id),
+            )
+
+        cached = self._unread_counts.get(account_id)
+        if cached is not None and cached[0] > time.monotonic():
+            self.metrics.unread_hits += 1
+            return cached[1]
+
+        self.metrics.unread_misses += 1
+        if account_id not in self._unread_refreshes:
+            refresh = self._unread_refreshes[account_id] = asyncio.ensure_future(
+                self._refresh_unread_messages_count(account, account_id)
+            )
+            # Nobody awaits this refresh: its error must be reported here
+            refresh.add_done_callback(self._on_background_refresh_done)
+        return cached[1] if cached is not None else 0
+
+    def _on_background_refresh_done(self, refresh: asyncio.Future) -> None:
+        if refresh.cancelled() or refresh.exception() is None:
+            return
+
+        # Error is already counted by call_sync
+        server_logger.error(
+            "Error during background refresh of Tracim unread messages count",
+            exc_info=refresh.exception(),
+        )
+
+    async def _refresh_unread_messages_count(
+        self, account: "rrolling.tracim.Account", account_id: int
+    ) -> int:
+        try:
+            count = await self.call(
+                "get_unread_messages_count",
+                account,
+                rrolling.tracim.AccountId(account_id),
+            )
+            self._unread_counts[account_id] = (
+                time.monotonic() + self._unread_ttl,
+                count,
+            )
+            return count
+        finally:
+            del self._unread_refreshes[account_id]
+
+    def post(self, method: str, *args: typing.Any) -> None:
+        """Fire and forget call: errors are retried, then logged"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            try:
+                self.call_sync(method, *args)
+            except Exception:
+                server_logger.exception(f"Error during Tracim call {method}")
+            return
+
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+        try:
+            self._queue.put_nowait((method, args))
+            self.metrics.posted += 1
+        except asyncio.QueueFull:
+            self.metrics.dropped += 1
+            server_logger.error(f"Tracim queue is full, drop call {method}")
+
+    async def worker_task(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+
+        while True:
+            method, args = await self._queue.get()
+            # Calls are made one by one to keep their order (space membership)
+            for try_i in range(self._max_retries + 1):
+                try:
+                    await self.call(method, *args)
+                    break
+                except Exception as exc:
+                    if try_i == self._max_retries:
+                        self.metrics.dropped += 1
+                        server_logger.error(
+                            f"Tracim call {method} failed {try_i + 1} times, "
+                            f"abandon it ({exc})"
+                        )
+                        break
+                    self.metrics.retries += 1
+                    server_logger.warning(
+                        f"Tracim call {method} failed, retry it ({exc})"
+                    )
+                    await asyncio.sleep(self._retry_delay * 2**try_i)
+
+    def stats(self) -> dict:
+        return {
+            **dataclasses.asdict(self.metrics),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "cached_unread_counts": len(self._unread_counts),
+        }
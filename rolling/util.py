@@ -18,7 +18,6 @@ from guilang.description import Description
 from guilang.description import Part
 from rolling.exception import RollingError, WrongInputError
 from rolling.log import server_logger
-from rolling.map.type.zone import ZoneMapTileType
 from rolling.model.measure import Unit
 from rolling.server.link import CharacterActionLink
 
@@ -69,21 +68,9 @@ def get_on_and_around_coordinates(
 def is_there_resource_id_in_zone(
     kernel: "Kernel", resource_id: str, zone_source: "ZoneMapSource"
 ) -> bool:
-    for row in zone_source.geography.rows:
-        for zone_tile_type in row:
-            zone_tile_type = typing.cast(typing.Type[ZoneMapTileType], zone_tile_type)
-
-            try:
-                productions = kernel.game.world_manager.world.tiles_properties[
-                    zone_tile_type
-                ].produce
-            except KeyError:
-                productions = []
-
-            if resource_id in [production.resource.id for production in productions]:
-                return True
-
-    return False
+    return zone_source.geography.is_there_resource(
+        resource_id, kernel.game.world_manager.world.tiles_properties
+    )
 
 
 def get_stuffs_filled_with_resource_id(
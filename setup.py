@@ -18,6 +18,7 @@ setup(
             "rolling-server=rolling.server.run:main",
             "rolling-server-turn=rolling.server.turn:main",
             "rolling-server-manage=rolling.server.manage:main",
+            "rolling-server-worker=rolling.server.worker:main",
             "rolling-tracim-sync=rolling.tracim.sync:main",
         ]
     },
@@ -0,0 +1,17 @@
+# coding: utf-8
+from _pytest.terminal import TerminalReporter
+
+from tests.utils import BENCHMARK_PROPERTY_NAME
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter) -> None:
+    reports = [
+        value
+        for test_report in terminalreporter.getreports("passed")
+        for name, value in test_report.user_properties
+        if name == BENCHMARK_PROPERTY_NAME
+    ]
+    if reports:
+        terminalreporter.section("benchmarks")
+        for report in reports:
+            terminalreporter.write_line(report)
@@ -0,0 +1,65 @@
+# coding: utf-8
+from sqlalchemy import event
+
+from rolling.kernel import Kernel
+from rolling.server.document.character import CharacterDocument
+from tests.fixtures import _default_character_competences
+from tests.utils import BenchmarkRecorder
+from tests.utils import RecordProperty
+from tests.utils import benchmark
+
+
+def _create_characters(kernel: Kernel, from_: int, to: int) -> None:
+    for i in range(from_, to):
+        doc = CharacterDocument(
+            id=f"bench{i}",
+            name=f"bench{i}",
+            **_default_character_competences,
+        )
+        doc.world_row_i = 1
+        doc.world_col_i = 1
+        doc.zone_row_i = 10
+        doc.zone_col_i = 10
+        kernel.server_db_session.add(doc)
+    kernel.server_db_session.commit()
+
+    for i in range(from_, to):
+        kernel.character_lib.ensure_skills_for_character(f"bench{i}")
+
+
+@benchmark
+class TestCharacterBenchmark:
+    def test_get_zone_characters__queries_by_character_count(
+        self, worldmapc_kernel: Kernel, record_property: RecordProperty
+    ) -> None:
+        kernel = worldmapc_kernel
+        queries_recorder = BenchmarkRecorder("get_zone_characters (queries)")
+        time_recorder = BenchmarkRecorder("get_zone_characters (seconds)")
+        queries = []
+
+        def count_query(*args, **kwargs) -> None:
+            queries.append(None)
+
+        event.listen(kernel._server_db_engine, "before_cursor_execute", count_query)
+        try:
+            created = 0
+            query_counts = []
+            for character_count in (10, 100, 500):
+                _create_characters(kernel, created, character_count)
+                created = character_count
+                kernel.server_db_session.expunge_all()
+
+                queries.clear()
+                time_recorder.measure(
+                    f"{character_count} characters",
+                    lambda: kernel.character_lib.get_zone_characters(1, 1),
+                )
+                queries_recorder.record(f"{character_count} characters", len(queries))
+                query_counts.append(len(queries))
+        finally:
+            event.remove(kernel._server_db_engine, "before_cursor_execute", count_query)
+
+        queries_recorder.report(record_property)
+        time_recorder.report(record_property)
+        # Query count must not depend on characters count
+        assert len(set(query_counts)) == 1
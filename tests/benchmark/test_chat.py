@@ -0,0 +1,53 @@
+# coding: utf-8
+import gc
+import os
+import resource
+import tracemalloc
+
+from rolling.server.chat import State
+from rolling.types import WorldPoint
+from tests.utils import BenchmarkRecorder
+from tests.utils import RecordProperty
+from tests.utils import benchmark
+
+
+def _rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+@benchmark
+class TestChatBenchmark:
+    def test_chat_flood__memory_is_flat(self, record_property: RecordProperty) -> None:
+        state = State(max_age=3600, max_count=100)
+        zones = [
+            WorldPoint((row_i, col_i)) for row_i in range(20) for col_i in range(25)
+        ]
+        rss_recorder = BenchmarkRecorder("chat flood on 500 zones (RSS KiB)")
+        heap_recorder = BenchmarkRecorder("chat flood on 500 zones (traced KiB)")
+        heap_sizes = []
+
+        tracemalloc.start()
+        try:
+            for round_i in range(5):
+                for _ in range(200):
+                    for world_point in zones:
+                        state.add_message(world_point, "xena", "Hello world !")
+                        state.messages(world_point)
+                state.sweep()
+                gc.collect()
+
+                heap_sizes.append(tracemalloc.get_traced_memory()[0] // 1024)
+                label = f"after {(round_i + 1) * 200 * len(zones)} messages"
+                rss_recorder.record(label, _rss_kb())
+                heap_recorder.record(label, heap_sizes[-1])
+        finally:
+            tracemalloc.stop()
+
+        rss_recorder.report(record_property)
+        heap_recorder.report(record_property)
+        # Once ring buffers are full, memory must not grow anymore
+        assert heap_sizes[-1] <= heap_sizes[0] * 1.05
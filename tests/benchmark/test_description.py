@@ -0,0 +1,133 @@
+# coding: utf-8
+from aiohttp.web_exceptions import HTTPNotFound
+from aiohttp.web_middlewares import middleware
+from aiohttp.web_request import Request
+from aiohttp.web_response import Response
+from hapic.ext.aiohttp.context import AiohttpContext
+import json
+import pytest
+import serpyco
+import time
+import typing
+
+from guilang.description import Description
+from rolling.kernel import Kernel
+from rolling.server.application import get_application
+from rolling.server.document.character import CharacterDocument
+from rolling.server.extension import hapic
+from rolling.server.lib.character import CharacterLib
+from rolling.server.processor import RollingSerpycoProcessor
+from rolling.server.run import ErrorBuilder
+from tests.fixtures import create_stuff
+from tests.utils import BenchmarkRecorder
+from tests.utils import RecordProperty
+from tests.utils import benchmark
+
+REQUESTS = 30
+CARRIED_STUFFS = 50
+
+
+def _round_trip_character_infos(kernel: Kernel) -> typing.Callable:
+    """Previous character_infos middleware: parse, validate, reload character
+    then serialize again each json response"""
+    character_lib = CharacterLib(kernel)
+    description_serializer = serpyco.Serializer(Description)
+
+    @middleware
+    async def character_infos(request: Request, handler):
+        account_character_id = request.get("account_character_id")
+        response = await handler(request)
+        if not account_character_id:
+            return response
+
+        if "application/json" != response.headers.get("Content-Type"):
+            return response
+
+        body_as_json = json.loads(response.body._value)
+        try:
+            description = description_serializer.load(body_as_json)
+        except serpyco.ValidationError:
+            return response
+
+        if not description.title:
+            return response
+
+        character = character_lib.get(account_character_id)
+        description.character_ap = str(round(character.action_points, 1))
+        return Response(
+            body=description_serializer.dump_json(description),
+            status=response.status,
+            content_type="application/json",
+        )
+
+    return character_infos
+
+
+async def _measure_inventory_requests(
+    kernel: Kernel,
+    aiohttp_client: typing.Callable,
+    character_id: str,
+    token: str,
+    round_trip: bool,
+) -> float:
+    app = get_application(kernel)
+    if round_trip:
+        # Replace character_infos middleware (after auth)
+        app.middlewares[1] = _round_trip_character_infos(kernel)
+    context = AiohttpContext(app, debug=True, default_error_builder=ErrorBuilder())
+    context.handle_exception(HTTPNotFound, http_code=404)
+    context.handle_exception(Exception, http_code=500)
+    hapic.reset_context()
+    hapic.set_processor_class(RollingSerpycoProcessor)
+    hapic.set_context(context)
+    client = await aiohttp_client(app)
+
+    async def request() -> None:
+        response = await client.post(
+            f"/_describe/character/{character_id}/inventory",
+            headers={"Authorization": f"Token {token}"},
+        )
+        assert response.status == 200
+        assert (await response.json())["character_ap"]
+
+    # Warm up caches before measure
+    await request()
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        await request()
+    return time.perf_counter() - started
+
+
+@benchmark
+class TestDescriptionBenchmark:
+    @pytest.mark.asyncio
+    async def test_inventory__decoration_vs_round_trip(
+        self,
+        worldmapc_kernel: Kernel,
+        xena: CharacterDocument,
+        aiohttp_client: typing.Callable,
+        record_property: RecordProperty,
+    ) -> None:
+        kernel = worldmapc_kernel
+        account = kernel.account_lib.create("xena", "xena@local", "secret")
+        account.current_character_id = xena.id
+        kernel.server_db_session.commit()
+        token = kernel.account_lib.generate_new_auth_token(account.id)
+        for stuff_id in ("STONE_HAXE", "LEATHER_JACKET") * (CARRIED_STUFFS // 2):
+            stuff = create_stuff(kernel, stuff_id)
+            kernel.stuff_lib.set_carried_by(stuff.id, xena.id)
+        recorder = BenchmarkRecorder(
+            f"{REQUESTS} inventory requests, {CARRIED_STUFFS} stuffs (seconds)"
+        )
+
+        before = await _measure_inventory_requests(
+            kernel, aiohttp_client, xena.id, token, round_trip=True
+        )
+        recorder.record("json round trip", before)
+        after = await _measure_inventory_requests(
+            kernel, aiohttp_client, xena.id, token, round_trip=False
+        )
+        recorder.record("decoration", after)
+        recorder.report(record_property)
+
+        assert after < before
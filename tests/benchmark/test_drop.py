@@ -0,0 +1,107 @@
+# coding: utf-8
+from sqlalchemy import event
+
+from rolling.kernel import Kernel
+from rolling.server.document.stuff import StuffDocument
+from tests.utils import BenchmarkRecorder
+from tests.utils import RecordProperty
+from tests.utils import benchmark
+
+DROPS = 20
+
+
+def _crowd_zone(kernel: Kernel, distance: int, every: int) -> None:
+    """Put an apple or some soil on one of every tiles around (100, 100)"""
+    for i, zone_row_i in enumerate(range(100 - distance, 100 + distance + 1)):
+        for j, zone_col_i in enumerate(range(100 - distance, 100 + distance + 1)):
+            if (i * (distance * 2 + 1) + j) % every:
+                continue
+            if (i + j) % 2:
+                kernel.stuff_lib.add_stuff(
+                    StuffDocument(
+                        stuff_id="APPLE",
+                        world_row_i=1,
+                        world_col_i=1,
+                        zone_row_i=zone_row_i,
+                        zone_col_i=zone_col_i,
+                    ),
+                    commit=False,
+                )
+            else:
+                kernel.resource_lib.add_resource_to(
+                    resource_id="SOIL",
+                    quantity=150.0,
+                    ground=True,
+                    world_row_i=1,
+                    world_col_i=1,
+                    zone_row_i=zone_row_i,
+                    zone_col_i=zone_col_i,
+                    commit=False,
+                )
+    kernel.server_db_session.commit()
+
+
+@benchmark
+class TestDropBenchmark:
+    def test_find_available_place_where_drop__queries_by_crowd(
+        self, worldmapc_kernel: Kernel, record_property: RecordProperty
+    ) -> None:
+        kernel = worldmapc_kernel
+        world_manager = kernel.game.world_manager
+        queries_recorder = BenchmarkRecorder(
+            "find_available_place_where_drop (queries)"
+        )
+        time_recorder = BenchmarkRecorder(
+            f"{DROPS} find_available_place_where_drop (seconds)"
+        )
+        stuff = StuffDocument(stuff_id="STONE_HAXE", world_row_i=0, world_col_i=0)
+        kernel.stuff_lib.add_stuff(stuff)
+        stuff_id = stuff.id
+        # Build overlay is computed once per zone, not by drop
+        kernel.get_build_overlay(1, 1)
+        queries = []
+
+        def count_query(*args, **kwargs) -> None:
+            queries.append(None)
+
+        def drop() -> None:
+            for _ in range(DROPS):
+                for strict_place in (True, False):
+                    world_manager.find_available_place_where_drop(
+                        world_row_i=1,
+                        world_col_i=1,
+                        start_from_zone_row_i=100,
+                        start_from_zone_col_i=100,
+                        allow_fallback_on_start_coordinates=False,
+                        resource_id="WOOD",
+                        resource_quantity=50.0,
+                        strict_place=strict_place,
+                    )
+                    world_manager.find_available_place_where_drop(
+                        world_row_i=1,
+                        world_col_i=1,
+                        start_from_zone_row_i=100,
+                        start_from_zone_col_i=100,
+                        allow_fallback_on_start_coordinates=False,
+                        stuff_id=stuff_id,
+                        strict_place=strict_place,
+                    )
+
+        event.listen(kernel._server_db_engine, "before_cursor_execute", count_query)
+        try:
+            query_counts = []
+            for label, every in (("empty", 0), ("1/4 crowded", 4), ("crowded", 1)):
+                if every:
+                    _crowd_zone(kernel, distance=7, every=every)
+
+                queries.clear()
+                time_recorder.measure(label, drop)
+                queries_recorder.record(label, len(queries))
+                query_counts.append(len(queries))
+        finally:
+            event.remove(kernel._server_db_engine, "before_cursor_execute", count_query)
+
+        queries_recorder.report(record_property)
+        time_recorder.report(record_property)
+        # Query count must not depend on zone crowd
+        assert len(set(query_counts)) == 1
@@ -0,0 +1,96 @@
+# coding: utf-8
+from sqlalchemy import event
+
+from rolling.kernel import Kernel
+from rolling.server.document.affinity import AffinityDocument
+from rolling.server.document.affinity import AffinityRelationDocument
+from rolling.server.document.character import CharacterDocument
+from tests.fixtures import _default_character_competences
+from tests.utils import BenchmarkRecorder
+from tests.utils import RecordProperty
+from tests.utils import benchmark
+
+GUILD_MEMBERS = 10
+
+
+def _create_guilds(kernel: Kernel, from_: int, to: int) -> None:
+    """Create guilds of GUILD_MEMBERS fighters in zone. First member of each
+    guild is also fighter of next guild: all guilds are allied by a chain."""
+    for i in range(from_, to):
+        kernel.server_db_session.add(AffinityDocument(id=i + 1, name=f"guild{i}"))
+        for j in range(GUILD_MEMBERS):
+            doc = CharacterDocument(
+                id=f"guild{i}_{j}",
+                name=f"guild{i}_{j}",
+                **_default_character_competences,
+            )
+            doc.world_row_i = 1
+            doc.world_col_i = 1
+            doc.zone_row_i = 10
+            doc.zone_col_i = 10
+            kernel.server_db_session.add(doc)
+    kernel.server_db_session.flush()
+
+    for i in range(from_, to):
+        member_ids = [f"guild{i}_{j}" for j in range(GUILD_MEMBERS)]
+        if i:
+            member_ids.append(f"guild{i - 1}_0")
+        for member_id in member_ids:
+            kernel.server_db_session.add(
+                AffinityRelationDocument(
+                    affinity_id=i + 1,
+                    character_id=member_id,
+                    accepted=True,
+                    fighter=True,
+                )
+            )
+    kernel.server_db_session.commit()
+
+    for i in range(from_, to):
+        for j in range(GUILD_MEMBERS):
+            kernel.character_lib.ensure_skills_for_character(f"guild{i}_{j}")
+
+
+@benchmark
+class TestFightBenchmark:
+    def test_get_defense_description__queries_by_guild_count(
+        self, worldmapc_kernel: Kernel, record_property: RecordProperty
+    ) -> None:
+        kernel = worldmapc_kernel
+        queries_recorder = BenchmarkRecorder("get_defense_description (queries)")
+        time_recorder = BenchmarkRecorder("get_defense_description (seconds)")
+        queries = []
+        defenses = []
+
+        def count_query(*args, **kwargs) -> None:
+            queries.append(None)
+
+        event.listen(kernel._server_db_engine, "before_cursor_execute", count_query)
+        try:
+            created = 0
+            query_counts = []
+            for guild_count in (2, 10, 40):
+                _create_guilds(kernel, created, guild_count)
+                created = guild_count
+                origin_target = kernel.character_lib.get("guild0_1")
+                kernel.server_db_session.expunge_all()
+
+                queries.clear()
+                time_recorder.measure(
+                    f"{guild_count} guilds",
+                    lambda: defenses.append(
+                        kernel.fight_lib.get_defense_description(
+                            origin_target, world_row_i=1, world_col_i=1
+                        )
+                    ),
+                )
+                queries_recorder.record(f"{guild_count} guilds", len(queries))
+                query_counts.append(len(queries))
+                assert len(defenses[-1].affinities) == guild_count
+        finally:
+            event.remove(kernel._server_db_engine, "before_cursor_execute", count_query)
+
+        queries_recorder.report(record_property)
+        time_recorder.report(record_property)
+        # Query count must not depend on coalition size
+        assert len(set(query_counts)) == 1
@@ -0,0 +1,51 @@
+# coding: utf-8
+import glob
+import os
+import pathlib
+import shutil
+
+from rolling.kernel import Kernel
+from rolling.map.cache import ZoneMapCache
+from tests.utils import BenchmarkRecorder
+from tests.utils import RecordProperty
+from tests.utils import benchmark
+
+ZONES_COPIES = 10
+
+
+@benchmark
+class TestKernelStartupBenchmark:
+    def test_zones_loading__cold_and_warm_cache(
+        self,
+        worldmapc_kernel: Kernel,
+        tmp_path: pathlib.Path,
+        record_property: RecordProperty,
+    ) -> None:
+        kernel = worldmapc_kernel
+        zones_folder = tmp_path / "zones"
+        zones_folder.mkdir()
+        for copy_i in range(ZONES_COPIES):
+            for zone_file_path in glob.glob(
+                os.path.join(kernel.server_config.zones, "*.txt")
+            ):
+                row_i, col_i = map(
+                    int, os.path.basename(zone_file_path)[:-4].split("-")
+                )
+                shutil.copy(
+                    zone_file_path, zones_folder / f"{row_i + copy_i * 100}-{col_i}.txt"
+                )
+        zone_file_paths = sorted(glob.glob(str(zones_folder / "*.txt")))
+
+        def load_zones() -> None:
+            for zone_file_path in zone_file_paths:
+                kernel.load_zone_map(zone_file_path)
+
+        recorder = BenchmarkRecorder(f"load {len(zone_file_paths)} zones (seconds)")
+        kernel.zone_map_cache = ZoneMapCache(str(zones_folder / ".cache"))
+        cold = recorder.measure("cold (parse and write cache)", load_zones)
+        kernel.zone_map_cache = ZoneMapCache(str(zones_folder / ".cache"))
+        warm = recorder.measure("warm (memory mapped cache)", load_zones)
+        recorder.report(record_property)
+
+        assert kernel.zone_map_cache.metrics.hits == len(zone_file_paths)
+        assert warm < cold
@@ -0,0 +1,139 @@
+# coding: utf-8
+import pytest
+from sqlalchemy import event
+
+from rolling.kernel import Kernel
+from rolling.server.document.character import CharacterDocument
+from rolling.server.document.message import MessageDocument
+from tests.fixtures import _default_character_competences
+from tests.utils import BenchmarkRecorder
+from tests.utils import RecordProperty
+from tests.utils import benchmark
+
+MEMBERS = 100
+POSTS = 20
+
+
+def _create_members(kernel: Kernel) -> list:
+    member_ids = [f"member{i}" for i in range(MEMBERS)]
+    for member_id in member_ids:
+        doc = CharacterDocument(
+            id=member_id, name=member_id, **_default_character_competences
+        )
+        doc.world_row_i = 1
+        doc.world_col_i = 1
+        doc.zone_row_i = 10
+        doc.zone_col_i = 10
+        kernel.server_db_session.add(doc)
+    kernel.server_db_session.commit()
+    return member_ids
+
+
+@benchmark
+class TestMessageBenchmark:
+    @pytest.mark.asyncio
+    async def test_conversation__write_amplification_and_read_latency(
+        self, worldmapc_kernel: Kernel, record_property: RecordProperty
+    ) -> None:
+        kernel = worldmapc_kernel
+        message_lib = kernel.message_lib
+        member_ids = _create_members(kernel)
+        writes_recorder = BenchmarkRecorder(
+            f"{MEMBERS} members conversation (message rows by post)"
+        )
+        time_recorder = BenchmarkRecorder(f"{MEMBERS} members conversation (seconds)")
+        inserts = []
+
+        def count_insert(conn, cursor, statement, *args, **kwargs) -> None:
+            if statement.startswith("INSERT INTO message "):
+                inserts.append(None)
+
+        event.listen(kernel._server_db_engine, "before_cursor_execute", count_insert)
+        try:
+            conversation_id = await message_lib.add_conversation_message(
+                member_ids[0],
+                subject="Discussion",
+                message="",
+                concerned=member_ids,
+                is_first_message=True,
+            )
+            inserts.clear()
+            started_rows = kernel.server_db_session.query(MessageDocument).count()
+            for i in range(POSTS):
+                await message_lib.add_conversation_message(
+                    member_ids[i % MEMBERS],
+                    subject="Discussion",
+                    message=f"Message {i}",
+                    concerned=member_ids,
+                    conversation_id=conversation_id,
+                )
+            rows_by_post = (
+                kernel.server_db_session.query(MessageDocument).count() - started_rows
+            ) / POSTS
+            writes_recorder.record("message rows", rows_by_post)
+            writes_recorder.record("message inserts", len(inserts) / POSTS)
+
+            def read_all() -> None:
+                for member_id in member_ids:
+                    message_lib.get_unread_conversation_message_count(member_id)
+                    message_lib.get_conversation_messages(
+                        member_id, conversation_id, message_count=POSTS
+                    )
+                    message_lib.mark_character_conversation_messages_as_read(
+                        member_id, conversation_id
+                    )
+                kernel.server_db_session.commit()
+
+            time_recorder.measure(f"{MEMBERS} members read", read_all)
+        finally:
+            event.remove(
+                kernel._server_db_engine, "before_cursor_execute", count_insert
+            )
+
+        writes_recorder.report(record_property)
+        time_recorder.report(record_property)
+        # A message is stored once, whatever the conversation size
+        assert rows_by_post == 1
+        assert len(inserts) == POSTS
+        assert all(
+            message_lib.get_unread_conversation_message_count(member_id) == 0
+            for member_id in member_ids
+        )
+
+    @pytest.mark.asyncio
+    async def test_zone__write_amplification_and_read_latency(
+        self, worldmapc_kernel: Kernel, record_property: RecordProperty
+    ) -> None:
+        kernel = worldmapc_kernel
+        message_lib = kernel.message_lib
+        member_ids = _create_members(kernel)
+        writes_recorder = BenchmarkRecorder(
+            f"{MEMBERS} characters zone (message rows by post)"
+        )
+        time_recorder = BenchmarkRecorder(f"{MEMBERS} characters zone (seconds)")
+
+        for i in range(POSTS):
+            await message_lib.add_zone_message(
+                member_ids[i % MEMBERS], f"Message {i}", zone_row_i=1, zone_col_i=1
+            )
+        writes_recorder.record(
+            "message rows",
+            kernel.server_db_session.query(MessageDocument).count() / POSTS,
+        )
+
+        def read_all() -> None:
+            for member_id in member_ids:
+                message_lib.get_unread_zone_message_count(member_id)
+                message_lib.get_character_zone_messages(member_id, message_count=POSTS)
+                message_lib.mark_character_zone_messages_as_read(member_id)
+            kernel.server_db_session.commit()
+
+        time_recorder.measure(f"{MEMBERS} characters read", read_all)
+
+        writes_recorder.report(record_property)
+        time_recorder.report(record_property)
+        assert kernel.server_db_session.query(MessageDocument).count() == POSTS
+        assert all(
+            message_lib.get_unread_zone_message_count(member_id) == 0
+            for member_id in member_ids
+        )
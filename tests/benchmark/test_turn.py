@@ -0,0 +1,51 @@
+# coding: utf-8
+import logging
+import pytest
+
+from rolling.kernel import Kernel
+from rolling.server.document.character import CharacterDocument
+from rolling.server.lib.turn import TurnLib
+from tests.fixtures import _default_character_competences
+from tests.utils import BenchmarkRecorder
+from tests.utils import RecordProperty
+from tests.utils import benchmark
+
+
+def _create_characters(kernel: Kernel, from_: int, to: int) -> None:
+    for i in range(from_, to):
+        doc = CharacterDocument(
+            id=f"bench{i}",
+            name=f"bench{i}",
+            **_default_character_competences,
+        )
+        doc.world_row_i = 1
+        doc.world_col_i = 1
+        doc.zone_row_i = 10
+        doc.zone_col_i = 10
+        kernel.server_db_session.add(doc)
+    kernel.server_db_session.commit()
+
+
+@benchmark
+@pytest.mark.usefixtures("disable_tracim")
+@pytest.mark.usefixtures("initial_universe_state")
+class TestTurnBenchmark:
+    def test_execute_turn__by_character_count(
+        self, worldmapc_kernel: Kernel, record_property: RecordProperty
+    ) -> None:
+        kernel = worldmapc_kernel
+        turn_lib = TurnLib(
+            kernel,
+            character_lib=kernel.character_lib,
+            stuff_lib=kernel.stuff_lib,
+            logger=logging.getLogger("benchmark"),
+        )
+        recorder = BenchmarkRecorder("execute_turn (seconds)")
+
+        created = 0
+        for character_count in (10, 100, 500, 1000):
+            _create_characters(kernel, created, character_count)
+            created = character_count
+            recorder.measure(f"{character_count} characters", turn_lib.execute_turn)
+
+        recorder.report(record_property)
@@ -0,0 +1,51 @@
+# coding: utf-8
+import asyncio
+import time
+import unittest.mock
+
+from rolling.server.zone.websocket import ZoneEventsManager
+from tests.utils import BenchmarkRecorder
+from tests.utils import RecordProperty
+from tests.utils import benchmark
+
+MESSAGES_COUNT = 10000
+
+
+class FakeSocket:
+    close_code = None
+
+
+@benchmark
+class TestZoneWebsocketBenchmark:
+    def test_socket_lookups__by_connection_count(
+        self, record_property: RecordProperty
+    ) -> None:
+        recorder = BenchmarkRecorder("per message socket lookups (microseconds)")
+        per_message = []
+
+        for connection_count in (100, 1000, 10000):
+            manager = ZoneEventsManager(
+                unittest.mock.MagicMock(), loop=asyncio.new_event_loop()
+            )
+            sockets = []
+            for i in range(connection_count):
+                socket = FakeSocket()
+                manager._registry.add(socket, (i % 100, i // 100), f"character{i}")
+                sockets.append(socket)
+
+            started = time.perf_counter()
+            for i in range(MESSAGES_COUNT):
+                socket = sockets[(i * 7919) % connection_count]
+                row_i, col_i = manager.get_world_coordinates_for_socket(socket)
+                manager.get_character_socket(
+                    manager.get_character_id_for_socket(socket)
+                )
+                manager.change_socket_zone_to(socket, col_i, row_i)
+            elapsed = time.perf_counter() - started
+
+            per_message.append(elapsed / MESSAGES_COUNT * 1_000_000)
+            recorder.record(f"{connection_count} sockets", per_message[-1])
+
+        recorder.report(record_property)
+        # Overhead must not depend on connections count
+        assert per_message[-1] < per_message[0] * 3
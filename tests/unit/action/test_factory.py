@@ -0,0 +1,48 @@
+# coding: utf-8
+from rolling.action.knowledge import LearnKnowledgeAction
+from rolling.kernel import Kernel
+from rolling.rolling_types import ActionType
+
+
+class TestActionFactory:
+    def test_create_action__same_instance_by_description(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        factory = worldmapc_kernel.action_factory
+        action = factory.create_action(
+            ActionType.LEARN_KNOWLEDGE, ActionType.LEARN_KNOWLEDGE.name
+        )
+
+        assert isinstance(action, LearnKnowledgeAction)
+        assert action is factory.create_action(ActionType.LEARN_KNOWLEDGE)
+        assert action is factory.get_character_action(action.description)
+        assert action in factory.get_all_character_actions()
+        assert worldmapc_kernel.character_lib._action_factory is factory
+
+    def test_get_all_character_actions__filter_and_reload(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        factory = worldmapc_kernel.action_factory
+        actions = factory.get_all_character_actions(
+            filter_action_types=[ActionType.LEARN_KNOWLEDGE.value]
+        )
+
+        assert [action.description.action_type for action in actions] == [
+            ActionType.LEARN_KNOWLEDGE
+        ]
+        factory.reload()
+        assert (
+            factory.get_all_character_actions(
+                filter_action_types=[ActionType.LEARN_KNOWLEDGE.value]
+            )[0]
+            is not actions[0]
+        )
+
+    def test_set_game__actions_built_from_new_game(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        factory = worldmapc_kernel.action_factory
+        action = factory.create_action(ActionType.LEARN_KNOWLEDGE)
+
+        worldmapc_kernel.set_game(worldmapc_kernel.game)
+        assert factory.create_action(ActionType.LEARN_KNOWLEDGE) is not action
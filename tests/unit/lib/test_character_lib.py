@@ -6,6 +6,7 @@ from rolling.kernel import Kernel
 from rolling.model.ability import AbilityDescription
 from rolling.model.character import CharacterModel
 from rolling.model.measure import Unit
+from rolling.model.stuff import StuffModel
 from rolling.server.document.character import CharacterDocument
 from rolling.server.document.stuff import StuffDocument
 from rolling.server.lib.character import CharacterLib
@@ -177,3 +178,45 @@ class TestCharacterLib:
         assert "BLACKSMITH" in [a.id for a in abilities]
         assert "HUNT_SMALL_GAME" in [a.id for a in abilities]
         assert "FIGHT" in [a.id for a in abilities]
+
+    def test_documents_to_models__equipments_skills_and_knowledges(
+        self,
+        worldmapc_kernel: Kernel,
+        xena: CharacterDocument,
+        arthur: CharacterDocument,
+        worldmapc_xena_haxe: StuffModel,
+        worldmapc_arthur_leather_jacket: StuffModel,
+    ) -> None:
+        kernel = worldmapc_kernel
+        haxe_doc = kernel.stuff_lib.get_stuff_doc(worldmapc_xena_haxe.id)
+        haxe_doc.used_as_weapon_by_id = "xena"
+        jacket_doc = kernel.stuff_lib.get_stuff_doc(worldmapc_arthur_leather_jacket.id)
+        jacket_doc.used_as_armor_by_id = "arthur"
+        kernel.server_db_session.commit()
+        kernel.server_db_session.expunge_all()
+
+        # When
+        characters = {
+            character.id: character
+            for character in kernel.character_lib.get_zone_characters(1, 1)
+        }
+
+        # Then
+        assert characters["xena"].weapon.id == worldmapc_xena_haxe.id
+        assert characters["xena"].armor is None
+        assert list(characters["xena"].knowledges.keys()) == ["blacksmith"]
+        assert "BLACKSMITH" in characters["xena"].ability_ids
+        assert characters["arthur"].weapon is None
+        assert characters["arthur"].armor.id == worldmapc_arthur_leather_jacket.id
+        assert not characters["arthur"].knowledges
+        assert characters["xena"].skills.keys() == characters["arthur"].skills.keys()
+
+    def test_get_action_points__pending_changes(
+        self, worldmapc_kernel: Kernel, xena: CharacterDocument
+    ) -> None:
+        kernel = worldmapc_kernel
+        xena.action_points = 12.5
+
+        # When / Then
+        assert kernel.character_lib.get_action_points("xena") == 12.5
+        assert kernel.character_lib.get_action_points("unknown") is None
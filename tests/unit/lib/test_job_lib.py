@@ -0,0 +1,173 @@
+# coding: utf-8
+import datetime
+import pytest
+import typing
+import unittest.mock
+
+import requests
+
+from rolling.kernel import Kernel
+from rolling.server.document.corpse import AnimatedCorpseType
+from rolling.server.document.job import JobDocument
+from rolling.server.document.job import JobStatus
+from rolling.server.lib.job import JOB_HANDLERS
+from rolling.server.lib.job import JobContext
+from rolling.server.lib.job import POPULATE_AC_JOB
+from rolling.server.lib.job import SYNC_BUILD_HEALTH_JOB
+from rolling.server.lib.job import SYNC_ZONE_RESOURCES_JOB
+
+TEST_JOB = "test_job"
+
+
+@pytest.fixture
+def handled_calls(monkeypatch) -> list:
+    calls = []
+
+    def handler(kernel: Kernel, context: JobContext) -> None:
+        calls.append((dict(context.parameters), context.checkpoint))
+        if context.parameters.get("fail"):
+            context.progress(0.5, checkpoint="half")
+            raise RuntimeError("failed")
+        context.progress(1.0)
+
+    monkeypatch.setitem(JOB_HANDLERS, TEST_JOB, handler)
+    return calls
+
+
+class TestJobLib:
+    def test_unit__enqueue_by_zone__ok__group_processed(
+        self, worldmapc_kernel: Kernel, handled_calls: list
+    ) -> None:
+        job_lib = worldmapc_kernel.job_lib
+        group_id = job_lib.enqueue_by_zone(TEST_JOB, {"a": 1}, zones=[(0, 0), (0, 1)])
+
+        assert job_lib.get_group_progress(group_id).pending == 2
+        assert job_lib.process_next("worker")
+        group_progress = job_lib.get_group_progress(group_id)
+        assert (group_progress.done, group_progress.pending) == (1, 1)
+        assert group_progress.progress == 0.5
+        assert job_lib.process_next("worker")
+        assert not job_lib.process_next("worker")
+
+        group_progress = job_lib.get_group_progress(group_id)
+        assert group_progress.finished
+        assert group_progress.done == 2
+        assert [parameters for parameters, _ in handled_calls] == [
+            {"a": 1, "world_row_i": 0, "world_col_i": 0},
+            {"a": 1, "world_row_i": 0, "world_col_i": 1},
+        ]
+
+    def test_unit__run__ok__retried_with_checkpoint_then_failed(
+        self, worldmapc_kernel: Kernel, handled_calls: list
+    ) -> None:
+        job_lib = worldmapc_kernel.job_lib
+        job = job_lib.enqueue(TEST_JOB, {"fail": True}, max_attempts=2)
+
+        assert job_lib.process_next("worker")
+        assert job.status == JobStatus.PENDING.value
+        assert job.checkpoint == "half"
+        assert job_lib.process_next("worker")
+        assert job.status == JobStatus.FAILED.value
+        assert "RuntimeError" in job.error
+        assert not job_lib.process_next("worker")
+        assert [checkpoint for _, checkpoint in handled_calls] == [None, "half"]
+
+    def test_unit__claim__ok__expired_lease_reclaimed(
+        self, worldmapc_kernel: Kernel, handled_calls: list
+    ) -> None:
+        job_lib = worldmapc_kernel.job_lib
+        job = job_lib.enqueue(TEST_JOB)
+
+        assert job_lib.claim("crashed") is job
+        assert job_lib.claim("worker") is None
+
+        job.locked_until = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+        worldmapc_kernel.server_db_session.commit()
+        assert job_lib.claim("worker") is job
+        assert (job.locked_by, job.attempts) == ("worker", 2)
+        assert job_lib.run(job)
+        assert (
+            worldmapc_kernel.server_db_session.query(JobDocument)
+            .filter(JobDocument.status == JobStatus.DONE.value)
+            .count()
+            == 1
+        )
+
+    def test_unit__run__ok__zone_resources_progress_reported_per_zone_row(
+        self, worldmapc_kernel: Kernel, monkeypatch
+    ) -> None:
+        kernel = worldmapc_kernel
+        height = kernel.get_tile_map(0, 0).source.geography.height
+        reported = self._spy_progress(kernel, monkeypatch)
+        job = kernel.job_lib.enqueue(
+            SYNC_ZONE_RESOURCES_JOB, {"world_row_i": 0, "world_col_i": 0}
+        )
+
+        assert kernel.job_lib.run(job)
+        assert job.status == JobStatus.DONE.value
+        assert reported == [(row_i + 1) / height for row_i in range(height)] + [1.0]
+
+    def test_unit__run__ok__build_health_progress_reported_per_zone_row(
+        self, worldmapc_kernel: Kernel, monkeypatch
+    ) -> None:
+        kernel = worldmapc_kernel
+        height = kernel.get_tile_map(0, 0).source.geography.height
+        builds = [
+            kernel.build_lib.place_build(0, 0, 3, 1, "TEST_BUILD_1"),
+            kernel.build_lib.place_build(0, 0, 1, 1, "TEST_BUILD_1"),
+        ]
+        for build in builds:
+            build.health = None
+        kernel.server_db_session.commit()
+        reported = self._spy_progress(kernel, monkeypatch)
+        job = kernel.job_lib.enqueue(
+            SYNC_BUILD_HEALTH_JOB, {"world_row_i": 0, "world_col_i": 0}
+        )
+
+        assert kernel.job_lib.run(job)
+        assert job.status == JobStatus.DONE.value
+        assert job.progress_message == "2 fixed"
+        assert reported == [2 / height, 4 / height, 1.0]
+        assert [build.health for build in builds] == [1, 1]
+
+    def _spy_progress(self, kernel: Kernel, monkeypatch) -> typing.List[float]:
+        reported = []
+        report_progress = kernel.job_lib.report_progress
+
+        def spy(job: JobDocument, progress: float, *args, **kwargs) -> None:
+            reported.append(progress)
+            report_progress(job, progress, *args, **kwargs)
+
+        monkeypatch.setattr(kernel.job_lib, "report_progress", spy)
+        return reported
+
+    @pytest.mark.usefixtures("initial_universe_state")
+    def test_unit__populate_ac__ok__signal_error_raised_only_by_worker(
+        self, worldmapc_kernel: Kernel, monkeypatch
+    ) -> None:
+        kernel = worldmapc_kernel
+        signaled = []
+
+        def put(http, url: str, **kwargs) -> typing.Any:
+            signaled.append(url)
+            return unittest.mock.Mock(status_code=500)
+
+        monkeypatch.setattr(requests.Session, "put", put)
+        parameters = {
+            "world_row_i": 1,
+            "world_col_i": 1,
+            "type": AnimatedCorpseType.HARE.value,
+            "count": 2,
+            "signal_url": "http://signal",
+        }
+
+        # Inline: errors are logged and all animated corpses are processed
+        kernel.job_lib.run_now(POPULATE_AC_JOB, parameters)
+        assert len(signaled) == 2
+
+        # By worker: error fails the attempt, remaining ones are kept to retry
+        job = kernel.job_lib.enqueue(POPULATE_AC_JOB, {**parameters, "count": 3})
+        assert not kernel.job_lib.run(job)
+        assert job.status == JobStatus.PENDING.value
+        assert len(signaled) == 3
+        assert len(job.checkpoint) == 1
@@ -0,0 +1,189 @@
+# coding: utf-8
+import pytest
+import typing
+
+from rolling.kernel import Kernel
+from rolling.server.document.character import CharacterDocument
+from rolling.server.document.message import MessageDocument
+
+
+async def _create_conversation(
+    kernel: Kernel, author_id: str, concerned: typing.List[str]
+) -> int:
+    return await kernel.message_lib.add_conversation_message(
+        author_id,
+        subject="Discussion",
+        message="",
+        concerned=concerned,
+        is_first_message=True,
+    )
+
+
+class TestMessageLib:
+    @pytest.mark.asyncio
+    async def test_unit__conversations__ok__found_by_participants(
+        self,
+        worldmapc_kernel: Kernel,
+        xena: CharacterDocument,
+        arthur: CharacterDocument,
+        franck: CharacterDocument,
+    ) -> None:
+        kernel = worldmapc_kernel
+        duo_id = await _create_conversation(kernel, xena.id, [xena.id, arthur.id])
+        trio_id = await _create_conversation(
+            kernel, xena.id, [xena.id, arthur.id, franck.id]
+        )
+
+        assert [
+            message.first_message
+            for message in kernel.message_lib.get_conversation_first_messages(
+                xena.id, with_character_id=franck.id
+            )
+        ] == [trio_id]
+        assert (
+            kernel.message_lib.search_conversation_first_message_for_concerned(
+                xena.id, [xena.id, arthur.id]
+            )
+            == duo_id
+        )
+        assert (
+            kernel.message_lib.search_conversation_first_message_for_concerned(
+                arthur.id, [franck.id, arthur.id]
+            )
+            == trio_id
+        )
+        assert (
+            kernel.message_lib.search_conversation_first_message_for_concerned(
+                franck.id, [xena.id, arthur.id]
+            )
+            == trio_id
+        )
+        assert (
+            kernel.message_lib.search_conversation_first_message_for_concerned(
+                xena.id, ["unknown"]
+            )
+            is None
+        )
+
+    @pytest.mark.asyncio
+    async def test_unit__conversation_messages__ok__stored_once_read_by_cursor(
+        self,
+        worldmapc_kernel: Kernel,
+        xena: CharacterDocument,
+        arthur: CharacterDocument,
+        franck: CharacterDocument,
+    ) -> None:
+        kernel = worldmapc_kernel
+        message_lib = kernel.message_lib
+        conversation_id = await _create_conversation(
+            kernel, xena.id, [xena.id, arthur.id]
+        )
+        await message_lib.add_conversation_message(
+            arthur.id,
+            subject="Discussion",
+            message="Salut",
+            concerned=[xena.id, arthur.id],
+            conversation_id=conversation_id,
+        )
+
+        assert kernel.server_db_session.query(MessageDocument).count() == 2
+        assert message_lib.get_unread_conversation_message_count(xena.id) == 1
+        assert message_lib.get_unread_conversation_message_count(arthur.id) == 1
+        assert message_lib.get_unread_conversation_message_count(franck.id) == 0
+        messages = message_lib.get_conversation_messages(xena.id, conversation_id)
+        assert [message.text for message in messages] == ["Salut", ""]
+        assert not message_lib.get_conversation_messages(franck.id, conversation_id)
+
+        message_lib.mark_character_conversation_messages_as_read(
+            xena.id, conversation_id
+        )
+        kernel.server_db_session.commit()
+        assert message_lib.get_unread_conversation_message_count(xena.id) == 0
+        assert message_lib.get_unread_conversation_message_count(arthur.id) == 1
+
+    @pytest.mark.asyncio
+    async def test_unit__zone_messages__ok__stored_once_read_by_cursor(
+        self,
+        worldmapc_kernel: Kernel,
+        xena: CharacterDocument,
+        arthur: CharacterDocument,
+    ) -> None:
+        kernel = worldmapc_kernel
+        message_lib = kernel.message_lib
+        for text in ("Bonjour", "Ça va ?"):
+            await message_lib.add_zone_message(
+                xena.id, text, zone_row_i=xena.world_row_i, zone_col_i=xena.world_col_i
+            )
+
+        assert kernel.server_db_session.query(MessageDocument).count() == 2
+        assert message_lib.get_unread_zone_message_count(xena.id) == 0
+        assert message_lib.get_unread_zone_message_count(arthur.id) == 2
+        messages = message_lib.get_character_zone_messages(arthur.id)
+        assert [message.text for message in messages] == ["Ça va ?", "Bonjour"]
+
+        message_lib.mark_character_zone_messages_as_read(arthur.id)
+        kernel.server_db_session.commit()
+        assert message_lib.get_unread_zone_message_count(arthur.id) == 0
+
+    @pytest.mark.asyncio
+    async def test_unit__zone_messages__ok__only_received_in_zone(
+        self,
+        worldmapc_kernel: Kernel,
+        xena: CharacterDocument,
+        arthur: CharacterDocument,
+        franck: CharacterDocument,
+    ) -> None:
+        kernel = worldmapc_kernel
+        message_lib = kernel.message_lib
+        franck.world_col_i = 2
+        kernel.server_db_session.commit()
+        await message_lib.add_zone_message(
+            xena.id, "Bonjour", zone_row_i=1, zone_col_i=1
+        )
+
+        # Characters arriving later don't receive previous zone messages
+        franck.world_col_i = 1
+        kernel.server_db_session.commit()
+        assert not message_lib.get_character_zone_messages(franck.id)
+        assert message_lib.get_unread_zone_message_count(franck.id) == 0
+
+        # Characters leaving the zone keep received zone messages
+        arthur.world_col_i = 2
+        kernel.server_db_session.commit()
+        messages = message_lib.get_character_zone_messages(arthur.id)
+        assert [message.text for message in messages] == ["Bonjour"]
+        assert message_lib.get_unread_zone_message_count(arthur.id) == 1
+        message_lib.mark_character_zone_messages_as_read(arthur.id)
+        kernel.server_db_session.commit()
+        assert message_lib.get_unread_zone_message_count(arthur.id) == 0
+
+    @pytest.mark.asyncio
+    async def test_unit__conversation_messages__ok__filtered_by_author_zone(
+        self,
+        worldmapc_kernel: Kernel,
+        xena: CharacterDocument,
+        arthur: CharacterDocument,
+        franck: CharacterDocument,
+    ) -> None:
+        kernel = worldmapc_kernel
+        message_lib = kernel.message_lib
+        concerned = [xena.id, arthur.id, franck.id]
+        conversation_id = await _create_conversation(kernel, xena.id, concerned)
+        franck.world_col_i = 2
+        kernel.server_db_session.commit()
+
+        await message_lib.add_conversation_message(
+            xena.id,
+            subject="Discussion",
+            message="Salut",
+            concerned=concerned,
+            conversation_id=conversation_id,
+            filter_by_same_zone_than_author=True,
+        )
+
+        messages = message_lib.get_conversation_messages(arthur.id, conversation_id)
+        assert [message.text for message in messages] == ["Salut", ""]
+        assert sorted(messages[0].concerned) == sorted(concerned)
+        messages = message_lib.get_conversation_messages(franck.id, conversation_id)
+        assert [message.text for message in messages] == [""]
+        assert message_lib.get_unread_conversation_message_count(franck.id) == 1
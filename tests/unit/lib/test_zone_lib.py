@@ -0,0 +1,44 @@
+# coding: utf-8
+from rolling.kernel import Kernel
+from rolling.server.document.character import CharacterDocument
+from tests.fixtures import create_stuff
+
+
+class TestZoneLib:
+    def test_unit__get_neighbourhood_counts__ok__on_and_around_only(
+        self,
+        worldmapc_kernel: Kernel,
+        xena: CharacterDocument,
+        arthur: CharacterDocument,
+        franck: CharacterDocument,
+    ) -> None:
+        kernel = worldmapc_kernel
+        # xena is at 10,10 ; arthur on same tile ; franck at 11,11
+        create_stuff(kernel, "STONE_HAXE", 1, 1, 10, 10)
+        create_stuff(kernel, "STONE_HAXE", 1, 1, 9, 11)
+        create_stuff(kernel, "STONE_HAXE", 1, 1, 12, 10)  # too far
+        create_stuff(kernel, "STONE_HAXE", 1, 2, 10, 10)  # other zone
+        kernel.resource_lib.add_resource_to(
+            resource_id="WOOD",
+            quantity=1.0,
+            ground=True,
+            world_row_i=1,
+            world_col_i=1,
+            zone_row_i=11,
+            zone_col_i=9,
+        )
+        kernel.build_lib.place_build(1, 1, 9, 9, "TEST_BUILD_1")
+        kernel.build_lib.place_build(1, 1, 10, 13, "TEST_BUILD_1")  # too far
+
+        counts = kernel.zone_lib.get_neighbourhood_counts(
+            world_row_i=1,
+            world_col_i=1,
+            zone_row_i=10,
+            zone_col_i=10,
+            exclude_character_ids=[xena.id],
+        )
+
+        assert counts.stuff_count == 2
+        assert counts.resource_count == 1
+        assert counts.build_count == 1
+        assert counts.character_count == 2
@@ -0,0 +1,111 @@
+# coding: utf-8
+import numpy
+import os
+import pathlib
+import shutil
+
+from rolling.kernel import Kernel
+from rolling.map.cache import ResidentZoneMaps
+from rolling.map.cache import ZoneMapCache
+from rolling.map.source import ZoneMapSource
+from rolling.map.type.zone import Nothing
+from rolling.map.type.zone import Rock
+
+ZONE_FILE_PATH = os.path.join("tests", "src", "worldmapc_zones", "1-1.txt")
+
+
+class TestZoneMapCache:
+    def _load(self, kernel: Kernel, cache: ZoneMapCache, file_path: pathlib.Path):
+        return cache.load(
+            str(file_path),
+            kernel.tile_map_legend,
+            lambda raw_source: ZoneMapSource(kernel, raw_source).geography,
+        )
+
+    def test_unit__load__ok__parse_once_then_map_cache_file(
+        self, worldmapc_kernel: Kernel, tmp_path: pathlib.Path
+    ) -> None:
+        kernel = worldmapc_kernel
+        file_path = tmp_path / "1-1.txt"
+        shutil.copy(ZONE_FILE_PATH, file_path)
+        cache = ZoneMapCache(str(tmp_path / "cache"))
+
+        parsed = self._load(kernel, cache, file_path)
+        cached = self._load(kernel, ZoneMapCache(str(tmp_path / "cache")), file_path)
+
+        assert cache.metrics.misses == 1
+        assert cache.metrics.writes == 1
+        assert isinstance(cached.tile_ids, numpy.memmap)
+        assert numpy.array_equal(parsed.tile_ids, cached.tile_ids)
+        assert parsed.rows == cached.rows
+        assert numpy.array_equal(parsed.traversable_mask(), cached.traversable_mask())
+
+    def test_unit__load__ok__stale_when_source_changed(
+        self, worldmapc_kernel: Kernel, tmp_path: pathlib.Path
+    ) -> None:
+        kernel = worldmapc_kernel
+        file_path = tmp_path / "1-1.txt"
+        shutil.copy(ZONE_FILE_PATH, file_path)
+        cache = ZoneMapCache(str(tmp_path / "cache"))
+        geography = self._load(kernel, cache, file_path)
+
+        # Only touched: content hash still match
+        os.utime(file_path, ns=(0, 0))
+        self._load(kernel, cache, file_path)
+        assert cache.metrics.hits == 1
+
+        raw_source = file_path.read_text()
+        geo_start = raw_source.index("::GEO\n") + len("::GEO\n")
+        file_path.write_text(raw_source[:geo_start] + "#" + raw_source[geo_start + 1 :])
+        reloaded = self._load(kernel, cache, file_path)
+
+        assert geography.get_tile_type(0, 0) == Nothing
+        assert reloaded.get_tile_type(0, 0) == Rock
+        assert cache.metrics.misses == 2
+
+
+class TestResidentZoneMaps:
+    def test_unit__getitem__ok__load_at_first_access_and_evict_lru(self) -> None:
+        loaded = []
+
+        def load(file_path: str) -> str:
+            loaded.append(file_path)
+            return f"zone {file_path}"
+
+        pinned = {(0, 0)}
+        zones = ResidentZoneMaps(
+            load, max_resident=2, is_pinned=lambda position: position in pinned
+        )
+        for position in [(0, 0), (0, 1), (0, 2)]:
+            zones.register(position, f"{position[0]}-{position[1]}.txt")
+
+        assert len(zones) == 3
+        assert (0, 2) in zones
+        assert not loaded
+
+        assert zones[(0, 0)] == "zone 0-0.txt"
+        assert zones[(0, 1)] == "zone 0-1.txt"
+        assert zones[(0, 0)] == "zone 0-0.txt"
+        assert loaded == ["0-0.txt", "0-1.txt"]
+
+        zones[(0, 2)]
+        assert zones.is_resident((0, 0))
+        assert not zones.is_resident((0, 1))
+        # (0, 0) is pinned: it stays resident even if least recently used
+        zones[(0, 1)]
+        assert zones.is_resident((0, 0))
+        assert not zones.is_resident((0, 2))
+
+        stats = zones.stats()
+        assert stats["resident"] == 2
+        assert stats["loads"] == 4
+        assert stats["evictions"] == 2
+
+    def test_unit__register__ok__reload_at_next_access(self) -> None:
+        zones = ResidentZoneMaps(lambda file_path: object())
+        zones.register((0, 0), "0-0.txt")
+        zone_map = zones[(0, 0)]
+        assert zones[(0, 0)] is zone_map
+
+        zones.register((0, 0), "0-0.txt")
+        assert zones[(0, 0)] is not zone_map
@@ -0,0 +1,119 @@
+# coding: utf-8
+import pytest
+
+from rolling.exception import TileTypeNotFound
+from rolling.kernel import Kernel
+from rolling.map.geography import ZoneMapGeography
+from rolling.map.type import zone
+from rolling.model.character import CharacterModel
+from rolling.model.meta import TransportType
+from rolling.server.document.build import DOOR_MODE__CLOSED
+
+
+class TestZoneMapGeography:
+    def test_unit__masks__ok__computed_from_tile_types(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        legend = worldmapc_kernel.tile_map_legend
+        sand = legend.get_str_with_type(zone.Sand)
+        rock = legend.get_str_with_type(zone.Rock)
+        geography = ZoneMapGeography(legend, [sand + rock, rock + sand])
+
+        assert geography.get_tile_type(0, 1) == zone.Rock
+        assert geography.get_tile_type(2, 0) == zone.Nothing
+        assert geography.rows == [[zone.Sand, zone.Rock], [zone.Rock, zone.Sand]]
+        assert geography.tile_type_positions[zone.Sand] == [(0, 0), (1, 1)]
+        assert geography.traversable_mask(TransportType.WALKING).tolist() == [
+            [True, False],
+            [False, True],
+        ]
+        assert geography.is_traversable(1, 1)
+        assert not geography.is_traversable(1, 2)
+
+    def test_unit__set_tile_type__ok__update_resource_positions(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        legend = worldmapc_kernel.tile_map_legend
+        tiles_properties = worldmapc_kernel.game.world_manager.world.tiles_properties
+        sand = legend.get_str_with_type(zone.Sand)
+        tree = legend.get_str_with_type(zone.DeadTree)
+        parsed = ZoneMapGeography(legend, [sand + tree, tree + sand])
+        tile_ids = parsed.tile_ids.copy()
+        tile_ids.flags.writeable = False
+        # Like a memory mapped cache file
+        geography = ZoneMapGeography.from_tile_ids(legend, parsed.tile_types, tile_ids)
+
+        assert geography.get_resource_positions(tiles_properties) == {
+            "WOOD": [(0, 1), (1, 0)]
+        }
+        assert geography.is_there_resource("WOOD", tiles_properties)
+
+        geography.set_tile_type(0, 1, zone.Sand)
+        geography.set_tile_type(1, 0, zone.Sand)
+
+        assert not geography.is_there_resource("WOOD", tiles_properties)
+        assert geography.get_tile_type(0, 1) == zone.Sand
+        assert geography.tile_type_positions == {
+            zone.Sand: [(0, 0), (1, 1), (0, 1), (1, 0)]
+        }
+        assert geography.is_buildable(0, 1)
+        assert not tile_ids[0, 1] == geography.tile_ids[0, 1]
+
+    def test_unit__set_tile_type__ok__before_positions_computed(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        legend = worldmapc_kernel.tile_map_legend
+        tiles_properties = worldmapc_kernel.game.world_manager.world.tiles_properties
+        sand = legend.get_str_with_type(zone.Sand)
+        tree = legend.get_str_with_type(zone.DeadTree)
+        geography = ZoneMapGeography(legend, [sand + tree])
+
+        geography.set_tile_type(0, 1, zone.Sand)
+
+        assert geography.tile_type_positions == {zone.Sand: [(0, 0), (0, 1)]}
+        assert geography.get_resource_positions(tiles_properties) == {}
+        assert not geography.is_there_resource("WOOD", tiles_properties)
+        with pytest.raises(TileTypeNotFound):
+            geography.get_random_tile_position_containing_resource(
+                "WOOD", worldmapc_kernel
+            )
+
+
+class TestKernelTraversability:
+    def test_unit__is_traversable_coordinate__ok__follow_placed_builds(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        kernel = worldmapc_kernel
+        assert kernel.is_traversable_coordinate(1, 1, 100, 100)
+        assert kernel.is_buildable_coordinate(1, 1, 100, 100, "STONE_WALL")
+
+        wall = kernel.build_lib.place_build(1, 1, 100, 100, "STONE_WALL")
+        assert not kernel.is_traversable_coordinate(1, 1, 100, 100)
+        assert not kernel.get_walkable_mask(1, 1)[100, 100]
+        assert not kernel.is_buildable_coordinate(1, 1, 100, 100, "STONE_WALL")
+
+        kernel.build_lib.delete(wall.id)
+        assert kernel.is_traversable_coordinate(1, 1, 100, 100)
+        assert kernel.get_walkable_mask(1, 1)[100, 100]
+
+    def test_unit__is_walkable__ok__follow_door_rules(
+        self, worldmapc_kernel: Kernel, xena: CharacterModel
+    ) -> None:
+        kernel = worldmapc_kernel
+        door = kernel.build_lib.place_build(1, 1, 100, 101, "DOOR")
+        assert kernel.is_walkable(1, 1, 100, 101)
+
+        kernel.door_lib.update(xena.id, door.id, new_mode=DOOR_MODE__CLOSED)
+        assert not kernel.is_walkable(1, 1, 100, 101)
+        assert not kernel.get_walkable_mask(1, 1)[100, 101]
+
+        kernel.door_lib.delete(xena.id, door.id)
+        assert kernel.is_walkable(1, 1, 100, 101)
+
+    def test_unit__get_random_walkable_coordinate__ok(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        kernel = worldmapc_kernel
+        for _ in range(10):
+            zone_row_i, zone_col_i = kernel.get_random_walkable_coordinate(1, 1)
+            assert kernel.is_walkable(1, 1, zone_row_i, zone_col_i)
@@ -0,0 +1,264 @@
+# coding: utf-8
+import pytest
+
+from rolling.cache import RequestCache
+from rolling.exception import AccountNotFound
+from rolling.kernel import Kernel
+from rolling.server.cache.action_links import ActionLinksCache
+from rolling.server.cache.auth import AuthCache
+from rolling.server.cache.auth import AuthPrincipal
+from rolling.server.cache.zone import BUILDS
+from rolling.server.cache.zone import GROUND_RESOURCES
+from rolling.server.cache.zone import ZoneStateCache
+from rolling.server.document.character import CharacterDocument
+from rolling.server.document.event import EventDocument
+from rolling.types import WorldPoint
+
+
+class TestZoneStateCache:
+    def test_unit__lru__ok__evict_least_recently_used_zone(self) -> None:
+        cache = ZoneStateCache(max_zones=2)
+        cache.set(WorldPoint((1, 1)), BUILDS, ["a"])
+        cache.set(WorldPoint((1, 2)), BUILDS, ["b"])
+        assert cache.get(WorldPoint((1, 1)), BUILDS) == ["a"]
+
+        cache.set(WorldPoint((1, 3)), BUILDS, ["c"])
+
+        assert cache.get(WorldPoint((1, 2)), BUILDS) is None
+        assert cache.get(WorldPoint((1, 1)), BUILDS) == ["a"]
+        stats = cache.stats()
+        assert stats["zones"] == 2
+        assert stats["evictions"] == 1
+        assert stats["kinds"][BUILDS] == {"hits": 2, "misses": 1}
+
+    def test_unit__ttl__ok__expired_entry_is_a_miss(self) -> None:
+        cache = ZoneStateCache(ttl=-1.0)
+        cache.set(WorldPoint((1, 1)), BUILDS, ["a"])
+        assert cache.get(WorldPoint((1, 1)), BUILDS) is None
+
+    def test_unit__ground_resources__ok__invalidated_by_commit(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        kernel = worldmapc_kernel
+        world_point = WorldPoint((1, 1))
+        shared = kernel.zone_state_cache
+
+        assert not RequestCache(kernel, world_point, shared).get_ground_resources()
+        assert not RequestCache(kernel, world_point, shared).get_ground_resources()
+        assert shared.stats()["kinds"][GROUND_RESOURCES] == {"hits": 1, "misses": 1}
+
+        kernel.resource_lib.add_resource_to(
+            resource_id="WOOD",
+            quantity=1.0,
+            ground=True,
+            world_row_i=1,
+            world_col_i=1,
+            zone_row_i=10,
+            zone_col_i=10,
+        )
+
+        resources = RequestCache(kernel, world_point, shared).get_ground_resources()
+        assert [r.resource_id for r in resources] == ["WOOD"]
+        resources = RequestCache(kernel, world_point, shared).get_ground_resources()
+        assert [r.resource_id for r in resources] == ["WOOD"]
+        assert resources[0] in kernel.server_db_session
+        assert shared.stats()["kinds"][GROUND_RESOURCES] == {"hits": 2, "misses": 2}
+
+
+class TestAuthCache:
+    def test_unit__credentials_key__ok__credentials_not_in_key(self) -> None:
+        cache = AuthCache()
+        key = cache.credentials_key("xena", "secret")
+
+        assert b"secret" not in key
+        assert key == cache.credentials_key("xena", "secret")
+        assert key != cache.credentials_key("xena", "secret2")
+
+    def test_unit__expire__ok__never_after_token_expiration(self) -> None:
+        cache = AuthCache(ttl=60.0)
+        principal = AuthPrincipal(account_id="a1", current_character_id=None)
+        cache.set(b"token:expired", principal, expire_timestamp=0.0)
+        cache.set(b"token:valid", principal)
+
+        assert cache.get(b"token:expired") is None
+        assert cache.get(b"token:valid") == principal
+        cache.invalidate_account("a1")
+        assert cache.get(b"token:valid") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+        assert cache.stats()["invalidations"] == 1
+
+    def test_unit__authenticate__ok__invalidated_by_account_commits(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        kernel = worldmapc_kernel
+        account = kernel.account_lib.create("xena", "xena@local", "secret")
+        token = kernel.account_lib.generate_new_auth_token(account.id)
+
+        for _ in range(2):
+            assert kernel.account_lib.authenticate_token(token).account_id == account.id
+            assert (
+                kernel.account_lib.authenticate_credentials("xena", "secret").account_id
+                == account.id
+            )
+        assert kernel.auth_cache.stats()["hits"] == 2
+
+        account.current_character_id = "xena"
+        kernel.server_db_session.commit()
+        principal = kernel.account_lib.authenticate_token(token)
+        assert principal.current_character_id == "xena"
+
+        account.password_hash = "changed"
+        kernel.server_db_session.commit()
+        with pytest.raises(AccountNotFound):
+            kernel.account_lib.authenticate_credentials("xena", "secret")
+
+
+class TestActionLinksCache:
+    def test_unit__versions__ok__zone_and_global_bumps(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        cache = ActionLinksCache()
+        session = worldmapc_kernel.server_db_session
+        computes = []
+
+        def compute() -> list:
+            computes.append(None)
+            return ["link"]
+
+        def get() -> list:
+            return cache.get_or_compute(session, "xena", (1, 1), "key", compute)
+
+        assert get() == ["link"]
+        assert get() == ["link"]
+        assert len(computes) == 1
+
+        cache.bump((1, 2))
+        get()
+        assert len(computes) == 1
+        cache.bump((1, 1))
+        get()
+        assert len(computes) == 2
+        cache.bump()
+        get()
+        assert len(computes) == 3
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["outdated"] == 2
+
+    def test_unit__on_place_actions__ok__outdated_by_zone_commit(
+        self, worldmapc_kernel: Kernel, xena: CharacterDocument
+    ) -> None:
+        kernel = worldmapc_kernel
+        cache = kernel.action_links_cache
+        kernel.server_db_session.commit()
+
+        links = kernel.character_lib.get_on_place_actions(xena.id)
+        assert kernel.character_lib.get_on_place_actions(xena.id) == links
+        assert cache.stats()["hits"] == 1
+
+        kernel.resource_lib.add_resource_to(
+            resource_id="WOOD",
+            quantity=1.0,
+            ground=True,
+            world_row_i=xena.world_row_i,
+            world_col_i=xena.world_col_i,
+            zone_row_i=xena.zone_row_i,
+            zone_col_i=xena.zone_col_i,
+        )
+        kernel.server_db_session.commit()
+
+        kernel.character_lib.get_on_place_actions(xena.id)
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["outdated"] == 1
+
+    def test_unit__on_place_actions__ok__outdated_by_game_config_reload(
+        self, worldmapc_kernel: Kernel, xena: CharacterDocument
+    ) -> None:
+        kernel = worldmapc_kernel
+        cache = kernel.action_links_cache
+        kernel.server_db_session.commit()
+
+        kernel.character_lib.get_on_place_actions(xena.id)
+        kernel.set_game(kernel.game)
+        kernel.character_lib.get_on_place_actions(xena.id)
+        assert cache.stats()["hits"] == 0
+        assert cache.stats()["misses"] == 2
+
+
+class TestUnreadCountersCache:
+    def test_unit__unread_event__ok__kept_up_to_date(
+        self,
+        worldmapc_kernel: Kernel,
+        xena: CharacterDocument,
+        arthur: CharacterDocument,
+    ) -> None:
+        kernel = worldmapc_kernel
+        cache = kernel.unread_counters_cache
+        kernel.server_db_session.commit()
+
+        def unread_event(character_id: str) -> bool:
+            return kernel.character_lib.get(
+                character_id, compute_unread_event=True
+            ).unread_event
+
+        assert not unread_event(xena.id)
+        assert not unread_event(xena.id)
+        assert cache.stats()["hits"] == 1
+
+        kernel.server_db_session.add(
+            EventDocument(text="Hello", character_id=xena.id, turn=0)
+        )
+        kernel.server_db_session.commit()
+        # Other characters counters are still valid
+        assert not unread_event(arthur.id)
+        assert not unread_event(arthur.id)
+        assert cache.stats()["hits"] == 2
+
+        event_ids = [
+            e.id for e in kernel.server_db_session.query(EventDocument.id).all()
+        ]
+        assert unread_event(xena.id)
+        kernel.character_lib.mark_event_as_read(event_ids)
+        assert not unread_event(xena.id)
+        assert cache.stats()["outdated"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unit__unread_conversation__ok__read_cursor_outdates_reader_only(
+        self,
+        worldmapc_kernel: Kernel,
+        xena: CharacterDocument,
+        arthur: CharacterDocument,
+    ) -> None:
+        kernel = worldmapc_kernel
+        cache = kernel.unread_counters_cache
+        conversation_id = await kernel.message_lib.add_conversation_message(
+            xena.id,
+            subject="Discussion",
+            message="",
+            concerned=[arthur.id],
+            is_first_message=True,
+        )
+
+        def unread_conversation(character_id: str) -> bool:
+            return kernel.character_lib.get(
+                character_id, compute_unread_conversation=True
+            ).unread_conversation
+
+        assert unread_conversation(arthur.id)
+        assert not unread_conversation(xena.id)
+        stats = cache.stats()
+        action_links_stats = kernel.action_links_cache.stats()
+
+        kernel.message_lib.mark_character_conversation_messages_as_read(
+            arthur.id, conversation_id
+        )
+        kernel.server_db_session.commit()
+        assert not unread_conversation(arthur.id)
+        assert not unread_conversation(xena.id)
+        assert cache.stats()["hits"] == stats["hits"] + 1
+        assert cache.stats()["global_bumps"] == stats["global_bumps"]
+        for counter in ("zone_bumps", "global_bumps"):
+            assert (
+                kernel.action_links_cache.stats()[counter]
+                == action_links_stats[counter]
+            )
@@ -0,0 +1,40 @@
+# coding: utf-8
+import time
+import unittest.mock
+
+from rolling.server.chat import State
+from rolling.types import WorldPoint
+
+
+class TestChatState:
+    def test_unit__messages__ok__bounded_by_count(self) -> None:
+        state = State(max_age=3600, max_count=3)
+        for i in range(5):
+            state.add_message(WorldPoint((1, 1)), "xena", f"message{i}")
+
+        assert [m.message for m in state.messages(WorldPoint((1, 1)))] == [
+            "message2",
+            "message3",
+            "message4",
+        ]
+        assert not state.messages(WorldPoint((1, 2)))
+
+    def test_unit__messages__ok__bounded_by_age(self) -> None:
+        state = State(max_age=60, max_count=10)
+        now = time.time()
+        with unittest.mock.patch("time.time", return_value=now - 120):
+            state.add_message(WorldPoint((1, 1)), "xena", "old")
+        state.add_message(WorldPoint((1, 1)), "xena", "new")
+
+        assert [m.message for m in state.messages(WorldPoint((1, 1)))] == ["new"]
+
+    def test_unit__sweep__ok__forget_expired_zones(self) -> None:
+        state = State(max_age=60, max_count=10)
+        now = time.time()
+        with unittest.mock.patch("time.time", return_value=now - 120):
+            state.add_message(WorldPoint((1, 1)), "xena", "old")
+        state.add_message(WorldPoint((1, 2)), "xena", "new")
+
+        state.sweep()
+
+        assert list(state._messages.keys()) == [WorldPoint((1, 2))]
@@ -0,0 +1,105 @@
+# coding: utf-8
+import asyncio
+import pytest
+import unittest.mock
+
+from rolling.kernel import Kernel
+from rolling.server.outbound import OutboundQueues
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.received = []
+        self.close = unittest.mock.AsyncMock()
+
+    async def send_str(self, frame: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append(frame)
+
+
+class TestOutboundQueues:
+    @pytest.mark.asyncio
+    async def test_unit__broadcast__ok__slow_socket_dont_stall_others(self) -> None:
+        outbound = OutboundQueues()
+        slow_socket = FakeSocket(delay=60.0)
+        fast_socket = FakeSocket()
+
+        await outbound.broadcast([slow_socket, fast_socket], "frame1")
+        await outbound.broadcast([slow_socket, fast_socket], "frame2")
+
+        assert fast_socket.received == ["frame1", "frame2"]
+        assert slow_socket.received == []
+        stats = outbound.stats()
+        assert stats["sent"] == 2
+        assert stats["max_depth"] == 1
+        outbound.discard(slow_socket)
+        outbound.discard(fast_socket)
+
+    @pytest.mark.asyncio
+    async def test_unit__push__ok__disconnect_when_queue_full(self) -> None:
+        outbound = OutboundQueues(max_size=2)
+        slow_socket = FakeSocket(delay=60.0)
+
+        await outbound.broadcast([slow_socket], "frame1")  # currently sending
+        assert outbound.push(slow_socket, "frame2")
+        assert outbound.push(slow_socket, "frame3")
+        assert not outbound.push(slow_socket, "frame4")
+        assert not outbound.push(slow_socket, "frame5")
+
+        await asyncio.sleep(0)
+        slow_socket.close.assert_awaited()
+        assert outbound.stats()["disconnected"] == 1
+        outbound.discard(slow_socket)
+
+    @pytest.mark.asyncio
+    async def test_unit__flush__ok__wait_queued_frames(self) -> None:
+        outbound = OutboundQueues()
+        socket = FakeSocket(delay=0.01)
+
+        assert outbound.push(socket, "frame1")
+        assert outbound.push(socket, "frame2")
+        await outbound.flush(socket)
+
+        assert socket.received == ["frame1", "frame2"]
+        outbound.discard(socket)
+
+
+class TestZoneEventsManagerOutbound:
+    @pytest.mark.asyncio
+    async def test_unit__respond_to_socket__ok__after_queued_frames(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        manager = worldmapc_kernel.server_zone_events_manager
+        socket = FakeSocket(delay=0.01)
+
+        assert manager.outbound.push(socket, "event")
+        await manager.respond_to_socket(socket, "response")
+        await manager.outbound.flush(socket)
+
+        assert socket.received == ["event", "response"]
+        manager.outbound.discard(socket)
+
+
+class TestWorldEventsManagerOutbound:
+    @pytest.mark.asyncio
+    async def test_unit__send_to_sockets__ok__slow_socket_dont_stall(
+        self, worldmapc_kernel: Kernel
+    ) -> None:
+        manager = worldmapc_kernel.server_world_events_manager
+        slow_socket = FakeSocket(delay=60.0)
+        fast_socket = FakeSocket()
+        manager._sockets.extend([slow_socket, fast_socket])
+
+        await asyncio.wait_for(
+            manager.send_to_sockets(
+                None, 0, 0, repeat_to_zone=False, event_str="frame"
+            ),
+            timeout=1.0,
+        )
+
+        assert fast_socket.received == ["frame"]
+        assert slow_socket.received == []
+        manager.outbound.discard(slow_socket)
+        manager.outbound.discard(fast_socket)
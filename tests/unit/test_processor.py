@@ -0,0 +1,50 @@
+# coding: utf-8
+from guilang.description import Description
+from guilang.description import Part
+from rolling.server.processor import RollingSerpycoProcessor
+from rolling.server.processor import decorate_description
+from rolling.server.processor import description_decorator
+
+
+def set_character_ap(description: Description) -> None:
+    description.character_ap = "4.2"
+
+
+def set_action_uuid(description: Description) -> None:
+    description.action_uuid = "abcd"
+
+
+class TestRollingSerpycoProcessor:
+    def test_dump__decorated_once(self) -> None:
+        processor = RollingSerpycoProcessor()
+        processor.set_schema(Description)
+        description = Description(
+            title="Hello", items=[Part(text="one"), Part(items=[Part(text="two")])]
+        )
+
+        # When
+        with description_decorator(set_character_ap):
+            with description_decorator(set_action_uuid):
+                dumped = processor.dump(description)
+
+        # Then
+        assert dumped["character_ap"] == "4.2"
+        assert dumped["action_uuid"] == "abcd"
+        assert [item["id"] for item in dumped["items"]] == [0, 1]
+        assert dumped["items"][1]["items"][0]["id"] == 2
+
+    def test_dump__not_decorated_outside_block(self) -> None:
+        processor = RollingSerpycoProcessor()
+        processor.set_schema(Description)
+
+        with description_decorator(set_character_ap):
+            pass
+        dumped = processor.dump(Description(title="Hello"))
+
+        assert dumped["character_ap"] is None
+
+    def test_decorate_description__ignore_without_title(self) -> None:
+        with description_decorator(set_character_ap):
+            description = decorate_description(Description(items=[]))
+
+        assert description.character_ap is None
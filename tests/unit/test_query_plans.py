@@ -0,0 +1,69 @@
+# coding: utf-8
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+import pytest
+import typing
+
+from rolling.kernel import Kernel
+
+
+def _explain(kernel: Kernel, query: Query) -> str:
+    statement = query.statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    # Tests tables are almost empty: forbid seq scan to know if an index is usable
+    kernel.server_db_session.execute("SET LOCAL enable_seqscan = off")
+    plan = kernel.server_db_session.execute(f"EXPLAIN {statement}").fetchall()
+    return "\n".join(row[0] for row in plan)
+
+
+HOT_QUERIES: typing.Dict[str, typing.Callable[[Kernel], Query]] = {
+    "ground_resources_zone": lambda kernel: kernel.resource_lib.get_base_query(
+        world_row_i=1, world_col_i=1
+    ),
+    "ground_resources_tile": lambda kernel: kernel.resource_lib.get_base_query(
+        world_row_i=1, world_col_i=1, zone_row_i=2, zone_col_i=3
+    ),
+    "carried_resources": lambda kernel: kernel.resource_lib.get_base_query(
+        carried_by_id="xena"
+    ),
+    "carried_resource": lambda kernel: kernel.resource_lib.get_base_query(
+        carried_by_id="xena", resource_id="WOOD"
+    ),
+    "build_resources": lambda kernel: kernel.resource_lib.get_base_query(
+        in_built_id=42
+    ),
+    "ground_stuffs_zone": lambda kernel: kernel.stuff_lib.get_base_query(
+        world_row_i=1, world_col_i=1
+    ),
+    "ground_stuffs_tile": lambda kernel: kernel.stuff_lib.get_base_query(
+        world_row_i=1, world_col_i=1, zone_row_i=2, zone_col_i=3
+    ),
+    "carried_stuffs": lambda kernel: kernel.stuff_lib.get_base_query(
+        carried_by_id="xena"
+    ),
+    "build_stuffs": lambda kernel: kernel.stuff_lib.get_base_query(in_built_id=42),
+    "zone_builds": lambda kernel: kernel.build_lib.get_zone_query(
+        world_row_i=1, world_col_i=1
+    ),
+    "tile_builds": lambda kernel: kernel.build_lib.get_zone_query(
+        world_row_i=1, world_col_i=1, zone_row_i=2, zone_col_i=3
+    ),
+    "zone_characters": lambda kernel: kernel.character_lib._get_zone_characters_query(
+        row_i=1, col_i=1
+    ),
+    "tile_characters": lambda kernel: kernel.character_lib._get_zone_characters_query(
+        row_i=1, col_i=1, zone_row_i=2, zone_col_i=3
+    ),
+}
+
+
+class TestQueryPlans:
+    @pytest.mark.parametrize("query_name", list(HOT_QUERIES.keys()))
+    def test_unit__hot_query__ok__no_sequential_scan(
+        self, worldmapc_kernel: Kernel, query_name: str
+    ) -> None:
+        plan = _explain(worldmapc_kernel, HOT_QUERIES[query_name](worldmapc_kernel))
+        worldmapc_kernel.server_db_session.rollback()
+
+        assert "Seq Scan" not in plan, plan
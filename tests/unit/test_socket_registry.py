@@ -0,0 +1,27 @@
+# coding: utf-8
+from rolling.server.zone.registry import SocketRegistry
+
+
+class TestSocketRegistry:
+    def test_unit__move_and_remove__ok__indexes_up_to_date(self) -> None:
+        registry = SocketRegistry()
+        socket1 = object()
+        socket2 = object()
+        registry.add(socket1, (1, 1), "xena", token="token1")
+        registry.add(socket2, (1, 1), "arthur", reader_token="token1")
+
+        registry.move(socket1, (1, 2))
+
+        assert registry.zone(socket1) == (1, 2)
+        assert list(registry.zone_sockets((1, 1))) == [socket2]
+        assert list(registry.zone_sockets((1, 2))) == [socket1]
+        assert registry.socket_by_token(registry.reader_token(socket2)) is socket1
+
+        registry.remove(socket1)
+
+        assert registry.zone(socket1) is None
+        assert not list(registry.zone_sockets((1, 2)))
+        assert not list(registry.character_sockets("xena"))
+        assert registry.socket_by_token("token1") is None
+        assert registry.character_id(socket2) == "arthur"
+        assert len(registry) == 1
@@ -0,0 +1,51 @@
+# coding: utf-8
+import asyncio
+import concurrent.futures
+import pathlib
+import pytest
+import unittest.mock
+
+from rolling.spritesheet import SpritesheetService
+
+
+@pytest.fixture
+def service(tmp_path: pathlib.Path) -> SpritesheetService:
+    service = SpritesheetService(
+        "lpcg", "body", generator=unittest.mock.MagicMock(), folder=tmp_path
+    )
+    service._pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    return service
+
+
+class TestSpritesheetService:
+    def test_unit__path__ok__default_identifiers(
+        self, service: SpritesheetService
+    ) -> None:
+        assert service.path(None) == service.path("body")
+        assert service.path("body") != service.path("body hat")
+
+    @pytest.mark.asyncio
+    async def test_unit__render__ok__concurrent_renders_done_once(
+        self, service: SpritesheetService
+    ) -> None:
+        with unittest.mock.patch("rolling.spritesheet.build_spritesheet") as build:
+            paths = await asyncio.gather(
+                *[service.render("body hat") for _ in range(5)]
+            )
+            await service.render("body hat")
+
+        assert build.call_count == 1
+        assert set(paths) == {service.path("body hat")}
+
+    @pytest.mark.asyncio
+    async def test_unit__request__ok__dont_wait_render(
+        self, service: SpritesheetService
+    ) -> None:
+        with unittest.mock.patch("rolling.spritesheet.build_spritesheet") as build:
+            path = service.request("body hat")
+            assert service.stats()["rendering"] == 1
+            await service.render("body hat")
+
+        assert path == service.path("body hat")
+        assert build.call_count == 1
+        assert service.stats() == {"paths": 1, "rendered": 1, "rendering": 0}
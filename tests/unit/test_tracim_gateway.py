@@ -0,0 +1,123 @@
+# coding: utf-8
+import asyncio
+import pytest
+import threading
+import unittest.mock
+
+from rolling.tracim.gateway import TracimGateway
+
+
+class FakeDealer:
+    """Stand in for rrolling.tracim.Dealer, which make blocking HTTP calls"""
+
+    def __init__(self, fail_count: int = 0) -> None:
+        self.fail_count = fail_count
+        self.calls = []
+        self.threads = set()
+
+    def _call(self, name: str, *args) -> None:
+        self.threads.add(threading.get_ident())
+        self.calls.append((name, args))
+        if self.fail_count:
+            self.fail_count -= 1
+            raise ConnectionError("Tracim unavailable")
+
+    def get_unread_messages_count(self, account, account_id) -> int:
+        self._call("get_unread_messages_count", account, account_id)
+        return 3
+
+    def ensure_space_role(self, space_id, account_id, role) -> None:
+        self._call("ensure_space_role", space_id, account_id, role)
+
+
+@pytest.fixture(autouse=True)
+def account_id_type():
+    with unittest.mock.patch("rrolling.tracim.AccountId", new=lambda value: value):
+        yield
+
+
+class TestTracimGateway:
+    @pytest.mark.asyncio
+    async def test_unit__call__ok__out_of_event_loop_thread(self) -> None:
+        dealer = FakeDealer()
+        gateway = TracimGateway(None, dealer_factory=lambda: dealer)
+
+        assert await gateway.call("get_unread_messages_count", "xena", 1) == 3
+        assert threading.get_ident() not in dealer.threads
+
+    @pytest.mark.asyncio
+    async def test_unit__unread_messages_count__ok__cached(self) -> None:
+        dealer = FakeDealer()
+        gateway = TracimGateway(None, dealer_factory=lambda: dealer)
+
+        counts = await asyncio.gather(
+            *[gateway.get_unread_messages_count("xena", 1) for _ in range(5)]
+        )
+        assert counts == [3] * 5
+        assert await gateway.get_unread_messages_count("xena", 1) == 3
+        assert len(dealer.calls) == 1
+
+        gateway._unread_ttl = -1.0
+        await gateway.get_unread_messages_count("arthur", 2)
+        await gateway.get_unread_messages_count("arthur", 2)
+        assert len(dealer.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_unit__cached_unread_messages_count__ok__refreshed_in_background(
+        self,
+    ) -> None:
+        dealer = FakeDealer()
+        gateway = TracimGateway(None, dealer_factory=lambda: dealer)
+
+        assert gateway.get_cached_unread_messages_count("xena", 1) == 0
+        await asyncio.sleep(0.1)
+        assert gateway.get_cached_unread_messages_count("xena", 1) == 3
+        assert len(dealer.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_unit__cached_unread_messages_count__err__background_error_reported(
+        self,
+    ) -> None:
+        dealer = FakeDealer(fail_count=1)
+        gateway = TracimGateway(None, dealer_factory=lambda: dealer)
+
+        with unittest.mock.patch("rolling.tracim.gateway.server_logger") as logger:
+            assert gateway.get_cached_unread_messages_count("xena", 1) == 0
+            await asyncio.sleep(0.1)
+
+        assert logger.error.call_count == 1
+        assert isinstance(logger.error.call_args[1]["exc_info"], ConnectionError)
+        assert gateway.stats()["errors"] == 1
+        assert gateway.get_cached_unread_messages_count("xena", 1) == 0
+        await asyncio.sleep(0.1)
+        assert gateway.get_cached_unread_messages_count("xena", 1) == 3
+
+    @pytest.mark.asyncio
+    async def test_unit__post__ok__retried_in_order(self) -> None:
+        dealer = FakeDealer(fail_count=2)
+        gateway = TracimGateway(None, retry_delay=0.0, dealer_factory=lambda: dealer)
+        worker = asyncio.ensure_future(gateway.worker_task())
+
+        gateway.post("ensure_space_role", 1, 1, "reader")
+        gateway.post("ensure_space_role", 2, 1, "reader")
+        await asyncio.sleep(0.1)
+        worker.cancel()
+
+        assert dealer.calls == [
+            ("ensure_space_role", (1, 1, "reader")),
+            ("ensure_space_role", (1, 1, "reader")),
+            ("ensure_space_role", (1, 1, "reader")),
+            ("ensure_space_role", (2, 1, "reader")),
+        ]
+        assert gateway.stats()["retries"] == 2
+        assert gateway.stats()["queued"] == 0
+
+    def test_unit__post__ok__direct_call_without_event_loop(self) -> None:
+        dealer = FakeDealer(fail_count=1)
+        gateway = TracimGateway(None, dealer_factory=lambda: dealer)
+
+        gateway.post("ensure_space_role", 1, 1, "reader")
+        gateway.post("ensure_space_role", 2, 1, "reader")
+
+        assert len(dealer.calls) == 2
+        assert gateway.stats()["errors"] == 1
@@ -525,3 +525,56 @@ class TestExecuteTurn:
 
     def test_turn_delete_affinity_with_spawn_point(self) -> None:
         pass
+
+    def test_action_points_and_tiredness_evolution(
+        self,
+        worldmapc_kernel: Kernel,
+        turn_lib: TurnLib,
+        xena: CharacterDocument,
+        arthur: CharacterDocument,
+    ) -> None:
+        kernel = worldmapc_kernel
+        arthur.life_points = 0
+        kernel.server_db_session.add(arthur)
+        kernel.server_db_session.commit()
+
+        turn_lib.execute_turn()
+
+        xena = kernel.character_lib.get_document(xena.id)
+        arthur = kernel.character_lib.get_document(arthur.id, dead=True)
+        assert float(xena.action_points) == min(
+            32.0, 24.0 + kernel.game.config.action_points_per_tick
+        )
+        assert xena.tiredness == max(
+            0, 20 - kernel.game.config.reduce_tiredness_per_tick
+        )
+        assert float(arthur.action_points) == 24.0
+        assert arthur.alive_since == 0
+
+    def test_unit__execute_turn__ok__keep_changes_made_during_turn(
+        self,
+        worldmapc_kernel: Kernel,
+        turn_lib: TurnLib,
+        xena: CharacterDocument,
+    ) -> None:
+        kernel = worldmapc_kernel
+        kill = turn_lib._kill
+
+        def kill_after_server_change(characters) -> None:
+            # Server spend action points while turn is running
+            kernel.server_db_session.query(CharacterDocument).filter(
+                CharacterDocument.id == xena.id
+            ).update({CharacterDocument.action_points: 2.0})
+            kernel.server_db_session.commit()
+            kill(characters)
+
+        with unittest.mock.patch.object(
+            turn_lib, "_kill", new=kill_after_server_change
+        ):
+            turn_lib.execute_turn()
+
+        xena = kernel.character_lib.get_document(xena.id)
+        assert float(xena.action_points) == 2.0 + (
+            kernel.game.config.action_points_per_tick
+        )
+        assert xena.alive_since == 1
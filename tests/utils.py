@@ -1,3 +1,7 @@
+import logging
+import os
+import pytest
+import time
 import typing
 
 from guilang.description import Description, Part
@@ -65,3 +69,39 @@ def parts_text(parts: typing.List[Part]) -> str:
         return texts
 
     return "\n".join(_find_texts(parts))
+
+
+# Benchmarks are slow: they only run when ROLLING_BENCHMARK env var is set
+benchmark = pytest.mark.skipif(
+    not os.environ.get("ROLLING_BENCHMARK"),
+    reason="Set ROLLING_BENCHMARK env var to run benchmarks",
+)
+benchmark_logger = logging.getLogger("tests.benchmark")
+BENCHMARK_PROPERTY_NAME = "benchmark"
+# Type of pytest record_property fixture
+RecordProperty = typing.Callable[[str, typing.Any], None]
+
+
+class BenchmarkRecorder:
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._rows: typing.List[typing.Tuple[str, float]] = []
+
+    def measure(self, label: str, func: typing.Callable[[], typing.Any]) -> float:
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        self._rows.append((label, elapsed))
+        return elapsed
+
+    def record(self, label: str, value: float) -> None:
+        self._rows.append((label, value))
+
+    def report(self, record_property: RecordProperty) -> str:
+        """Log report and attach it to test report (see benchmark conftest)"""
+        lines = [f"Benchmark: {self._name}"]
+        lines.extend(f"  {label}: {value:.4f}" for label, value in self._rows)
+        report = "\n".join(lines)
+        benchmark_logger.info(report)
+        record_property(BENCHMARK_PROPERTY_NAME, report)
+        return report